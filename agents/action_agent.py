@@ -19,17 +19,25 @@ class ActionAgent:
       - desktop notifications (toast)
       - starts a break timer (drowsy)
       - tracks focus sessions (engaged)
+      - optionally reports decisions and actions to a fleet service
+        (reporter = FleetReporter or FleetReporter.bind(...))
     """
 
     def __init__(
         self,
         log_path="logs/events.log",
         break_seconds=120,     # 2 minutes (set to 5 for testing)
-        stress_cooldown=30     # avoid spamming notifications
+        stress_cooldown=30,    # avoid spamming notifications
+        notifications=True,    # False = log notifications but never show a toast
+        clock=time.time,       # time source for cooldowns/sessions (load tests use a virtual clock)
+        reporter=None          # FleetReporter: ship decision/action events to the fleet service
     ):
         self.log_path = log_path
         self.break_seconds = break_seconds
         self.stress_cooldown = stress_cooldown
+        self.notifications = notifications
+        self.clock = clock
+        self.reporter = reporter
 
         # Internal state memory
         self.last_state = None
@@ -52,6 +60,10 @@ class ActionAgent:
         msg = f"[{self._now_str()}] {text}"
         print(msg)
         self._write_log(msg)
+
+        if self.reporter is not None and text.startswith("ACTION="):
+            action, _, detail = text[len("ACTION="):].partition(" | ")
+            self.reporter.report({"ts": self.clock(), "kind": "action", "action": action, "detail": detail})
         return msg
 
     def _notify(self, title: str, message: str, timeout: int = 5):
@@ -61,6 +73,9 @@ class ActionAgent:
         """
         self._log_and_print(f"NOTIFY | title={title} | msg={message}")
 
+        if not self.notifications:
+            return
+
         if not PLYER_AVAILABLE:
             self._log_and_print("NOTIFY_SKIPPED | reason=plyer_not_installed")
             return
@@ -113,7 +128,7 @@ class ActionAgent:
         Sends a stress-support notification with cooldown
         to avoid repeated spam.
         """
-        now = time.time()
+        now = self.clock()
         if now - self.last_stress_action_ts < self.stress_cooldown:
             remaining = int(self.stress_cooldown - (now - self.last_stress_action_ts))
             self._log_and_print(f"ACTION=stress_notify_skipped | cooldown_remaining={remaining}s")
@@ -129,7 +144,7 @@ class ActionAgent:
 
     def _start_focus_session(self):
         if self.focus_start_ts is None:
-            self.focus_start_ts = time.time()
+            self.focus_start_ts = self.clock()
             self._log_and_print("ACTION=focus_session_started")
             self._notify(
                 "Focus Mode",
@@ -143,7 +158,7 @@ class ActionAgent:
         if self.focus_start_ts is None:
             return
 
-        duration = int(time.time() - self.focus_start_ts)
+        duration = int(self.clock() - self.focus_start_ts)
         self.focus_start_ts = None
         self._log_and_print(f"ACTION=focus_session_ended | duration={duration}s | reason={reason}")
 
@@ -201,6 +216,8 @@ class ActionAgent:
         # Main state log
         state_msg = f"STATE={state.upper()} | {reason}"
         self._log_and_print(state_msg)
+        if self.reporter is not None:
+            self.reporter.report({"ts": self.clock(), "kind": "decision", "state": state, "reason": reason})
 
         # Smart trigger action
         self._smart_action(state)
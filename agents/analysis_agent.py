@@ -1,5 +1,9 @@
 import time
-from deepface import DeepFace
+
+from agents.model_store import bundle_path
+
+# DeepFace (and TensorFlow) are imported on first use: a worker that
+# serves tensors from the bundled model never loads them.
 
 
 class EmotionAgent:
@@ -15,6 +19,8 @@ class EmotionAgent:
         self.last_ts = now
 
         try:
+            from deepface import DeepFace
+
             result = DeepFace.analyze(
                 face_crop_bgr,
                 actions=["emotion"],
@@ -28,4 +34,89 @@ class EmotionAgent:
 
             return {"emotion": emotion, "confidence": conf}
         except Exception:
-            return None
\ No newline at end of file
+            return None
+
+
+def load_deepface_emotion_model():
+    """
+    The Keras emotion CNN from DeepFace. deepface >= 0.0.93 needs
+    build_model(task="facial_attribute", model_name=...) (with the old
+    positional call it looks "Emotion" up among the face recognition
+    models and fails); older releases only take the model name.
+    """
+    from deepface import DeepFace
+
+    try:
+        model = DeepFace.build_model(task="facial_attribute", model_name="Emotion")
+    except TypeError:
+        model = DeepFace.build_model("Emotion")
+    # newer deepface wraps the keras model in a client object
+    return getattr(model, "model", model)
+
+
+class EmotionBatchModel:
+    """
+    Runs the DeepFace emotion CNN directly on already-cropped faces,
+    many at once (one forward pass per batch).
+
+    DeepFace.analyze handles one image per call and re-runs face
+    detection; the face crops we send are already faces, so this skips
+    straight to the model: gray -> 48x48 -> /255 -> predict.
+
+    If the deployment ships a model bundle (models/emotion, written by
+    export_models.py) the weights are memory-mapped from there and run
+    in NumPy (agents/model_store.py): no TensorFlow, no ~/.deepface and
+    no download, and all workers on the host share one copy of the
+    weights. Without a bundle the DeepFace Keras model is used only if
+    allow_deepface is set (it may download its weights); otherwise the
+    constructor raises FileNotFoundError.
+    """
+
+    LABELS = ["angry", "disgust", "fear", "happy", "sad", "surprise", "neutral"]
+    INPUT_SIZE = (48, 48)
+    BUNDLE_NAME = "emotion"
+
+    def __init__(self, model_dir=None, allow_deepface: bool = False):
+        bundle = bundle_path(self.BUNDLE_NAME, model_dir)
+        if (bundle / "manifest.json").exists():
+            from agents.model_store import MappedModel
+
+            self.model = MappedModel(bundle)
+            self.bundled = True
+            return
+
+        if not allow_deepface:
+            raise FileNotFoundError(f"no emotion model bundle in {bundle}: run export_models.py in emotion_env")
+
+        print(f"[WARN] No model bundle in {bundle}: loading DeepFace weights (may download)", flush=True)
+        self.model = load_deepface_emotion_model()
+        self.bundled = False
+
+    def preprocess(self, face_crop_bgr):
+        import numpy as np
+        from agents.frame_utils import emotion_tensor
+
+        # same preprocessing the camera side does before sending a tensor
+        return emotion_tensor(face_crop_bgr).astype(np.float32) / 255.0
+
+    def predict_batch(self, inputs):
+        """
+        inputs: list of (48, 48) float32 arrays from preprocess() or unpack_tensor()
+        Returns a list of {"emotion": ..., "confidence": ...}
+        """
+        import numpy as np
+
+        if not inputs:
+            return []
+
+        batch = np.stack(inputs)[..., np.newaxis]
+        if self.bundled:
+            probs = self.model.predict(batch)
+        else:
+            probs = self.model.predict(batch, verbose=0)
+
+        results = []
+        for p in probs:
+            i = int(np.argmax(p))
+            results.append({"emotion": self.LABELS[i], "confidence": float(p[i]) * 100.0})
+        return results
@@ -0,0 +1,288 @@
+import os
+import queue
+import threading
+from multiprocessing.connection import Listener, Client
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except Exception:
+    PSUTIL_AVAILABLE = False
+
+
+DEFAULT_ADDRESS = ("127.0.0.1", 6150)
+DEFAULT_AUTHKEY = b"mood-agents"
+
+# Typed topics: topic -> required message fields
+TOPICS = {
+    "frames": ("frame_id", "ts", "frame"),
+    "face_bbox": ("frame_id", "ts", "bbox"),                     # bbox may be None (no face)
+    "yawn_metrics": ("frame_id", "ts", "yawn", "duration", "mar"),
+    "emotion": ("frame_id", "ts", "emotion", "confidence"),
+    "decision": ("ts", "state", "reason"),
+    "action": ("ts", "state", "message"),
+}
+
+
+def check_message(topic: str, msg: dict):
+    if topic not in TOPICS:
+        raise ValueError(f"unknown topic {topic!r}, expected one of {list(TOPICS)}")
+
+    missing = [k for k in TOPICS[topic] if k not in msg]
+    if missing:
+        raise ValueError(f"topic {topic!r} message is missing fields {missing}")
+
+
+class Subscription:
+    """
+    Queue of messages for one topic.
+    With maxsize > 0 the oldest message is dropped when full, so slow
+    consumers of high-rate topics (frames) always see the latest data.
+    """
+
+    def __init__(self, topic: str, maxsize: int = 0):
+        self.topic = topic
+        self._q = queue.Queue(maxsize=maxsize)
+
+    def put(self, msg):
+        while True:
+            try:
+                self._q.put_nowait(msg)
+                return
+            except queue.Full:
+                try:
+                    self._q.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: float = None):
+        """
+        Next message or None on timeout.
+        """
+        try:
+            return self._q.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def drain(self):
+        msgs = []
+        while True:
+            try:
+                msgs.append(self._q.get_nowait())
+            except queue.Empty:
+                return msgs
+
+
+class LocalBus:
+    """
+    In-process pub/sub bus (threads). Same API as BusClient,
+    so agent nodes run unchanged in tests or in a single process.
+    """
+
+    def __init__(self):
+        self._subs = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: str, maxsize: int = 0):
+        if topic not in TOPICS:
+            raise ValueError(f"unknown topic {topic!r}")
+
+        sub = Subscription(topic, maxsize)
+        with self._lock:
+            self._subs.setdefault(topic, []).append(sub)
+        return sub
+
+    def subscriber_count(self, topic: str) -> int:
+        """
+        Subscriptions to topic so far (a node is ready once it subscribed).
+        """
+        with self._lock:
+            return len(self._subs.get(topic, []))
+
+    def publish(self, topic: str, msg: dict):
+        check_message(topic, msg)
+        with self._lock:
+            subs = list(self._subs.get(topic, []))
+        for sub in subs:
+            sub.put(msg)
+
+    def close(self):
+        pass
+
+
+class BusBroker:
+    """
+    Fan-out broker over a local TCP socket (works on Windows too).
+    Clients send ("sub", topic) or ("pub", topic, msg); the broker
+    forwards every published message to all subscribed connections.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, authkey=DEFAULT_AUTHKEY):
+        self.listener = Listener(address, authkey=authkey)
+        self.address = self.listener.address
+        self._subs = {}
+        self._send_locks = {}
+        self._lock = threading.Lock()
+        self._running = True
+
+    def start(self):
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                conn = self.listener.accept()
+            except Exception:
+                if not self._running:
+                    return
+                continue
+
+            with self._lock:
+                self._send_locks[conn] = threading.Lock()
+            threading.Thread(target=self._conn_loop, args=(conn,), daemon=True).start()
+
+    def _conn_loop(self, conn):
+        try:
+            while True:
+                req = conn.recv()
+                if req[0] == "sub":
+                    with self._lock:
+                        self._subs.setdefault(req[1], []).append(conn)
+                elif req[0] == "pub":
+                    self._forward(req[1], req[2])
+        except (EOFError, OSError):
+            pass
+        finally:
+            self._drop(conn)
+
+    def _forward(self, topic, msg):
+        with self._lock:
+            targets = [(c, self._send_locks[c]) for c in self._subs.get(topic, [])]
+
+        for conn, lock in targets:
+            try:
+                with lock:
+                    conn.send((topic, msg))
+            except (EOFError, OSError):
+                self._drop(conn)
+
+    def _drop(self, conn):
+        with self._lock:
+            for conns in self._subs.values():
+                if conn in conns:
+                    conns.remove(conn)
+            self._send_locks.pop(conn, None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close(self):
+        self._running = False
+        self.listener.close()
+
+
+class BusClient:
+    """
+    Connects to a BusBroker from any process.
+    publish()/subscribe() behave like LocalBus.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, authkey=DEFAULT_AUTHKEY):
+        self._pub = Client(address, authkey=authkey)
+        self._sub = Client(address, authkey=authkey)
+        self._pub_lock = threading.Lock()
+        self._subs = {}
+        self._lock = threading.Lock()
+        threading.Thread(target=self._reader, daemon=True).start()
+
+    def _reader(self):
+        try:
+            while True:
+                topic, msg = self._sub.recv()
+                with self._lock:
+                    subs = list(self._subs.get(topic, []))
+                for sub in subs:
+                    sub.put(msg)
+        except (EOFError, OSError):
+            pass
+
+    def subscribe(self, topic: str, maxsize: int = 0):
+        if topic not in TOPICS:
+            raise ValueError(f"unknown topic {topic!r}")
+
+        sub = Subscription(topic, maxsize)
+        with self._lock:
+            first = topic not in self._subs
+            self._subs.setdefault(topic, []).append(sub)
+        if first:
+            with self._pub_lock:
+                self._sub.send(("sub", topic))
+        return sub
+
+    def subscriber_count(self, topic: str) -> int:
+        """
+        Subscriptions to topic made through this client.
+        """
+        with self._lock:
+            return len(self._subs.get(topic, []))
+
+    def publish(self, topic: str, msg: dict):
+        check_message(topic, msg)
+        with self._pub_lock:
+            self._pub.send(("pub", topic, msg))
+
+    def close(self):
+        for conn in (self._pub, self._sub):
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+def pin_to_core(core: int):
+    """
+    Pins the current process to one CPU core (best effort).
+    """
+    try:
+        if PSUTIL_AVAILABLE:
+            psutil.Process().cpu_affinity([core])
+        elif hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, {core})
+        else:
+            print(f"[BUS] cpu pinning not supported here (core={core})")
+            return
+        print(f"[BUS] pid={os.getpid()} pinned to core {core}")
+    except Exception as e:
+        print(f"[BUS] cpu pinning failed (core={core}): {e}")
+
+
+def _node_main(node_fn, address, authkey, core, stop, args):
+    if core is not None:
+        pin_to_core(core)
+
+    bus = BusClient(address, authkey)
+    try:
+        node_fn(bus, stop, *args)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        bus.close()
+
+
+def start_node_process(node_fn, stop, *args, address=DEFAULT_ADDRESS,
+                       authkey=DEFAULT_AUTHKEY, core=None):
+    """
+    Runs node_fn(bus, stop, *args) in its own process, connected to the broker.
+    node_fn must be a module-level function (picklable on Windows).
+    """
+    import multiprocessing as mp
+
+    p = mp.Process(
+        target=_node_main,
+        args=(node_fn, address, authkey, core, stop, args),
+        daemon=True
+    )
+    p.start()
+    return p
@@ -0,0 +1,190 @@
+"""
+Agent nodes for the message bus.
+
+Every node has the signature node(bus, stop, *args): it subscribes to its
+input topics, publishes to its output topics and returns when stop is set.
+The same functions run in threads on a LocalBus (tests, single process)
+or in their own processes on a BusClient (see run_bus_system.py).
+"""
+import time
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+POLL_S = 0.2
+
+
+class FrameCache:
+    """
+    Keeps the last few frames by frame_id so nodes can join
+    face_bbox messages with the pixels they refer to.
+    """
+
+    def __init__(self, size: int = 8):
+        self.size = size
+        self.frames = {}
+
+    def add(self, msg):
+        self.frames[msg["frame_id"]] = msg["frame"]
+        while len(self.frames) > self.size:
+            self.frames.pop(next(iter(self.frames)))
+
+    def get(self, frame_id):
+        return self.frames.get(frame_id)
+
+
+def face_node(bus, stop, min_detect_width=160, max_detect_width=320):
+    """
+    frames -> face_bbox
+    """
+    from agents.sensor_agent import FaceDetectionAgent
+
+    agent = FaceDetectionAgent(min_detect_width=min_detect_width, max_detect_width=max_detect_width)
+    frames = bus.subscribe("frames", maxsize=1)
+
+    while not stop.is_set():
+        msg = frames.get(timeout=POLL_S)
+        if msg is None:
+            continue
+
+        bbox = agent.run(msg["frame"])
+        bus.publish("face_bbox", {"frame_id": msg["frame_id"], "ts": msg["ts"], "bbox": bbox})
+
+
+def yawn_node(bus, stop, roi_margin=0.4):
+    """
+    frames + face_bbox -> yawn_metrics (FaceMesh on the face ROI)
+    """
+    from agents.yawn_agent import YawnAgent
+    from agents.frame_utils import clamp_crop, expand_bbox
+
+    agent = YawnAgent()
+    cache = FrameCache()
+    frames = bus.subscribe("frames", maxsize=8)
+    faces = bus.subscribe("face_bbox", maxsize=1)
+
+    while not stop.is_set():
+        for f in frames.drain():
+            cache.add(f)
+
+        msg = faces.get(timeout=POLL_S)
+        if msg is None or msg["bbox"] is None:
+            continue
+
+        frame = cache.get(msg["frame_id"])
+        if frame is None:
+            continue
+
+        roi = clamp_crop(frame, expand_bbox(msg["bbox"], roi_margin))
+        if roi is None:
+            continue
+
+        # capture timestamp, not processing time: the yawn duration must not
+        # depend on how far this node lags behind the camera
+        out = agent.update(agent.measure(roi), msg["ts"])
+        bus.publish("yawn_metrics", {"frame_id": msg["frame_id"], "ts": msg["ts"], **out})
+
+
+def emotion_node(bus, stop, emotion_python, worker_script, interval=8.0):
+    """
+    frames + face_bbox -> emotion (one sample every `interval` seconds)
+    """
+    from agents.emotion_client import EmotionWorkerClient
+    from agents.frame_utils import clamp_crop, emotion_tensor
+
+    worker = EmotionWorkerClient(Path(emotion_python), Path(worker_script), cwd=ROOT).start()
+    cache = FrameCache()
+    frames = bus.subscribe("frames", maxsize=8)
+    faces = bus.subscribe("face_bbox", maxsize=1)
+    last_sample_ts = 0.0
+
+    try:
+        while not stop.is_set():
+            for f in frames.drain():
+                cache.add(f)
+
+            msg = faces.get(timeout=POLL_S)
+            if msg is None or msg["bbox"] is None:
+                continue
+            if time.time() - last_sample_ts < interval:
+                continue
+
+            frame = cache.get(msg["frame_id"])
+            crop = clamp_crop(frame, msg["bbox"]) if frame is not None else None
+            if crop is None:
+                continue
+
+            last_sample_ts = time.time()
+            emo = worker.analyze_tensor(emotion_tensor(crop))
+            if emo:
+                bus.publish("emotion", {"frame_id": msg["frame_id"], "ts": msg["ts"], **emo})
+    finally:
+        worker.close()
+
+
+def window_node(bus, stop, window_seconds=30, rules_path=None):
+    """
+    face_bbox + yawn_metrics + emotion -> decision
+
+    Same window rules as final_agent: the window starts when a face
+    appears, resets when it disappears, and decides every window_seconds.
+    """
+    from agents.decision_agent import MoodDecisionAgent
+    from agents.window_state import add_yawn, close_window, new_window_state, reset_window, start_window
+
+    decision_agent = MoodDecisionAgent(rules_path)
+    faces = bus.subscribe("face_bbox")
+    yawns = bus.subscribe("yawn_metrics")
+    emotions = bus.subscribe("emotion")
+
+    state = new_window_state()
+
+    while not stop.is_set():
+        msg = faces.get(timeout=POLL_S)
+        if msg is None:
+            continue
+
+        # Latest face presence decides the window
+        for m in faces.drain():
+            msg = m
+
+        if msg["bbox"] is None:
+            reset_window(state)
+            yawns.drain()
+            emotions.drain()
+            continue
+
+        if state["window_start_ts"] is None:
+            start_window(state, msg["ts"])
+        window_start_ts = state["window_start_ts"]
+
+        for y in yawns.drain():
+            if y["ts"] >= window_start_ts:
+                add_yawn(state, y)
+
+        for e in emotions.drain():
+            if e["ts"] >= window_start_ts:
+                state["emotion_samples"].append({"emotion": e["emotion"], "confidence": e["confidence"]})
+
+        if msg["ts"] - window_start_ts >= window_seconds:
+            decision, _emotion_info, _yawn_info = close_window(state, decision_agent)
+            bus.publish("decision", {"ts": msg["ts"], **decision})
+            start_window(state, msg["ts"])
+
+
+def action_node(bus, stop, log_path="logs/events.log"):
+    """
+    decision -> action
+    """
+    from agents.action_agent import ActionAgent
+
+    agent = ActionAgent(log_path=str(log_path))
+    decisions = bus.subscribe("decision")
+
+    while not stop.is_set():
+        msg = decisions.get(timeout=POLL_S)
+        if msg is None:
+            continue
+
+        state_msg = agent.run(msg)
+        bus.publish("action", {"ts": time.time(), "state": msg["state"], "message": state_msg})
@@ -0,0 +1,204 @@
+import json
+import os
+import time
+from pathlib import Path
+
+
+class P2Quantile:
+    """
+    Streaming estimate of one quantile with the P-square algorithm
+    (Jain & Chlamtac, 1985): five markers, O(1) memory and time per value.
+
+        q = P2Quantile(0.9)
+        for x in values:
+            q.add(x)
+        q.value()
+    """
+
+    def __init__(self, p: float):
+        self.p = p
+        self.count = 0
+        self.q = []                                  # marker heights
+        self.n = [0, 1, 2, 3, 4]                     # marker positions
+        self.np = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]  # desired positions
+        self.dn = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, x: float):
+        x = float(x)
+        self.count += 1
+
+        if self.count <= 5:
+            self.q.append(x)
+            self.q.sort()
+            return
+
+        q, n = self.q, self.n
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.np[i] += self.dn[i]
+
+        # move the middle markers towards their desired positions
+        for i in range(1, 4):
+            d = self.np[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not q[i - 1] < qp < q[i + 1]:
+                    # parabola left the bracket: linear step instead
+                    qp = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = qp
+                n[i] += d
+
+    def value(self):
+        if self.count == 0:
+            return None
+        if self.count <= 5:
+            return self.q[min(len(self.q) - 1, int(self.p * len(self.q)))]
+        return self.q[2]
+
+    def to_dict(self):
+        return {"p": self.p, "count": self.count, "q": self.q, "n": self.n, "np": self.np}
+
+    @classmethod
+    def from_dict(cls, d):
+        sketch = cls(d["p"])
+        sketch.count = d["count"]
+        sketch.q = list(d["q"])
+        sketch.n = list(d["n"])
+        sketch.np = list(d["np"])
+        return sketch
+
+
+class UserCalibration:
+    """
+    Personal yawn and emotion thresholds learned online for one user.
+
+    Keeps constant-memory quantile sketches of
+      - the per-frame mouth aspect ratio (median and 90th percentile), and
+      - the window confidence of each dominant emotion (80th percentile),
+    and derives from them
+      - the yawn opening threshold: resting MAR median + MAR_SPREAD *
+        (p90 - median), clamped to [0.5x, 2x] the global default, and
+      - a per-emotion confidence cut-off: that emotion's p80 window
+        confidence, clamped to [default, 95]. A face that habitually
+        reads as "sad" at 65% then needs a clearly stronger window to
+        count as stressed.
+    Until enough data is seen the global defaults are used.
+
+    The sketches are saved as JSON (calibration/<user>.json) and picked
+    up again in the next session.
+    """
+
+    MAR_SPREAD = 4.0
+    CONF_QUANTILE = 0.8
+    CONF_MAX = 95.0
+
+    def __init__(self, path, mar_threshold: float = 0.08, confidence: float = 60.0,
+                 min_mar_samples: int = 3000, min_windows: int = 20):
+        self.path = Path(path)
+        self.default_mar = mar_threshold
+        self.default_conf = confidence
+        self.min_mar_samples = min_mar_samples
+        self.min_windows = min_windows
+
+        self.mar_median = P2Quantile(0.5)
+        self.mar_p90 = P2Quantile(0.9)
+        self.conf = {}          # emotion -> P2Quantile(CONF_QUANTILE)
+        self.applied = None     # (mar_threshold, confidence cut-offs) last pushed to the agents
+
+        self.load()
+
+    # ---- observations ----
+    def observe_mar(self, mar):
+        if mar is None:
+            return
+        self.mar_median.add(mar)
+        self.mar_p90.add(mar)
+
+    def observe_window(self, emotion_info):
+        """Window summary from summarize_emotions() (None = no emotion)."""
+        if not emotion_info or not emotion_info.get("emotion"):
+            return
+        emo = emotion_info["emotion"]
+        if emo not in self.conf:
+            self.conf[emo] = P2Quantile(self.CONF_QUANTILE)
+        self.conf[emo].add(emotion_info.get("confidence", 0.0))
+
+    # ---- thresholds ----
+    def mar_threshold(self):
+        if self.mar_median.count < self.min_mar_samples:
+            return self.default_mar
+        median, p90 = self.mar_median.value(), self.mar_p90.value()
+        personal = median + self.MAR_SPREAD * max(p90 - median, 0.0)
+        return min(max(personal, 0.5 * self.default_mar), 2.0 * self.default_mar)
+
+    def confidence_thresholds(self):
+        return {
+            emo: min(max(sketch.value(), self.default_conf), self.CONF_MAX)
+            for emo, sketch in self.conf.items()
+            if sketch.count >= self.min_windows
+        }
+
+    def apply(self, yawn_agent=None, decision_agent=None):
+        """
+        Pushes the current personal thresholds to the agents.
+        Prints a [CALIB] line when they changed noticeably.
+        """
+        mar = self.mar_threshold()
+        conf = self.confidence_thresholds()
+
+        if yawn_agent is not None:
+            yawn_agent.MAR_THRESHOLD = mar
+        if decision_agent is not None:
+            decision_agent.set_personal_thresholds({"confidence": conf})
+
+        if self.applied is None or abs(mar - self.applied[0]) > 0.002 or any(
+            abs(v - self.applied[1].get(e, -1.0)) > 1.0 for e, v in conf.items()
+        ):
+            conf_text = ", ".join(f"{e}>={v:.0f}" for e, v in sorted(conf.items())) or "defaults"
+            print(f"[CALIB] mar_threshold={mar:.3f} confidence: {conf_text} "
+                  f"(frames={self.mar_median.count})")
+        self.applied = (mar, conf)
+
+    # ---- persistence ----
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.mar_median = P2Quantile.from_dict(data["mar_median"])
+            self.mar_p90 = P2Quantile.from_dict(data["mar_p90"])
+            self.conf = {emo: P2Quantile.from_dict(d) for emo, d in data.get("confidence", {}).items()}
+            print(f"[CALIB] Loaded {self.path.name} (frames={self.mar_median.count}, "
+                  f"windows={sum(s.count for s in self.conf.values())})")
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[WARN] Calibration file ignored ({self.path}): {e}")
+
+    def save(self):
+        data = {
+            "saved_ts": time.time(),
+            "mar_median": self.mar_median.to_dict(),
+            "mar_p90": self.mar_p90.to_dict(),
+            "confidence": {emo: s.to_dict() for emo, s in self.conf.items()},
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
@@ -0,0 +1,145 @@
+import time
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except Exception:
+    PSUTIL_AVAILABLE = False
+
+
+# Settings ladder, cheapest first. final_agent appends its configured
+# settings as the top level.
+#   capture:          (w, h) capture size, None = camera default
+#   detect_width:     FaceDetectionAgent max_detect_width
+#   detect_every:     run face detection on every Nth frame (reuse the bbox in between)
+#   mesh_every:       run FaceMesh on every Nth frame
+#   emotion_interval: longest gap between emotion samples (EMOTION_SAMPLE_INTERVAL)
+DEFAULT_LEVELS = [
+    {"capture": (320, 240), "detect_width": 160, "detect_every": 3, "mesh_every": 6, "emotion_interval": 30.0},
+    {"capture": (640, 480), "detect_width": 160, "detect_every": 2, "mesh_every": 4, "emotion_interval": 15.0},
+    {"capture": (640, 480), "detect_width": 240, "detect_every": 1, "mesh_every": 3, "emotion_interval": 10.0},
+    {"capture": (640, 480), "detect_width": 320, "detect_every": 1, "mesh_every": 2, "emotion_interval": 8.0},
+]
+
+
+class _Stage:
+    def __init__(self, governor, name):
+        self.governor = governor
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+
+    def __exit__(self, *exc):
+        g = self.governor
+        g.stage_s[self.name] = g.stage_s.get(self.name, 0.0) + time.perf_counter() - self.t0
+        return False
+
+
+class CpuGovernor:
+    """
+    Holds the pipeline near a CPU target by stepping through a ladder of
+    settings (DEFAULT_LEVELS, cheapest first).
+
+    Every `period` seconds it compares the CPU used since the last check
+    (this process and its children, e.g. perception / emotion workers,
+    when psutil is installed; otherwise this process only) with `target`
+    (share of one core, 0.15 = 15%):
+      - above target      -> one level cheaper right away
+      - below target * up_ratio for up_periods checks in a row
+                          -> one level richer
+    The period after a change is not judged (settings need to settle).
+
+    The camera loop wraps its stages in `with governor.stage("detect"):`
+    and calls tick(now) once per frame; tick returns the new level dict
+    when the settings changed. Each change is printed with the CPU share
+    and the per-stage ms/frame that led to it.
+    """
+
+    def __init__(self, target=0.15, levels=None, period=5.0, up_ratio=0.6, up_periods=3,
+                 include_children=True):
+        self.target = target
+        self.levels = list(levels or DEFAULT_LEVELS)
+        self.level = len(self.levels) - 1       # start at full quality
+        self.period = period
+        self.up_ratio = up_ratio
+        self.up_periods = up_periods
+
+        self.proc = psutil.Process() if PSUTIL_AVAILABLE else None
+        self.include_children = include_children and PSUTIL_AVAILABLE
+
+        self.stage_s = {}
+        self.frames = 0
+        self.calm_periods = 0
+        self.settling = False
+        self.last_cpu = None
+        self.changes = 0
+        self._start(time.time())
+
+    def _cpu_seconds(self):
+        if self.proc is None:
+            return time.process_time()
+        total = sum(self.proc.cpu_times()[:2])
+        if self.include_children:
+            for child in self.proc.children(recursive=True):
+                try:
+                    total += sum(child.cpu_times()[:2])
+                except Exception:
+                    pass    # exited / no access
+        return total
+
+    def _start(self, now):
+        self.t0 = now
+        self.cpu0 = self._cpu_seconds()
+        self.stage_s = {}
+        self.frames = 0
+
+    def settings(self):
+        return self.levels[self.level]
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def tick(self, now):
+        self.frames += 1
+        if now - self.t0 < self.period:
+            return None
+
+        cpu = (self._cpu_seconds() - self.cpu0) / max(now - self.t0, 1e-6)
+        self.last_cpu = cpu
+        stages = " ".join(
+            f"{name}={s * 1000.0 / max(self.frames, 1):.1f}" for name, s in sorted(self.stage_s.items())
+        )
+        fps = self.frames / max(now - self.t0, 1e-6)
+        self._start(now)
+
+        if self.settling:
+            self.settling = False
+            return None
+
+        old = self.level
+        if cpu > self.target and self.level > 0:
+            self.level -= 1
+            self.calm_periods = 0
+        elif cpu < self.target * self.up_ratio and self.level < len(self.levels) - 1:
+            self.calm_periods += 1
+            if self.calm_periods >= self.up_periods:
+                self.level += 1
+                self.calm_periods = 0
+        else:
+            self.calm_periods = 0
+
+        if self.level == old:
+            return None
+
+        self.settling = True
+        self.changes += 1
+        s = self.settings()
+        capture = f"{s['capture'][0]}x{s['capture'][1]}" if s.get("capture") else "default"
+        print(
+            f"[GOVERNOR] cpu={cpu:.0%} target={self.target:.0%} -> level {self.level}/{len(self.levels) - 1} "
+            f"({'down' if self.level < old else 'up'}): capture={capture} detect_w={s['detect_width']} "
+            f"detect_every={s['detect_every']} mesh_every={s['mesh_every']} emotion_interval={s['emotion_interval']:.0f}s "
+            f"| ms/frame {stages} fps={fps:.1f}"
+        )
+        return s
@@ -1,44 +1,180 @@
+import json
+import operator
+from pathlib import Path
+
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent.parent / "config" / "decision_rules.json"
+
+# Window feature vector used by the rules (name -> default value)
+FEATURE_DEFAULTS = {
+    "emotion": "unknown",
+    "confidence": 0.0,
+    "yawn": False,
+    "duration": 0.0,
+    "mar": 0.0,
+}
+
+OPS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">=": operator.ge,
+    ">": operator.gt,
+    "<=": operator.le,
+    "<": operator.lt,
+    "in": lambda a, b: a in b,
+    "not_in": lambda a, b: a not in b,
+}
+
+
+def load_rules(path=None):
+    with open(path or DEFAULT_RULES_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compile_rules(config: dict):
+    """
+    Turns the rule config into a decision table:
+        [(name, state, match, [(field, op, value), ...], reason_fmt), ...]
+    Rules are evaluated top to bottom, first match wins.
+    Unknown fields/ops fail here, not in the camera loop.
+    """
+    table = []
+    for i, rule in enumerate(config.get("rules", [])):
+        match = rule.get("match", "all")
+        if match not in {"all", "any"}:
+            raise ValueError(f"rule {i}: match must be 'all' or 'any', got {match!r}")
+
+        conditions = []
+        for field, op, value in rule.get("when", []):
+            if field not in FEATURE_DEFAULTS:
+                raise ValueError(f"rule {i}: unknown field {field!r}")
+            if op not in OPS:
+                raise ValueError(f"rule {i}: unknown op {op!r}")
+            if op in {"in", "not_in"}:
+                value = frozenset(value)
+            conditions.append((field, op, value))
+
+        table.append((
+            rule.get("name", f"rule_{i}"),
+            rule["state"],
+            match,
+            conditions,
+            rule.get("reason", rule["state"])
+        ))
+
+    default = config.get("default", {"state": "normal", "reason": "no_rule_matched"})
+    return table, default
+
+
 class MoodDecisionAgent:
     """
     Combines EmotionAgent + YawnAgent outputs into a simple mood/state decision.
     This is rule-based (no ML), which is totally valid for "agent" behavior.
+
+    Rules live in config/decision_rules.json and are compiled into a
+    decision table once. run() decides one window, run_batch() decides
+    many windows at once on NumPy arrays (for replaying / threshold tuning).
+
+    set_personal_thresholds() replaces the value of >= / > conditions on a
+    field, optionally per window emotion (see agents/calibration.py).
     """
 
+    def __init__(self, rules_path=None, rules: dict = None):
+        config = rules if rules is not None else load_rules(rules_path)
+        self.table, self.default = compile_rules(config)
+        self.states = [row[1] for row in self.table] + [self.default["state"]]
+        self.personal = {}
+
+    def set_personal_thresholds(self, thresholds: dict):
+        """
+        thresholds: {field: value or {emotion: value}}, e.g.
+            {"confidence": {"sad": 72.0, "happy": 64.0}}
+        Emotions without an entry keep the rule's own value.
+        """
+        for field in thresholds:
+            if field not in FEATURE_DEFAULTS:
+                raise ValueError(f"unknown field {field!r}")
+        self.personal = dict(thresholds)
+
+    def _threshold(self, field, op, value, emotion):
+        personal = self.personal.get(field)
+        if personal is None or op not in {">=", ">"}:
+            return value
+        if isinstance(personal, dict):
+            return personal.get(emotion, value)
+        return personal
+
+    def _features(self, emotion_info, yawn_info):
+        return {
+            "emotion": (emotion_info or {}).get("emotion", "unknown"),
+            "confidence": float((emotion_info or {}).get("confidence", 0.0)),
+            "yawn": bool((yawn_info or {}).get("yawn", False)),
+            "duration": float((yawn_info or {}).get("duration", 0.0)),
+            "mar": float((yawn_info or {}).get("mar", 0.0)),
+        }
+
     def run(self, emotion_info, yawn_info):
-        emotion = (emotion_info or {}).get("emotion", "unknown")
-        econf = float((emotion_info or {}).get("confidence", 0.0))
-
-        yawn = bool((yawn_info or {}).get("yawn", False))
-        ydur = float((yawn_info or {}).get("duration", 0.0))
-        mar = float((yawn_info or {}).get("mar", 0.0))
-
-        # ---- RULES ----
-        # Rule 1: If yawning (sustained mouth open), mark as drowsy
-        if yawn or ydur >= 1.6:
-            return {
-                "state": "drowsy",
-                "reason": f"yawn_detected duration={ydur:.1f}s mar={mar:.3f}"
-            }
-
-        # Rule 2: If emotion is confident and negative, mark as stressed
-        negative = {"angry", "fear", "sad", "disgust"}
-        if emotion in negative and econf >= 60.0:
-            return {
-                "state": "stressed",
-                "reason": f"emotion={emotion} conf={econf:.1f}"
-            }
-
-        # Rule 3: If emotion is confident and positive, mark as engaged
-        if emotion == "happy" and econf >= 60.0:
-            return {
-                "state": "engaged",
-                "reason": f"emotion=happy conf={econf:.1f}"
-            }
-
-        # Rule 4: If we have weak/no signals, mark as normal/unknown
-        if emotion == "unknown":
-            return {"state": "unknown", "reason": "no_emotion_detected"}
-
-        return {"state": "normal", "reason": f"emotion={emotion} conf={econf:.1f}"}
-    
-    
\ No newline at end of file
+        f = self._features(emotion_info, yawn_info)
+
+        # ---- RULES (first match wins) ----
+        for _name, state, match, conditions, reason in self.table:
+            hits = (
+                OPS[op](f[field], self._threshold(field, op, value, f["emotion"]))
+                for field, op, value in conditions
+            )
+            if (all if match == "all" else any)(hits):
+                return {"state": state, "reason": reason.format(**f)}
+
+        return {"state": self.default["state"], "reason": self.default.get("reason", "").format(**f)}
+
+    def run_batch(self, features: dict):
+        """
+        Vectorized decision over many windows.
+
+        features: {"emotion": array[str], "confidence": array[float],
+                   "yawn": array[bool], "duration": array[float], "mar": array[float]}
+                  (missing columns use the same defaults as run())
+
+        Returns {"state": array[str], "rule": array[int]}
+        where rule is the index of the matching rule (-1 = default).
+        """
+        import numpy as np
+
+        n = max((len(v) for v in features.values()), default=0)
+        cols = {}
+        for field, default in FEATURE_DEFAULTS.items():
+            if field in features:
+                cols[field] = np.asarray(features[field])
+            else:
+                cols[field] = np.full(n, default)
+
+        rule_idx = np.full(n, -1, dtype=np.int32)
+
+        # Walk the table backwards so earlier rules overwrite later ones
+        for i in range(len(self.table) - 1, -1, -1):
+            _name, _state, match, conditions, _reason = self.table[i]
+
+            mask = np.full(n, match == "all")
+            for field, op, value in conditions:
+                col = cols[field]
+                if op == "in":
+                    hit = np.isin(col, list(value))
+                elif op == "not_in":
+                    hit = ~np.isin(col, list(value))
+                else:
+                    personal = self.personal.get(field) if op in {">=", ">"} else None
+                    if isinstance(personal, dict):
+                        # per-row threshold: the window emotion's entry, else the rule's value
+                        emotions = cols["emotion"]
+                        value = np.select([emotions == e for e in personal], list(personal.values()),
+                                          default=value)
+                    elif personal is not None:
+                        value = personal
+                    hit = OPS[op](col, value)
+
+                mask = (mask & hit) if match == "all" else (mask | hit)
+
+            rule_idx[mask] = i
+
+        states = np.asarray(self.states)[rule_idx]  # -1 -> default (last entry)
+        return {"state": states, "rule": rule_idx}
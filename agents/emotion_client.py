@@ -0,0 +1,244 @@
+import json
+import queue
+import subprocess
+import threading
+from pathlib import Path
+from multiprocessing.connection import Client
+
+from agents.frame_utils import pack_tensor
+
+
+# Shared emotion inference server (emotion_server.py)
+EMOTION_SERVER_ADDRESS = ("127.0.0.1", 6160)
+EMOTION_SERVER_AUTHKEY = b"mood-emotion"
+
+
+class EmotionWorkerClient:
+    """
+    Keeps one emotion_worker.py process alive in emotion_env (--serve mode),
+    so TensorFlow and the DeepFace model are loaded once at startup
+    instead of on every emotion sample.
+
+    start()          -> spawns the worker and waits until its warm-up inference is done
+    analyze()        -> {"emotion": "...", "confidence": ...} or None (image file)
+    analyze_tensor() -> same, for a 48x48 frame_utils.emotion_tensor() (no temp file)
+    """
+
+    def __init__(self, python_exe: Path, worker_script: Path, cwd: Path,
+                 ready_timeout: float = 120.0, request_timeout: float = 30.0):
+        self.python_exe = python_exe
+        self.worker_script = worker_script
+        self.cwd = cwd
+        self.ready_timeout = ready_timeout
+        self.request_timeout = request_timeout
+
+        self.proc = None
+        self._lines = queue.Queue()
+        self._lock = threading.Lock()   # one request at a time on the pipe
+        self._busy = False              # a request is waiting for its answer
+        self._busy_lock = threading.Lock()
+
+    def _reader(self, stream):
+        for line in stream:
+            self._lines.put(line)
+        self._lines.put(None)  # worker exited
+
+    def _next_json(self, timeout: float):
+        """
+        Returns the next JSON object printed by the worker.
+        Non-JSON lines (library logs) are skipped.
+        """
+        while True:
+            line = self._lines.get(timeout=timeout)
+            if line is None:
+                raise RuntimeError("emotion worker exited")
+
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                return json.loads(line)
+            except ValueError:
+                continue
+
+    def start(self):
+        self.proc = subprocess.Popen(
+            [str(self.python_exe), str(self.worker_script), "--serve"],
+            cwd=str(self.cwd),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1
+        )
+        threading.Thread(target=self._reader, args=(self.proc.stdout,), daemon=True).start()
+
+        msg = self._next_json(self.ready_timeout)
+        if not (isinstance(msg, dict) and msg.get("ready")):
+            raise RuntimeError(f"unexpected worker greeting: {msg}")
+
+        return self
+
+    def is_alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def analyze(self, image_path: Path):
+        return self._call({"path": str(image_path)})
+
+    def analyze_tensor(self, tensor):
+        return self._call({"tensor": pack_tensor(tensor)})
+
+    def _call(self, request):
+        with self._lock:
+            if not self.is_alive():
+                print("[EMOTION] Worker is not running")
+                return None
+
+            try:
+                with self._busy_lock:
+                    self._busy = True
+                self.proc.stdin.write(json.dumps(request) + "\n")
+                self.proc.stdin.flush()
+                data = self._next_json(self.request_timeout)
+            except queue.Empty:
+                print("[EMOTION] Worker timed out")
+                self.close()
+                return None
+            except Exception as e:
+                if self.proc is not None:   # not an intentional abort()
+                    print(f"[EMOTION] Error calling worker: {e}")
+                return None
+            finally:
+                with self._busy_lock:
+                    self._busy = False
+
+        if isinstance(data, dict) and "emotion" in data:
+            return data
+
+        if isinstance(data, dict) and "error" in data:
+            print("[EMOTION] Worker failed:", data["error"])
+
+        return None
+
+    def abort(self):
+        """
+        Kills the worker while a request is waiting for its answer, so the
+        running inference stops right away. Returns False (process kept)
+        when it is idle or the answer is already back: killing it then
+        would only cost a respawn.
+        """
+        with self._busy_lock:
+            if not self._busy:
+                return False
+            self.close(kill=True)
+            return True
+
+    def close(self, kill: bool = False):
+        """
+        Stops the worker. kill=True aborts a running inference immediately.
+        """
+        proc = self.proc
+        if proc is None:
+            return
+        self.proc = None
+
+        if kill:
+            proc.kill()
+            # reaped off the caller's thread (cancel() runs in the camera loop), no zombie left
+            threading.Thread(target=self._reap, args=(proc,), daemon=True).start()
+            return
+
+        try:
+            proc.stdin.close()
+        except Exception:
+            pass
+
+        try:
+            proc.wait(timeout=3)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    @staticmethod
+    def _reap(proc):
+        proc.wait()
+        try:
+            proc.stdin.close()
+        except Exception:
+            pass
+
+
+class EmotionServerClient:
+    """
+    Talks to emotion_server.py over a local socket. Thread-safe: several
+    requests can be in flight at once, answers are matched by request id.
+    Faces travel as 48x48 model-input tensors, no temp files.
+    """
+
+    def __init__(self, address=EMOTION_SERVER_ADDRESS, authkey=EMOTION_SERVER_AUTHKEY,
+                 request_timeout: float = 30.0):
+        self.conn = Client(address, authkey=authkey)
+        self.request_timeout = request_timeout
+
+        self._send_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._waiting = {}      # req_id -> queue.Queue(1)
+        self._alive = True
+        threading.Thread(target=self._reader, daemon=True).start()
+
+    def _reader(self):
+        try:
+            while True:
+                msg = self.conn.recv()
+                with self._lock:
+                    slot = self._waiting.pop(msg[1] if msg[0] == "result" else "stats", None)
+                if slot is not None:
+                    slot.put(msg[2] if msg[0] == "result" else msg[1])
+        except (EOFError, OSError):
+            pass
+        finally:
+            self._alive = False
+            with self._lock:
+                for slot in self._waiting.values():
+                    slot.put(None)
+                self._waiting.clear()
+
+    def is_alive(self):
+        return self._alive
+
+    def _request(self, key, msg):
+        slot = queue.Queue(1)
+        with self._lock:
+            self._waiting[key] = slot
+        try:
+            with self._send_lock:
+                self.conn.send(msg)
+            return slot.get(timeout=self.request_timeout)
+        except queue.Empty:
+            print("[EMOTION] Server timed out")
+            return None
+        except (EOFError, OSError) as e:
+            print(f"[EMOTION] Server connection lost: {e}")
+            return None
+        finally:
+            with self._lock:
+                self._waiting.pop(key, None)
+
+    def analyze_tensor(self, tensor):
+        with self._lock:
+            req_id = self._next_id
+            self._next_id += 1
+
+        data = self._request(req_id, ("analyze", req_id, pack_tensor(tensor)))
+        if isinstance(data, dict) and "emotion" in data:
+            return data
+        return None
+
+    def server_stats(self):
+        return self._request("stats", ("stats",))
+
+    def close(self, kill: bool = False):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,231 @@
+import time
+import queue
+import threading
+from pathlib import Path
+
+from agents.emotion_client import EmotionWorkerClient, EmotionServerClient
+from agents.frame_buffers import CropPool
+
+
+class EmotionJob:
+    def __init__(self, job_id: int, window_seq: int, tensor, crop_slot, submitted_ts: float):
+        self.job_id = job_id
+        self.window_seq = window_seq
+        self.tensor = tensor
+        self.crop_slot = crop_slot
+        self.submitted_ts = submitted_ts
+        self.started_ts = None
+        self.latency = None
+        self.cancelled = False
+        self.features = None       # expression features of the sample (cascade training)
+        self.guess = None          # cheap cascade guess for the same sample
+
+
+class EmotionPipeline:
+    """
+    Runs emotion requests on a pool of long-lived emotion workers.
+
+    - submit() turns a face crop into the 48x48 model input and queues
+      it for the current window (never blocks); only that tensor goes
+      to the worker
+    - drain() is called once per frame by the camera loop and returns
+      finished (job, result) pairs; no shared state is touched from
+      worker threads. Cancelled jobs that finished anyway and carry
+      cascade features come back too (job.cancelled set), for learning only
+    - cancel() drops everything that belongs to an old window: queued
+      jobs never start, and a running inference is killed when finishing
+      it would cost more CPU than restarting the worker (policy "auto"),
+      always ("kill") or never ("drop")
+
+    With server_address set, requests go to a shared emotion_server.py
+    (micro-batched there) instead of private worker processes; running
+    requests are then never killed, only dropped. A server that is not
+    up yet (or restarting under the supervisor) is not fatal: each
+    request tries to connect again, and fails fast until it answers.
+    """
+
+    def __init__(self, emotion_python: Path, worker_script: Path, cwd: Path,
+                 workers: int = 1, cancel_policy: str = "auto", server_address=None):
+        if cancel_policy not in {"auto", "kill", "drop"}:
+            raise ValueError(f"cancel_policy must be auto/kill/drop, got {cancel_policy!r}")
+
+        self.emotion_python = emotion_python
+        self.worker_script = worker_script
+        self.cwd = cwd
+        self.n_workers = max(1, workers)
+        self.cancel_policy = cancel_policy if server_address is None else "drop"
+        self.server_address = server_address
+
+        self.clients = [None] * self.n_workers
+        self.running = [None] * self.n_workers     # job currently on each worker
+        self.jobs = queue.Queue()
+        self.crop_pool = CropPool(self.n_workers)   # one reusable tensor buffer per in-flight job
+        self.results = queue.Queue()
+        self.lock = threading.Lock()
+
+        self.window_seq = 0
+        self.next_job_id = 0
+        self.in_flight = 0
+        self.latency_ema = None
+        self.restart_cost = None       # seconds to (re)start a worker incl. warm-up
+        self.stats = {"submitted": 0, "done": 0, "cancelled": 0, "killed": 0}
+
+    # ---- worker lifecycle ----
+    def _spawn(self, i):
+        t0 = time.perf_counter()
+        if self.server_address is not None:
+            client = EmotionServerClient(self.server_address)
+        else:
+            client = EmotionWorkerClient(self.emotion_python, self.worker_script, cwd=self.cwd).start()
+        self.restart_cost = time.perf_counter() - t0
+        self.clients[i] = client
+        return client
+
+    def start(self):
+        errors = []
+
+        def _boot(i):
+            try:
+                self._spawn(i)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=_boot, args=(i,), daemon=True) for i in range(self.n_workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        if errors:
+            if self.server_address is None:
+                raise RuntimeError(f"emotion worker failed to start: {errors[0]}")
+            print(f"[EMOTION] server {self.server_address} not reachable yet ({errors[0]}), "
+                  f"retrying on the next request")
+
+        for i in range(self.n_workers):
+            threading.Thread(target=self._worker_loop, args=(i,), daemon=True).start()
+
+        if not errors:
+            print(f"[EMOTION] {self.n_workers} worker(s) ready")
+        return self
+
+    def _worker_loop(self, i):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+
+            with self.lock:
+                if job.cancelled or job.window_seq != self.window_seq:
+                    self.in_flight -= 1
+                    self.stats["cancelled"] += 1
+                    self.crop_pool.release(job.crop_slot)
+                    continue
+                job.started_ts = time.perf_counter()
+                self.running[i] = job
+
+            emo = None
+            try:
+                client = self.clients[i]
+                if client is None or not client.is_alive():
+                    client = self._spawn(i)
+
+                emo = client.analyze_tensor(job.tensor)
+            except Exception as e:
+                print(f"[EMOTION] Error calling worker: {e}")
+
+            self.crop_pool.release(job.crop_slot)
+            job.tensor = None
+
+            with self.lock:
+                self.running[i] = None
+                self.in_flight -= 1
+                job.latency = time.perf_counter() - job.started_ts
+                if job.cancelled:
+                    self.stats["cancelled"] += 1
+                    # a finished answer still teaches the cascade; job.cancelled
+                    # tells the camera loop to keep it out of the window
+                    if job.features is not None and emo is not None:
+                        self.results.put((job, emo))
+                    continue
+                a = 0.3
+                self.latency_ema = job.latency if self.latency_ema is None else a * job.latency + (1 - a) * self.latency_ema
+                self.stats["done"] += 1
+
+            self.results.put((job, emo))
+
+    # ---- camera-loop API ----
+    def has_capacity(self):
+        with self.lock:
+            return self.in_flight < self.n_workers
+
+    def submit(self, face_crop, window_seq: int, landmarks=None):
+        """
+        Queues the model input for face_crop (aligned on the eyes when its
+        FaceMesh landmarks are given). Returns the job or None when all
+        workers are busy.
+        """
+        with self.lock:
+            if self.in_flight >= self.n_workers:
+                return None
+            slot, tensor = self.crop_pool.tensor(face_crop, landmarks)
+            if slot is None:
+                return None
+            self.window_seq = window_seq
+            job = EmotionJob(self.next_job_id, window_seq, tensor, slot, time.time())
+            self.next_job_id += 1
+            self.in_flight += 1
+            self.stats["submitted"] += 1
+
+        self.jobs.put(job)
+        return job
+
+    def drain(self):
+        out = []
+        while True:
+            try:
+                out.append(self.results.get_nowait())
+            except queue.Empty:
+                return out
+
+    def cancel(self, new_window_seq: int):
+        """
+        Called when the window resets or the face disappears.
+        """
+        to_kill = []
+        with self.lock:
+            self.window_seq = new_window_seq
+            now = time.perf_counter()
+
+            for i, job in enumerate(self.running):
+                if job is None or job.cancelled:
+                    continue
+                job.cancelled = True
+
+                if self.cancel_policy == "kill":
+                    to_kill.append(i)
+                elif self.cancel_policy == "auto" and self.latency_ema is not None and self.restart_cost is not None:
+                    remaining = self.latency_ema - (now - job.started_ts)
+                    if remaining > self.restart_cost:
+                        to_kill.append(i)
+
+        # Killing makes analyze() return None right away; the worker
+        # thread respawns the process before its next job. A job whose
+        # answer came back in the meantime keeps its process (abort()).
+        for i in to_kill:
+            client = self.clients[i]
+            if client is not None and client.abort():
+                self.stats["killed"] += 1
+
+        # Stale results already waiting are dropped too, except those the
+        # cascade learns from (the camera loop skips them for the window)
+        for job, _emo in self.drain():
+            if job.window_seq == new_window_seq or job.features is not None:
+                self.results.put((job, _emo))
+
+    def close(self):
+        for _ in range(self.n_workers):
+            self.jobs.put(None)
+        for client in self.clients:
+            if client is not None:
+                client.close()
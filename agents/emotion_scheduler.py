@@ -0,0 +1,113 @@
+import cv2
+import numpy as np
+
+
+class EmotionSampler:
+    """
+    Decides when to send the next face crop to the emotion worker.
+
+    Instead of a fixed interval it looks at:
+      - measured worker round-trip latency (EMA)
+      - time left in the current window vs. samples still wanted
+      - how much the face crop changed since the last sample
+
+    The interval never drops below latency / cpu_budget, so the worker
+    stays within its CPU share (0.25 = busy at most 25% of the time).
+    """
+
+    THUMB_SIZE = (16, 16)
+
+    def __init__(
+        self,
+        window_seconds: float = 30.0,
+        target_samples: int = 4,        # samples wanted per window
+        cpu_budget: float = 0.25,       # max fraction of wall time spent in inference
+        min_interval: float = 1.0,
+        max_interval: float = 8.0,
+        change_threshold: float = 0.12, # mean abs diff (0..1) that triggers an early sample
+        still_threshold: float = 0.03,  # below this the face is "unchanged" -> stretch interval
+        latency_alpha: float = 0.3
+    ):
+        self.window_seconds = window_seconds
+        self.target_samples = target_samples
+        self.cpu_budget = cpu_budget
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.change_threshold = change_threshold
+        self.still_threshold = still_threshold
+        self.latency_alpha = latency_alpha
+
+        self.latency_ema = None
+        self.last_sample_ts = 0.0
+        self.last_thumb = None
+        self.samples_taken = 0
+        self.last_change = 0.0
+        self.last_interval = max_interval
+
+    def record_latency(self, seconds: float):
+        if self.latency_ema is None:
+            self.latency_ema = seconds
+        else:
+            a = self.latency_alpha
+            self.latency_ema = a * seconds + (1 - a) * self.latency_ema
+
+    def reset_window(self):
+        self.samples_taken = 0
+        self.last_sample_ts = 0.0
+        self.last_thumb = None
+
+    def _thumb(self, face_crop_bgr):
+        gray = cv2.cvtColor(face_crop_bgr, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, self.THUMB_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32) / 255.0
+
+    def _change(self, thumb):
+        if self.last_thumb is None:
+            return 1.0
+        return float(np.mean(np.abs(thumb - self.last_thumb)))
+
+    def budget_interval(self):
+        if self.latency_ema is None:
+            return self.min_interval
+        return self.latency_ema / max(self.cpu_budget, 1e-3)
+
+    def planned_interval(self, remaining: float):
+        """
+        Interval that spreads the remaining wanted samples over the rest
+        of the window, limited by the CPU budget.
+        """
+        wanted = max(1, self.target_samples - self.samples_taken)
+        interval = max(remaining / wanted, self.budget_interval())
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def should_sample(self, now: float, remaining: float, face_crop_bgr):
+        since_last = now - self.last_sample_ts
+        budget = max(self.min_interval, self.budget_interval())
+        if since_last < budget:
+            return False
+
+        # A result that arrives after the window closed is wasted work
+        if self.latency_ema is not None and remaining < self.latency_ema:
+            return False
+
+        interval = self.planned_interval(remaining)
+        thumb = self._thumb(face_crop_bgr)
+        change = self._change(thumb)
+        self.last_change = change
+
+        if change >= self.change_threshold:
+            due = True                              # expression moved: sample early
+        elif change < self.still_threshold and self.samples_taken > 0:
+            due = since_last >= min(self.max_interval, interval * 2)   # nothing changed
+        else:
+            due = since_last >= interval
+
+        self.last_interval = interval
+        if due:
+            self.last_sample_ts = now
+            self.last_thumb = thumb
+            self.samples_taken += 1
+        return due
+
+    def status_text(self):
+        lat = f"{self.latency_ema:.2f}s" if self.latency_ema is not None else "n/a"
+        return f"int={self.last_interval:.1f}s lat={lat} chg={self.last_change:.2f}"
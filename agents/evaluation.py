@@ -0,0 +1,366 @@
+import json
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+
+VIDEO_EXTS = (".mp4", ".avi", ".mov", ".mkv")
+
+NEGATIVE_EMOTIONS = ("angry", "fear", "sad", "disgust")
+YAWN_MATCH_SLACK = 1.0   # a detection up to this long after a labeled yawn ends still counts
+
+
+class LabeledClip:
+    """
+    One video plus its labels, stored side by side:
+
+        clips/yawn_01.mp4
+        clips/yawn_01.json
+
+    Label file (times in seconds from the start of the clip):
+        {
+          "yawns":       [[12.0, 15.5], ...],
+          "expressions": [[20.0, 28.0, "happy"], ...],
+          "absent":      [[40.0, 47.0], ...]
+        }
+    Missing keys mean "nothing of that kind in the clip".
+    """
+
+    def __init__(self, video_path: Path, label_path: Path):
+        self.video_path = Path(video_path)
+        self.name = self.video_path.stem
+
+        with open(label_path, "r", encoding="utf-8") as f:
+            labels = json.load(f)
+        self.yawns = [tuple(map(float, y)) for y in labels.get("yawns", [])]
+        self.expressions = [(float(s), float(e), str(lab)) for s, e, lab in labels.get("expressions", [])]
+        self.absent = [tuple(map(float, a)) for a in labels.get("absent", [])]
+
+    def present_at(self, ts):
+        return not any(s <= ts < e for s, e in self.absent)
+
+    def expression_at(self, ts):
+        for s, e, lab in self.expressions:
+            if s <= ts < e:
+                return lab
+        return None
+
+
+def load_clips(clip_dir):
+    clips = []
+    for p in sorted(Path(clip_dir).iterdir()):
+        if p.suffix.lower() in VIDEO_EXTS and p.with_suffix(".json").exists():
+            clips.append(LabeledClip(p, p.with_suffix(".json")))
+    return clips
+
+
+def run_perception(clip: LabeledClip, scale: float, detect_width: int, mesh_every: int,
+                   roi_margin: float = 0.4, emotion_fn=None, emotion_cache=None,
+                   emotion_grid: float = 0.5, unified: bool = False, detect_every: int = 1):
+    """
+    Runs face detection + FaceMesh over one clip the way final_agent does
+    (downscaled detection on every detect_every-th frame with the last
+    bbox reused in between, FaceMesh on the full-res face ROI every
+    mesh_every-th frame) and records a per-frame trace. unified=True uses
+    the single-graph FaceMeshAgent instead (bbox and MAR from one pass;
+    detect_width, detect_every and mesh_every do not apply).
+
+    Decoding and the resize to `scale` (standing in for a lower capture
+    resolution) are not counted; only the pipeline itself is timed.
+
+    emotion_fn(crop) -> {"emotion", "confidence"} | None is called on a
+    fixed time grid while a face is present; results go to emotion_cache
+    (grid index -> (ts, result, seconds)) and are reused by later
+    configurations with the same scale.
+
+    Returns {"ts", "face", "mar", "frame_ms", "cpu_s", "duration"}.
+    """
+    from agents.sensor_agent import FaceDetectionAgent
+    from agents.yawn_agent import YawnAgent
+    from agents.frame_utils import clamp_crop, expand_bbox
+
+    if unified:
+        from agents.face_mesh_agent import FaceMeshAgent
+        face_agent = FaceMeshAgent()
+        yawn_agent = None
+    else:
+        face_agent = FaceDetectionAgent(min_detect_width=min(160, detect_width), max_detect_width=detect_width)
+        yawn_agent = YawnAgent(use_mesh=True)
+
+    cap = cv2.VideoCapture(str(clip.video_path))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    ts_list, face_list, mar_list, frame_ms = [], [], [], []
+    cpu_s = 0.0
+    idx = 0
+    last_bbox = None
+
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            ts = idx / fps
+            if scale != 1.0:
+                frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+            c0 = time.process_time()
+            t0 = time.perf_counter()
+
+            if detect_every > 1 and last_bbox is not None and not unified and idx % detect_every:
+                bbox = last_bbox
+            else:
+                bbox = face_agent.run(frame)
+            last_bbox = bbox
+            mar = np.nan
+            if unified:
+                if face_agent.last["mar"] is not None:
+                    mar = face_agent.last["mar"]
+            elif bbox is not None and idx % mesh_every == 0:
+                roi = clamp_crop(frame, expand_bbox(bbox, roi_margin))
+                if roi is not None:
+                    m = yawn_agent.measure(roi)
+                    if m is not None:
+                        mar = m
+
+            frame_ms.append((time.perf_counter() - t0) * 1000.0)
+            cpu_s += time.process_time() - c0
+
+            ts_list.append(ts)
+            face_list.append(bbox is not None)
+            mar_list.append(mar)
+
+            if emotion_fn is not None and bbox is not None:
+                g = int(ts / emotion_grid)
+                if g not in emotion_cache:
+                    crop = clamp_crop(frame, bbox)
+                    if crop is not None:
+                        e0 = time.perf_counter()
+                        emo = emotion_fn(crop)
+                        emotion_cache[g] = (ts, emo, time.perf_counter() - e0)
+
+            idx += 1
+    finally:
+        cap.release()
+
+    return {
+        "ts": np.array(ts_list),
+        "face": np.array(face_list, dtype=bool),
+        "mar": np.array(mar_list, dtype=np.float64),
+        "frame_ms": np.array(frame_ms),
+        "cpu_s": cpu_s,
+        "duration": idx / fps,
+    }
+
+
+def _window_truth(clip, start, end):
+    if any(s < end and e > start for s, e in clip.yawns):
+        return "drowsy"
+
+    overlap = {}
+    for s, e, lab in clip.expressions:
+        o = min(e, end) - max(s, start)
+        if o > 0:
+            overlap[lab] = overlap.get(lab, 0.0) + o
+    if not overlap:
+        return "normal"
+
+    lab = max(overlap, key=overlap.get)
+    if lab in NEGATIVE_EMOTIONS:
+        return "stressed"
+    if lab == "happy":
+        return "engaged"
+    return "normal"
+
+
+def score_clip(clip: LabeledClip, trace, emotion_cache, emotion_interval: float,
+               window_seconds: float, emotion_grid: float = 0.5, decision_agent=None):
+    """
+    Replays one perception trace with a given emotion sampling interval
+    and window length (same window/reset rules as final_agent) and counts
+    hits against the labels. Returns raw counts so clips can be summed.
+    """
+    from agents.yawn_agent import YawnAgent
+    from agents.decision_agent import MoodDecisionAgent
+    from agents.window_state import summarize_emotions
+
+    yawn_agent = YawnAgent(use_mesh=False)
+    decision_agent = decision_agent or MoodDecisionAgent()
+
+    c = {
+        "presence_tp": 0, "presence_fp": 0, "presence_fn": 0,
+        "yawn_labels": len(clip.yawns), "yawn_detections": 0, "yawn_hits": 0, "yawn_delays": [],
+        "emo_samples": 0, "emo_labeled": 0, "emo_correct": 0,
+        "expr_labels": len(clip.expressions) if emotion_cache is not None else 0, "expr_hits": 0,
+        "windows": 0, "windows_correct": 0, "alert_delays": [],
+    }
+
+    yawn_events = []
+    samples_ok_in = set()
+    window_start = None
+    last_sample = None
+    samples = []
+    yawn_any = False
+    max_dur = 0.0
+    max_mar = 0.0
+    drowsy_window_ends = []
+
+    for ts, face, mar in zip(trace["ts"].tolist(), trace["face"].tolist(), trace["mar"].tolist()):
+        truth_present = clip.present_at(ts)
+        if face and truth_present:
+            c["presence_tp"] += 1
+        elif face:
+            c["presence_fp"] += 1
+        elif truth_present:
+            c["presence_fn"] += 1
+
+        if not face:
+            window_start = None
+            yawn_agent.reset()
+            continue
+
+        if window_start is None:
+            window_start = ts
+            last_sample = None
+            samples = []
+            yawn_any, max_dur, max_mar = False, 0.0, 0.0
+
+        if mar == mar:
+            before = yawn_agent.yawn_count
+            out = yawn_agent.update(mar, ts)
+            if yawn_agent.yawn_count > before:
+                yawn_events.append(ts)
+            yawn_any = yawn_any or out["yawn"]
+            max_dur = max(max_dur, out["duration"])
+            max_mar = max(max_mar, out["mar"])
+
+        if last_sample is None or ts - last_sample >= emotion_interval:
+            cached = emotion_cache.get(int(ts / emotion_grid)) if emotion_cache is not None else None
+            if cached is not None:
+                last_sample = ts
+                _ts, emo, _seconds = cached
+                c["emo_samples"] += 1
+                if emo:
+                    samples.append(emo)
+                label = clip.expression_at(ts)
+                if label is not None:
+                    c["emo_labeled"] += 1
+                    if emo and emo.get("emotion") == label:
+                        c["emo_correct"] += 1
+                        samples_ok_in.update(
+                            i for i, (s, e, _lab) in enumerate(clip.expressions) if s <= ts < e
+                        )
+
+        if ts - window_start >= window_seconds:
+            decision = decision_agent.run(
+                summarize_emotions(samples),
+                {"yawn": yawn_any, "duration": max_dur, "mar": max_mar}
+            )
+            c["windows"] += 1
+            c["windows_correct"] += decision["state"] == _window_truth(clip, window_start, ts)
+            if decision["state"] == "drowsy":
+                drowsy_window_ends.append(ts)
+
+            window_start = ts
+            last_sample = None
+            samples = []
+            yawn_any, max_dur, max_mar = False, 0.0, 0.0
+
+    # Yawn events: each labeled yawn matches at most one detection
+    matched = set()
+    c["yawn_detections"] = len(yawn_events)
+    for t in yawn_events:
+        for i, (s, e) in enumerate(clip.yawns):
+            if i not in matched and s <= t <= e + YAWN_MATCH_SLACK:
+                matched.add(i)
+                c["yawn_hits"] += 1
+                c["yawn_delays"].append(t - s)
+                break
+
+    # Alert delay: labeled yawn start -> end of the first drowsy window after it
+    for s, _e in clip.yawns:
+        later = [t for t in drowsy_window_ends if t >= s]
+        if later:
+            c["alert_delays"].append(later[0] - s)
+
+    c["expr_hits"] = len(samples_ok_in)
+    return c
+
+
+def _ratio(num, den):
+    return num / den if den else None
+
+
+def _f1(p, r):
+    if p is None or r is None or p + r == 0:
+        return None
+    return 2 * p * r / (p + r)
+
+
+def emotion_seconds_per_sample(emotion_caches):
+    """
+    Median measured emotion inference time over all cached calls (the
+    first call, with TensorFlow's graph build, would skew a mean).
+    """
+    seconds = [s for cache in emotion_caches for _ts, _emo, s in cache.values()]
+    return float(np.median(seconds)) if seconds else 0.0
+
+
+def summarize(counts, cpu_s, frame_ms, video_s, emotion_s_per_sample=0.0):
+    """
+    Sums per-clip counts into precision/recall/F1 per task plus cost.
+    Entries without any labels are None.
+
+    Cost is per second of video for both parts: perception CPU
+    (cpu_s over all frames) and emotion inference (samples taken x
+    emotion_s_per_sample, the same per-sample price for every
+    configuration). cpu_ms_per_s is their sum.
+    """
+    t = {}
+    for c in counts:
+        for k, v in c.items():
+            if isinstance(v, list):
+                t.setdefault(k, []).extend(v)
+            else:
+                t[k] = t.get(k, 0) + v
+
+    presence_p = _ratio(t["presence_tp"], t["presence_tp"] + t["presence_fp"])
+    presence_r = _ratio(t["presence_tp"], t["presence_tp"] + t["presence_fn"])
+    yawn_p = _ratio(t["yawn_hits"], t["yawn_detections"])
+    yawn_r = _ratio(t["yawn_hits"], t["yawn_labels"])
+    emo_p = _ratio(t["emo_correct"], t["emo_labeled"])
+    emo_r = _ratio(t["expr_hits"], t["expr_labels"])
+
+    video_s = max(video_s, 1e-9)
+    perception_ms = 1000.0 * cpu_s / video_s
+    emotion_ms = 1000.0 * t["emo_samples"] * emotion_s_per_sample / video_s
+    return {
+        "presence_p": presence_p, "presence_r": presence_r, "presence_f1": _f1(presence_p, presence_r),
+        "yawn_p": yawn_p, "yawn_r": yawn_r, "yawn_f1": _f1(yawn_p, yawn_r),
+        "emotion_p": emo_p, "emotion_r": emo_r, "emotion_f1": _f1(emo_p, emo_r),
+        "window_acc": _ratio(t["windows_correct"], t["windows"]),
+        "yawn_delay_s": float(np.median(t["yawn_delays"])) if t["yawn_delays"] else None,
+        "alert_delay_s": float(np.median(t["alert_delays"])) if t["alert_delays"] else None,
+        "perception_ms_per_s": perception_ms,
+        "emotion_ms_per_s": emotion_ms,
+        "cpu_ms_per_s": perception_ms + emotion_ms,
+        "frame_ms_p95": float(np.percentile(frame_ms, 95)) if len(frame_ms) else 0.0,
+        "emotion_samples": t["emo_samples"],
+    }
+
+
+def pareto_front(rows, cost_key, quality_key):
+    """
+    Marks rows that no other row beats on both cost (lower) and quality (higher).
+    """
+    for r in rows:
+        q = r[quality_key]
+        r["pareto"] = q is not None and not any(
+            o is not r and o[quality_key] is not None
+            and o[cost_key] <= r[cost_key] and o[quality_key] >= q
+            and (o[cost_key] < r[cost_key] or o[quality_key] > q)
+            for o in rows
+        )
+    return rows
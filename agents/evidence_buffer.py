@@ -0,0 +1,173 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from agents.frame_utils import clamp_crop, expand_bbox
+
+
+class EvidenceBuffer:
+    """
+    Short pre-event video snippets for drowsy / stress decisions.
+
+    The camera loop calls add() every frame. At most `fps` frames per
+    second are kept, downscaled to max_width and JPEG-compressed, in a
+    ring of the last `seconds` seconds (a 320 px JPEG is ~10-20 KB, so
+    10 s at 5 fps is well under 1 MB). max_bytes caps the ring anyway
+    (noisy, high-detail frames compress badly): the oldest frames go
+    first. With crop_margin set, only the face crop (bbox + margin) is
+    kept instead of the whole frame.
+
+    When on_decision() sees one of `states`, the current ring is handed
+    to a background thread that decodes it and writes
+        <out_dir>/<time>_<state>.mp4  + .json (decision, frame times)
+    so the camera loop never waits for video encoding. Per state at most
+    one clip per min_gap seconds is written, and only the newest
+    max_clips clips are kept on disk.
+    """
+
+    def __init__(self, out_dir, states=("drowsy", "stressed"), seconds=10.0, fps=5.0,
+                 max_width=320, jpeg_quality=70, crop_margin=None, min_gap=60.0, max_clips=50,
+                 max_bytes=4 * 1024 * 1024):
+        self.out_dir = Path(out_dir)
+        self.states = set(states)
+        self.seconds = seconds
+        self.fps = fps
+        self.max_width = max_width
+        self.jpeg_params = [int(cv2.IMWRITE_JPEG_QUALITY), int(jpeg_quality)]
+        self.crop_margin = crop_margin
+        self.min_gap = min_gap
+        self.max_clips = max_clips
+        self.max_bytes = max_bytes
+
+        self.max_frames = max(1, int(seconds * fps))
+        self.ring = deque()         # (ts, jpeg bytes)
+        self.ring_bytes = 0
+        self.last_add_ts = 0.0
+        self.last_clip_ts = {}       # state -> ts of the last clip
+        self.stats = {"frames": 0, "clips": 0, "skipped": 0}
+
+        self.jobs = queue.Queue(maxsize=2)
+        self.thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self.thread.start()
+
+    # ---- camera loop side ----
+    def add(self, frame, ts, bbox=None):
+        if ts - self.last_add_ts < 0.95 / self.fps:   # slack for camera timestamp jitter
+            return
+        if self.crop_margin is not None:
+            if bbox is None:
+                return
+            frame = clamp_crop(frame, expand_bbox(bbox, self.crop_margin))
+            if frame is None:
+                return
+        self.last_add_ts = ts
+
+        h, w = frame.shape[:2]
+        if w > self.max_width:
+            frame = cv2.resize(frame, (self.max_width, max(1, int(h * self.max_width / w))),
+                               interpolation=cv2.INTER_AREA)
+        ok, jpg = cv2.imencode(".jpg", frame, self.jpeg_params)
+        if ok:
+            data = jpg.tobytes()
+            self.ring.append((ts, data))
+            self.ring_bytes += len(data)
+            self.stats["frames"] += 1
+
+        # drop frames older than the window (after a pause in add() calls),
+        # beyond the frame count and beyond the byte cap (the newest frame stays)
+        while self.ring and (ts - self.ring[0][0] > self.seconds or len(self.ring) > self.max_frames
+                             or (self.ring_bytes > self.max_bytes and len(self.ring) > 1)):
+            self.ring_bytes -= len(self.ring.popleft()[1])
+
+    def memory_bytes(self):
+        return self.ring_bytes
+
+    def on_decision(self, decision, ts):
+        """Queues a clip of the buffered frames if decision['state'] is configured."""
+        state = (decision or {}).get("state")
+        if state not in self.states or not self.ring:
+            return False
+        if ts - self.last_clip_ts.get(state, -1e18) < self.min_gap:
+            return False
+
+        job = {"state": state, "reason": decision.get("reason", ""), "ts": ts, "frames": list(self.ring)}
+        try:
+            self.jobs.put_nowait(job)
+        except queue.Full:
+            self.stats["skipped"] += 1
+            print(f"[EVIDENCE] Writer busy, {state} clip skipped")
+            return False
+        self.last_clip_ts[state] = ts
+        return True
+
+    # ---- writer thread ----
+    def _writer_loop(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            try:
+                self._write_clip(job)
+            except Exception as e:
+                print(f"[EVIDENCE] Clip failed: {e}")
+
+    def _write_clip(self, job):
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y-%m-%d_%H%M%S", time.localtime(job["ts"]))
+        base = self.out_dir / f"{stamp}_{job['state']}"
+
+        size = None
+        writer = None
+        try:
+            for _ts, jpg in job["frames"]:
+                img = cv2.imdecode(np.frombuffer(jpg, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if img is None:
+                    continue
+                if size is None:
+                    size = (img.shape[1], img.shape[0])
+                    writer = cv2.VideoWriter(str(base.with_suffix(".mp4")),
+                                             cv2.VideoWriter_fourcc(*"mp4v"), self.fps, size)
+                elif (img.shape[1], img.shape[0]) != size:
+                    img = cv2.resize(img, size, interpolation=cv2.INTER_AREA)    # face crops vary in size
+                writer.write(img)
+        finally:
+            if writer is not None:
+                writer.release()
+
+        meta = {
+            "state": job["state"],
+            "reason": job["reason"],
+            "decision_ts": job["ts"],
+            "frame_ts": [ts for ts, _jpg in job["frames"]],
+            "fps": self.fps,
+        }
+        with open(base.with_suffix(".json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+        self.stats["clips"] += 1
+        print(f"[EVIDENCE] Saved {base.with_suffix('.mp4').name} ({len(job['frames'])} frames)")
+
+        clips = sorted(self.out_dir.glob("*.mp4"))
+        for old in clips[:max(0, len(clips) - self.max_clips)]:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".json").unlink(missing_ok=True)
+
+    def close(self, timeout=10.0):
+        """
+        Finishes queued clips, then stops the writer thread. Returns after
+        at most `timeout` seconds even if the writer is stuck (clips still
+        queued then are lost; the thread is a daemon).
+        """
+        deadline = time.monotonic() + timeout
+        try:
+            self.jobs.put(None, timeout=timeout)    # both slots may hold pending clips
+        except queue.Full:
+            print("[EVIDENCE] Writer busy at shutdown, queued clips dropped")
+            return
+        self.thread.join(timeout=max(0.0, deadline - time.monotonic()))
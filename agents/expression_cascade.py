@@ -0,0 +1,194 @@
+import math
+
+import numpy as np
+
+
+# FaceMesh landmark indices used by the geometric features
+L_EYE_OUT, R_EYE_OUT = 33, 263           # eye corners (face scale)
+MOUTH_L, MOUTH_R = 61, 291               # mouth corners
+LIP_UP, LIP_LO = 13, 14                  # inner lip centre
+L_BROW, R_BROW = 105, 334                # mid brow
+L_LID, R_LID = 159, 386                  # upper eyelid
+L_BROW_IN, R_BROW_IN = 55, 285           # inner brow ends
+L_EYE = (33, 160, 158, 133, 153, 144)    # corner, top x2, corner, bottom x2
+R_EYE = (362, 385, 387, 263, 373, 380)
+
+FEATURE_NAMES = ["mouth_curve", "mouth_width", "mouth_open", "brow_raise", "brow_gap", "eye_open"]
+
+
+def expression_features(landmarks, w: int, h: int):
+    """
+    Small scale-free feature vector from one FaceMesh landmark list
+    (normalized coords of the image the mesh ran on, w x h pixels).
+    Distances are divided by the outer eye-corner distance.
+    """
+    def p(i):
+        return (landmarks[i].x * w, landmarks[i].y * h)
+
+    scale = max(math.dist(p(L_EYE_OUT), p(R_EYE_OUT)), 1e-6)
+
+    ml, mr, up, lo = p(MOUTH_L), p(MOUTH_R), p(LIP_UP), p(LIP_LO)
+    centre_y = 0.5 * (up[1] + lo[1])
+    corners_y = 0.5 * (ml[1] + mr[1])
+
+    def ear(idx):
+        c1, t1, t2, c2, b2, b1 = (p(i) for i in idx)
+        return (math.dist(t1, b1) + math.dist(t2, b2)) / max(2.0 * math.dist(c1, c2), 1e-6)
+
+    return np.array([
+        (centre_y - corners_y) / scale,                                      # > 0: corners up (smile)
+        math.dist(ml, mr) / scale,
+        math.dist(up, lo) / max(math.dist(ml, mr), 1e-6),                    # MAR
+        0.5 * (math.dist(p(L_BROW), p(L_LID)) + math.dist(p(R_BROW), p(R_LID))) / scale,
+        math.dist(p(L_BROW_IN), p(R_BROW_IN)) / scale,                       # small: frown
+        0.5 * (ear(L_EYE) + ear(R_EYE)),
+    ], dtype=np.float64)
+
+
+class ExpressionCascade:
+    """
+    Cheap first stage in front of DeepFace.
+
+    A Gaussian naive-Bayes classifier over expression_features() is
+    trained online from DeepFace's own answers for this user. Once it
+    has seen enough examples, a sample is answered from landmarks alone
+    when
+      - the top class posterior is >= confidence, and
+      - the features did not jump (max z-score change < change_z)
+        since the last sample.
+    Everything else (and every audit_every-th confident hit, to keep
+    measuring agreement) goes to DeepFace, and the answer is learned.
+
+    The posterior only decides whether the cheap stage is sure. The
+    reported "confidence" is on DeepFace's scale: the mean confidence
+    DeepFace gave this user's examples of that emotion. A cascade hit
+    therefore clears the decision rules' confidence cut-offs about as
+    often as DeepFace's own answers would.
+
+        cheap = cascade.classify(feats)       # {"emotion", "confidence"} or None
+        guess = cascade.last_guess            # best cheap guess, even if not sure
+        ...
+        cascade.learn(feats, deepface_result, guess)
+
+    guess = {"emotion", "confidence" (DeepFace scale), "posterior" (0..1), "source": "cascade"}
+    """
+
+    def __init__(self, labels=None, confidence: float = 0.85, change_z: float = 2.5,
+                 min_class_samples: int = 5, audit_every: int = 10, report_every: int = 20):
+        self.labels = list(labels or ["angry", "disgust", "fear", "happy", "sad", "surprise", "neutral"])
+        self.confidence = confidence
+        self.change_z = change_z
+        self.min_class_samples = min_class_samples
+        self.audit_every = audit_every
+        self.report_every = report_every
+
+        n, d = len(self.labels), len(FEATURE_NAMES)
+        self.count = np.zeros(n)
+        self.mean = np.zeros((n, d))
+        self.m2 = np.zeros((n, d))       # Welford sum of squares
+        self.conf_sum = np.zeros(n)      # DeepFace confidence of the learned examples
+
+        self.last_feats = None
+        self.last_guess = None
+        self.hits_since_audit = 0
+        # checked = confident cheap guesses that DeepFace also answered
+        self.stats = {"samples": 0, "hits": 0, "deepface": 0, "audits": 0, "checked": 0, "agree": 0}
+
+    # ---- model ----
+    def _var(self):
+        # per-class variance with a floor (also covers classes with 1 sample)
+        var = self.m2 / np.maximum(self.count - 1, 1)[:, None]
+        return np.maximum(var, 1e-4)
+
+    def _posterior(self, feats):
+        known = self.count >= self.min_class_samples
+        if known.sum() < 2:
+            return None
+
+        var = self._var()[known]
+        log_lik = -0.5 * np.sum(np.log(2 * np.pi * var) + (feats - self.mean[known]) ** 2 / var, axis=1)
+        log_post = log_lik + np.log(self.count[known] / self.count[known].sum())
+        log_post -= log_post.max()
+        post = np.exp(log_post)
+        post /= post.sum()
+
+        labels = [lab for lab, k in zip(self.labels, known) if k]
+        return labels, post
+
+    def _jumped(self, feats):
+        if self.last_feats is None:
+            return True
+        known = self.count > 1
+        if not known.any():
+            return True
+        # spread of the features across everything seen so far
+        std = np.sqrt(np.average(self._var()[known], axis=0, weights=self.count[known]))
+        return float(np.max(np.abs(feats - self.last_feats) / std)) >= self.change_z
+
+    # ---- cascade API ----
+    def classify(self, feats):
+        """
+        Returns {"emotion", "confidence", "source": "cascade"} when the cheap
+        stage is sure, else None (send the sample to DeepFace).
+        """
+        self.stats["samples"] += 1
+        jumped = self._jumped(feats)
+        self.last_feats = feats
+
+        res = self._posterior(feats)
+        guess = None
+        if res is not None:
+            labels, post = res
+            i = int(np.argmax(post))
+            k = self.labels.index(labels[i])
+            guess = {"emotion": labels[i], "confidence": float(self.conf_sum[k] / self.count[k]),
+                     "posterior": float(post[i]), "source": "cascade"}
+        self.last_guess = guess
+
+        if guess is None or jumped or guess["posterior"] < self.confidence:
+            self.stats["deepface"] += 1
+            self._maybe_report()
+            return None
+
+        if self.hits_since_audit >= self.audit_every:
+            # confident, but check it against DeepFace now and then
+            self.hits_since_audit = 0
+            self.stats["deepface"] += 1
+            self.stats["audits"] += 1
+            self._maybe_report()
+            return None
+
+        self.hits_since_audit += 1
+        self.stats["hits"] += 1
+        self._maybe_report()
+        return guess
+
+    def learn(self, feats, emo, guess=None):
+        """
+        Adds a DeepFace answer as a training example. guess is the cheap
+        stage's prediction for the same sample (if it had one).
+        """
+        if not emo or emo.get("emotion") not in self.labels:
+            return
+
+        if guess is not None and guess["posterior"] >= self.confidence:
+            self.stats["checked"] += 1
+            self.stats["agree"] += guess["emotion"] == emo["emotion"]
+
+        i = self.labels.index(emo["emotion"])
+        self.count[i] += 1
+        delta = feats - self.mean[i]
+        self.mean[i] += delta / self.count[i]
+        self.m2[i] += delta * (feats - self.mean[i])
+        self.conf_sum[i] += float(emo.get("confidence", 0.0))
+
+    def _maybe_report(self):
+        if self.stats["samples"] % self.report_every == 0:
+            print(f"[CASCADE] {self.status_text()}")
+
+    def status_text(self):
+        s = self.stats
+        hit_rate = s["hits"] / max(s["samples"], 1)
+        agree = f"{s['agree'] / s['checked']:.0%}" if s["checked"] else "n/a"
+        return (f"samples={s['samples']} hit_rate={hit_rate:.0%} deepface={s['deepface']} "
+                f"audits={s['audits']} agreement={agree}")
@@ -0,0 +1,125 @@
+import math
+
+import cv2
+import numpy as np
+
+from agents.frame_buffers import ReusableBuffer
+from agents.yawn_agent import YawnAgent
+
+
+class FaceMeshAgent:
+    """
+    Combined perception: one FaceMesh graph (tracking mode) per frame
+    instead of FaceDetection + FaceMesh.
+
+    run(frame) keeps the FaceDetectionAgent contract (full-resolution
+    (x, y, w, h) or None). The bbox is the landmark extent, and the mouth
+    and eye metrics of the same landmark set are kept in self.last:
+        {"bbox", "score", "mouth", "mar", "ear", "landmarks"}
+    landmarks = (FaceMesh landmark list, w, h), as YawnAgent.last_landmarks.
+    mouth = (UP, LO, LC, RC) pixel points as returned by
+    YawnAgent.mouth_points, mar via YawnAgent.mar_from_points, so the
+    yawn timer (YawnAgent(use_mesh=False).update) works unchanged.
+
+    FaceMesh has no detection score; "score" is the share of landmarks
+    inside the image (1.0 = whole face visible).
+
+    In tracking mode FaceMesh only runs its own face detector when it
+    loses the face, so most frames cost one landmark pass.
+
+    mesh: any object with FaceMesh's process(rgb) (tests pass a scripted
+    one); None builds the MediaPipe graph.
+    """
+
+    # Landmark indices (MediaPipe FaceMesh)
+    MOUTH = (13, 14, 61, 291)                      # same points as YawnAgent
+    LEFT_EYE = (33, 160, 158, 133, 153, 144)       # corner, top x2, corner, bottom x2
+    RIGHT_EYE = (362, 385, 387, 263, 373, 380)
+
+    def __init__(self, max_input_width: int = 640, min_score: float = 0.5, mesh=None):
+        if mesh is None:
+            # imported here so a scripted mesh works without mediapipe
+            import mediapipe as mp
+
+            mesh = mp.solutions.face_mesh.FaceMesh(
+                static_image_mode=False,
+                max_num_faces=1,
+                refine_landmarks=False,    # iris points are not needed for bbox/mouth/eyes
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5
+            )
+        self.mesh = mesh
+        self.max_input_width = max_input_width
+        self.min_score = min_score
+        self.last = self._empty()
+
+        self._small_buf = ReusableBuffer()
+        self._rgb_buf = ReusableBuffer()
+        self._pts = np.empty((468, 2), dtype=np.float32)
+
+    @staticmethod
+    def _empty():
+        return {"bbox": None, "score": 0.0, "mouth": None, "mar": None, "ear": None, "landmarks": None}
+
+    @staticmethod
+    def _ear(p, idx):
+        # eye aspect ratio: mean lid distance / eye width
+        c1, t1, t2, c2, b2, b1 = (p[i] for i in idx)
+        vertical = math.dist(t1, b1) + math.dist(t2, b2)
+        return vertical / max(2.0 * math.dist(c1, c2), 1e-6)
+
+    def run(self, frame_bgr):
+        h, w = frame_bgr.shape[:2]
+
+        # Landmarks are normalized, so the mesh can run on a smaller copy
+        if w > self.max_input_width:
+            in_w = self.max_input_width
+            in_h = max(1, int(h * in_w / w))
+            small = self._small_buf.view((in_h, in_w, 3))
+            cv2.resize(frame_bgr, (in_w, in_h), dst=small, interpolation=cv2.INTER_AREA)
+        else:
+            small = frame_bgr
+
+        frame_rgb = self._rgb_buf.view(small.shape)
+        cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=frame_rgb)
+        res = self.mesh.process(frame_rgb)
+
+        if not res.multi_face_landmarks:
+            self.last = self._empty()
+            return None
+
+        lm = res.multi_face_landmarks[0].landmark
+        pts = self._pts
+        for i in range(len(pts)):
+            pts[i, 0] = lm[i].x
+            pts[i, 1] = lm[i].y
+
+        inside = (pts >= 0.0) & (pts <= 1.0)
+        score = float(np.count_nonzero(inside.all(axis=1))) / len(pts)
+        if score < self.min_score:
+            self.last = self._empty()
+            return None
+
+        # normalized -> full-resolution pixels
+        px = pts * (w, h)
+        x1, y1 = np.clip(px.min(axis=0), 0, (w - 1, h - 1))
+        x2, y2 = np.clip(px.max(axis=0), 0, (w - 1, h - 1))
+        bbox = (int(x1), int(y1), max(int(x2 - x1), 1), max(int(y2 - y1), 1))
+
+        p = px.tolist()
+        mouth = tuple(tuple(p[i]) for i in self.MOUTH)
+        mar = YawnAgent.mar_from_points(mouth)
+        ear = 0.5 * (self._ear(p, self.LEFT_EYE) + self._ear(p, self.RIGHT_EYE))
+
+        self.last = {"bbox": bbox, "score": score, "mouth": mouth, "mar": mar, "ear": ear,
+                     "landmarks": (lm, w, h)}
+        return bbox
+
+    # YawnAgent-style accessors for code that only wants the mouth
+    def mouth_points(self, frame_bgr):
+        self.run(frame_bgr)
+        return self.last["mouth"]
+
+    def measure(self, frame_bgr):
+        self.run(frame_bgr)
+        return self.last["mar"]
@@ -0,0 +1,198 @@
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+EMOTION_LABELS = ["angry", "disgust", "fear", "happy", "sad", "surprise", "neutral"]
+
+# One record per processed frame. mouth = (UP, LO, LC, RC) pixel coords
+# in the FaceMesh input; NaN when FaceMesh found no face.
+FRAME_DTYPE = np.dtype([
+    ("frame_id", "<u4"),
+    ("ts", "<f8"),
+    ("face", "u1"),
+    ("bbox", "<i4", (4,)),
+    ("mouth", "<f4", (4, 2)),
+])
+
+# One record per emotion result. label = index into EMOTION_LABELS, -1 = other/none
+EMOTION_DTYPE = np.dtype([
+    ("ts", "<f8"),
+    ("label", "i1"),
+    ("confidence", "<f4"),
+])
+
+
+class FeatureRecorder:
+    """
+    Records what the pipeline saw, without the video:
+    per-frame timestamp, face bbox and the mouth landmarks YawnAgent uses,
+    plus every emotion result.
+
+    Records are appended to flat binary files (frames.bin, emotions.bin)
+    that FeatureReplay memory-maps as NumPy record arrays. ~60 bytes per
+    frame, so an hour at 30 fps is ~6 MB.
+    """
+
+    def __init__(self, out_dir, flush_every: int = 256):
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.flush_every = flush_every
+
+        self.frames = np.zeros(flush_every, dtype=FRAME_DTYPE)
+        self.n_frames = 0
+        self.emotions = []
+
+        self.frames_f = open(self.out_dir / "frames.bin", "ab")
+        self.emotions_f = open(self.out_dir / "emotions.bin", "ab")
+
+        meta = {
+            "version": 1,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "frame_dtype": FRAME_DTYPE.descr,
+            "emotion_dtype": EMOTION_DTYPE.descr,
+            "emotion_labels": EMOTION_LABELS,
+            "mouth_points": ["UP", "LO", "LC", "RC"],
+        }
+        with open(self.out_dir / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+    def add_frame(self, frame_id: int, ts: float, bbox, mouth_points=None):
+        rec = self.frames[self.n_frames]
+        rec["frame_id"] = frame_id
+        rec["ts"] = ts
+        rec["face"] = bbox is not None
+        rec["bbox"] = bbox if bbox is not None else (0, 0, 0, 0)
+        rec["mouth"] = mouth_points if mouth_points is not None else np.nan
+
+        self.n_frames += 1
+        if self.n_frames >= self.flush_every:
+            self.flush()
+
+    def add_emotion(self, ts: float, emo):
+        emotion = (emo or {}).get("emotion")
+        label = EMOTION_LABELS.index(emotion) if emotion in EMOTION_LABELS else -1
+        self.emotions.append((ts, label, float((emo or {}).get("confidence", 0.0))))
+
+    def flush(self):
+        if self.n_frames:
+            self.frames[:self.n_frames].tofile(self.frames_f)
+            self.frames_f.flush()
+            self.n_frames = 0
+
+        if self.emotions:
+            np.array(self.emotions, dtype=EMOTION_DTYPE).tofile(self.emotions_f)
+            self.emotions_f.flush()
+            self.emotions = []
+
+    def close(self):
+        self.flush()
+        self.frames_f.close()
+        self.emotions_f.close()
+
+
+def _memmap(path, dtype):
+    if not path.exists() or path.stat().st_size < dtype.itemsize:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r")
+
+
+class FeatureReplay:
+    """
+    Read-only view of a FeatureRecorder directory (memory-mapped).
+
+        rec = FeatureReplay("recordings/2024-01-01_120000")
+        rec.frames["ts"], rec.frames["bbox"], rec.mar(), rec.emotions
+    """
+
+    def __init__(self, rec_dir):
+        self.rec_dir = Path(rec_dir)
+        with open(self.rec_dir / "meta.json", "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        self.labels = self.meta["emotion_labels"]
+        self.frames = _memmap(self.rec_dir / "frames.bin", FRAME_DTYPE)
+        self.emotions = _memmap(self.rec_dir / "emotions.bin", EMOTION_DTYPE)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def mar(self):
+        """
+        MAR for every frame, computed vectorized from the stored mouth
+        points (NaN where FaceMesh found no face).
+        """
+        m = self.frames["mouth"]
+        vertical = np.hypot(*(m[:, 0] - m[:, 1]).T)
+        horizontal = np.hypot(*(m[:, 2] - m[:, 3]).T)
+        return vertical / np.maximum(horizontal, 1e-6)
+
+    def emotion_samples(self, start_ts: float, end_ts: float):
+        e = self.emotions
+        sel = e[(e["ts"] >= start_ts) & (e["ts"] < end_ts)]
+        return [
+            {"emotion": self.labels[lab] if lab >= 0 else "unknown", "confidence": float(c)}
+            for lab, c in zip(sel["label"], sel["confidence"])
+        ]
+
+
+def replay_windows(rec: FeatureReplay, window_seconds: float = 30.0,
+                   mar_threshold: float = None, yawn_min_seconds: float = None,
+                   decision_agent=None):
+    """
+    Feeds a recording through the yawn timer, the window logic of
+    final_agent and MoodDecisionAgent, without any video decode or MediaPipe.
+
+    Returns one dict per closed window:
+        {"start_ts", "end_ts", "yawn_info", "emotion_info", "decision"}
+    """
+    from agents.yawn_agent import YawnAgent
+    from agents.decision_agent import MoodDecisionAgent
+    from agents.window_state import summarize_emotions
+
+    yawn_agent = YawnAgent(use_mesh=False)
+    if mar_threshold is not None:
+        yawn_agent.MAR_THRESHOLD = mar_threshold
+    if yawn_min_seconds is not None:
+        yawn_agent.YAWN_MIN_SECONDS = yawn_min_seconds
+    decision_agent = decision_agent or MoodDecisionAgent()
+
+    ts_col = rec.frames["ts"]
+    face_col = rec.frames["face"]
+    mar_col = rec.mar()
+
+    windows = []
+    start_ts = None
+    yawn_info = None
+
+    for ts, face, mar in zip(ts_col.tolist(), face_col.tolist(), mar_col.tolist()):
+        if not face:
+            start_ts = None
+            yawn_agent.reset()
+            continue
+
+        if start_ts is None:
+            start_ts = ts
+            yawn_info = {"yawn": False, "duration": 0.0, "mar": 0.0}
+
+        if mar == mar:   # NaN: mesh skipped or no landmarks, not fed (same as the live loop)
+            out = yawn_agent.update(mar, ts)
+            yawn_info["yawn"] = yawn_info["yawn"] or out["yawn"]
+            yawn_info["duration"] = max(yawn_info["duration"], out["duration"])
+            yawn_info["mar"] = max(yawn_info["mar"], out["mar"])
+
+        if ts - start_ts >= window_seconds:
+            emotion_info = summarize_emotions(rec.emotion_samples(start_ts, ts))
+            windows.append({
+                "start_ts": start_ts,
+                "end_ts": ts,
+                "yawn_info": dict(yawn_info),
+                "emotion_info": emotion_info,
+                "decision": decision_agent.run(emotion_info, yawn_info),
+            })
+            start_ts = ts
+            yawn_info = {"yawn": False, "duration": 0.0, "mar": 0.0}
+
+    return windows
@@ -0,0 +1,206 @@
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+
+# Rollup level name -> bucket size in seconds. Buckets follow local time
+# (bucket_start()): a "day" runs from local midnight to midnight.
+ROLLUP_LEVELS = {
+    "5min": 300,
+    "hour": 3600,
+    "day": 86400,
+}
+
+# PRAGMA user_version: 1 = local-time buckets (older files were UTC-aligned)
+SCHEMA_VERSION = 1
+
+STATES = ("drowsy", "stressed", "engaged", "normal", "unknown")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS windows (
+    ts                REAL NOT NULL,      -- window end (unix seconds)
+    window_seconds    REAL NOT NULL,
+    yawn_any          INTEGER NOT NULL,
+    max_yawn_duration REAL NOT NULL,
+    max_mar           REAL NOT NULL,
+    emotion           TEXT,
+    emotion_conf      REAL,
+    emotion_samples   TEXT NOT NULL,      -- JSON list of raw samples
+    state             TEXT NOT NULL,
+    reason            TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_windows_ts ON windows(ts);
+
+CREATE TABLE IF NOT EXISTS rollups (
+    level             TEXT NOT NULL,
+    bucket_start      INTEGER NOT NULL,
+    n_windows         INTEGER NOT NULL,
+    n_drowsy          INTEGER NOT NULL,
+    n_stressed        INTEGER NOT NULL,
+    n_engaged         INTEGER NOT NULL,
+    n_normal          INTEGER NOT NULL,
+    n_unknown         INTEGER NOT NULL,
+    n_other           INTEGER NOT NULL,
+    n_yawn_windows    INTEGER NOT NULL,
+    n_emotion_samples INTEGER NOT NULL,
+    sum_max_mar       REAL NOT NULL,
+    max_mar           REAL NOT NULL,
+    max_yawn_duration REAL NOT NULL,
+    PRIMARY KEY (level, bucket_start)
+);
+"""
+
+UPSERT_ROLLUP = """
+INSERT INTO rollups VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(level, bucket_start) DO UPDATE SET
+    n_windows         = n_windows + 1,
+    n_drowsy          = n_drowsy + excluded.n_drowsy,
+    n_stressed        = n_stressed + excluded.n_stressed,
+    n_engaged         = n_engaged + excluded.n_engaged,
+    n_normal          = n_normal + excluded.n_normal,
+    n_unknown         = n_unknown + excluded.n_unknown,
+    n_other           = n_other + excluded.n_other,
+    n_yawn_windows    = n_yawn_windows + excluded.n_yawn_windows,
+    n_emotion_samples = n_emotion_samples + excluded.n_emotion_samples,
+    sum_max_mar       = sum_max_mar + excluded.sum_max_mar,
+    max_mar           = MAX(max_mar, excluded.max_mar),
+    max_yawn_duration = MAX(max_yawn_duration, excluded.max_yawn_duration)
+"""
+
+
+def bucket_start(level: str, ts: float) -> int:
+    """
+    Unix time of the start of the local-time bucket holding ts. Days
+    start at local midnight (23 / 25 hours on DST changes); 5min / hour
+    buckets use the UTC offset at ts, so they fit half-hour time zones.
+    """
+    t = time.localtime(ts)
+    if level == "day":
+        return int(time.mktime((t.tm_year, t.tm_mon, t.tm_mday, 0, 0, 0, 0, 0, -1)))
+    size = ROLLUP_LEVELS[level]
+    offset = t.tm_gmtoff
+    return int((ts + offset) // size) * size - offset
+
+
+class WindowFeatureStore:
+    """
+    Local SQLite time-series store for per-window features + decisions.
+
+    Every add_window() writes the raw window row and updates the 5min /
+    hour / day rollups in the same transaction, so reports over long
+    periods read a few pre-aggregated rows instead of scanning raw data.
+    Rollup buckets are in local time; a database written with the older
+    UTC-aligned buckets gets its rollups rebuilt from the raw rows once.
+    """
+
+    def __init__(self, db_path="logs/windows.db"):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self._rebuild_rollups()
+
+    def add_window(self, yawn_info: dict, emotion_info, emotion_samples, decision: dict,
+                   window_seconds: float, ts: float = None):
+        ts = time.time() if ts is None else ts
+        state = (decision or {}).get("state", "unknown")
+
+        yawn_any = bool(yawn_info.get("yawn", False))
+        max_duration = float(yawn_info.get("duration", 0.0))
+        max_mar = float(yawn_info.get("mar", 0.0))
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO windows VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    ts,
+                    float(window_seconds),
+                    int(yawn_any),
+                    max_duration,
+                    max_mar,
+                    (emotion_info or {}).get("emotion"),
+                    (emotion_info or {}).get("confidence"),
+                    json.dumps(list(emotion_samples or [])),
+                    state,
+                    (decision or {}).get("reason", ""),
+                )
+            )
+
+            self._add_rollups(ts, state, yawn_any, len(emotion_samples or []), max_mar, max_duration)
+
+    def _add_rollups(self, ts, state, yawn_any, n_samples, max_mar, max_duration):
+        state_counts = [int(state == s) for s in STATES]
+        n_other = int(state not in STATES)
+
+        for level in ROLLUP_LEVELS:
+            self.conn.execute(
+                UPSERT_ROLLUP,
+                (
+                    level,
+                    bucket_start(level, ts),
+                    *state_counts,
+                    n_other,
+                    int(yawn_any),
+                    n_samples,
+                    max_mar,
+                    max_mar,
+                    max_duration,
+                )
+            )
+
+    def _rebuild_rollups(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM rollups")
+            rows = self.conn.execute(
+                "SELECT ts, state, yawn_any, emotion_samples, max_mar, max_yawn_duration FROM windows"
+            ).fetchall()
+            for ts, state, yawn_any, samples, max_mar, max_duration in rows:
+                self._add_rollups(ts, state, yawn_any, len(json.loads(samples)), max_mar, max_duration)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def rollups(self, level: str, start_ts: float = 0.0, end_ts: float = None):
+        """
+        Returns pre-aggregated rows for one level, oldest first.
+        """
+        if level not in ROLLUP_LEVELS:
+            raise ValueError(f"unknown rollup level {level!r}, expected one of {list(ROLLUP_LEVELS)}")
+
+        end_ts = time.time() if end_ts is None else end_ts
+        cur = self.conn.execute(
+            "SELECT * FROM rollups WHERE level = ? AND bucket_start >= ? AND bucket_start < ? "
+            "ORDER BY bucket_start",
+            (level, int(start_ts), end_ts)
+        )
+        cols = [c[0] for c in cur.description]
+        rows = []
+        for r in cur.fetchall():
+            row = dict(zip(cols, r))
+            row["avg_max_mar"] = row["sum_max_mar"] / max(row["n_windows"], 1)
+            rows.append(row)
+        return rows
+
+    def windows(self, start_ts: float = 0.0, end_ts: float = None):
+        """
+        Raw window rows (for drill-down / re-running decision rules).
+        """
+        end_ts = time.time() if end_ts is None else end_ts
+        cur = self.conn.execute(
+            "SELECT * FROM windows WHERE ts >= ? AND ts < ? ORDER BY ts",
+            (start_ts, end_ts)
+        )
+        cols = [c[0] for c in cur.description]
+        rows = []
+        for r in cur.fetchall():
+            row = dict(zip(cols, r))
+            row["emotion_samples"] = json.loads(row["emotion_samples"])
+            rows.append(row)
+        return rows
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,255 @@
+import gzip
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from pathlib import Path
+
+
+class FleetReporter:
+    """
+    Ships decision/action events to a central fleet service
+    (agents/fleet_service.py) without ever blocking the caller.
+
+    report() only appends to an in-memory queue. A background thread
+    sends batches of batch_size events (or whatever is queued every
+    flush_seconds) as gzip-compressed JSON lines:
+
+        POST <url>/ingest   Content-Encoding: gzip, one JSON event per line
+
+    When the service is unreachable or pushes back (429/503 +
+    Retry-After), the batch is written to spool_dir and the reporter
+    backs off (exponential with jitter, or the server's Retry-After).
+    Spooled batches are re-sent oldest first before new events once the
+    service answers again. The spool is capped at max_spool_bytes (oldest
+    batches are dropped); if the memory queue reaches max_queue, the
+    oldest batch is handed to the sender thread to be spooled (report()
+    never touches the disk). token is sent as X-Fleet-Token; a 401/403
+    is treated like an outage (spooled, retried) rather than a bad batch.
+
+    Several ActionAgents in one process can share a reporter:
+        agent.reporter = reporter.bind("desk-42")
+    """
+
+    def __init__(self, url, client_id="default", spool_dir="logs/fleet_spool",
+                 batch_size=200, flush_seconds=10.0, max_queue=5000,
+                 max_spool_bytes=50 * 1024 * 1024, timeout=5.0, max_backoff=300.0, token=None):
+        self.url = url.rstrip("/")
+        self.client_id = client_id
+        self.token = token
+        self.spool_dir = Path(spool_dir)
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_queue = max_queue
+        self.max_spool_bytes = max_spool_bytes
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+
+        self.queue = deque()
+        self.overflow = deque()     # batches cut off the queue, spooled by the sender thread
+        self.lock = threading.Lock()
+        self.spool_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.closed = False
+
+        self.failures = 0           # consecutive failed sends
+        self.next_try_ts = 0.0
+        self.last_flush_ts = time.time()
+        self.spool_seq = 0
+        self.stats = {"reported": 0, "sent": 0, "batches": 0, "spooled": 0,
+                      "resent": 0, "dropped": 0, "failures": 0}
+
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    # ---- producer side (camera / action thread) ----
+    def bind(self, client_id):
+        return _BoundReporter(self, client_id)
+
+    def report(self, event: dict, client=None):
+        event = dict(event, client=client or self.client_id)
+        with self.lock:
+            self.stats["reported"] += 1
+            self.queue.append(event)
+            if len(self.queue) > self.max_queue:
+                # sender is far behind (offline or slow): it moves these to disk
+                self.overflow.append([self.queue.popleft() for _ in range(min(self.batch_size, len(self.queue)))])
+                self.wake.set()
+            if len(self.queue) >= self.batch_size:
+                self.wake.set()
+
+    # ---- sender thread ----
+    @staticmethod
+    def _encode(events):
+        lines = "\n".join(json.dumps(e, separators=(",", ":")) for e in events)
+        return gzip.compress(lines.encode("utf-8"), compresslevel=6)
+
+    def _post(self, body):
+        """
+        Returns (status, retry_after): "ok", "retry" (offline / server busy /
+        not authorized) or "rejected" (other 4xx: the batch itself is bad,
+        do not resend).
+        """
+        headers = {
+            "Content-Type": "application/x-ndjson",
+            "Content-Encoding": "gzip",
+            "X-Client-Id": str(self.client_id),
+        }
+        if self.token:
+            headers["X-Fleet-Token"] = self.token
+        req = urllib.request.Request(self.url + "/ingest", data=body, method="POST", headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                resp.read()
+            return "ok", None
+        except urllib.error.HTTPError as e:
+            if e.code in (429, 503):
+                retry_after = e.headers.get("Retry-After")
+                return "retry", float(retry_after) if retry_after else None
+            if e.code in (401, 403):
+                # wrong / missing token is a setup problem: keep the events
+                if not self.failures:
+                    print(f"[FLEET] {self.url} refused the token (HTTP {e.code}), spooling")
+                return "retry", None
+            if 400 <= e.code < 500:
+                return "rejected", None
+            return "retry", None
+        except (urllib.error.URLError, OSError):
+            return "retry", None
+
+    def _backoff(self, retry_after=None):
+        self.failures += 1
+        self.stats["failures"] += 1
+        if retry_after is not None:
+            delay = retry_after
+        else:
+            delay = min(self.max_backoff, 2.0 ** min(self.failures, 16)) * random.uniform(0.5, 1.0)
+        self.next_try_ts = time.time() + delay
+
+    def _spool(self, body, n_events):
+        with self.spool_lock:
+            self.spool_seq += 1
+            name = f"{time.time_ns()}_{self.spool_seq:06d}_{n_events}.jsonl.gz"
+            tmp = self.spool_dir / (name + ".tmp")
+            tmp.write_bytes(body)
+            tmp.replace(self.spool_dir / name)
+            self.stats["spooled"] += n_events
+
+            # cap the spool: drop the oldest batches
+            files = sorted(self.spool_dir.glob("*.jsonl.gz"))
+            total = sum(f.stat().st_size for f in files)
+            while files and total > self.max_spool_bytes:
+                f = files.pop(0)
+                total -= f.stat().st_size
+                self.stats["dropped"] += self._spool_count(f)
+                f.unlink(missing_ok=True)
+
+    @staticmethod
+    def _spool_count(path):
+        try:
+            return int(path.name.split("_")[2].split(".")[0])
+        except (IndexError, ValueError):
+            return 0
+
+    def _send_spool(self):
+        """Re-sends spooled batches, oldest first. False = stop for now."""
+        for f in sorted(self.spool_dir.glob("*.jsonl.gz")):
+            n = self._spool_count(f)
+            status, retry_after = self._post(f.read_bytes())
+            if status == "retry":
+                self._backoff(retry_after)
+                return False
+
+            f.unlink(missing_ok=True)
+            if status == "ok":
+                self.failures = 0
+                self.stats["resent"] += n
+                self.stats["sent"] += n
+                self.stats["batches"] += 1
+            else:
+                self.stats["dropped"] += n
+        return True
+
+    def _send_queue(self, final=False):
+        while True:
+            with self.lock:
+                if not self.queue or (len(self.queue) < self.batch_size and not final
+                                      and not self._flush_due()):
+                    return True
+                batch = [self.queue.popleft() for _ in range(min(self.batch_size, len(self.queue)))]
+
+            body = self._encode(batch)
+            status, retry_after = self._post(body)
+            if status == "ok":
+                self.failures = 0
+                self.stats["sent"] += len(batch)
+                self.stats["batches"] += 1
+            elif status == "rejected":
+                self.stats["dropped"] += len(batch)
+            else:
+                self._spool(body, len(batch))
+                self._backoff(retry_after)
+                return False
+
+    def _spool_overflow(self):
+        while True:
+            with self.lock:
+                if not self.overflow:
+                    return
+                batch = self.overflow.popleft()
+            self._spool(self._encode(batch), len(batch))
+
+    def _flush_due(self):
+        return time.time() - self.last_flush_ts >= self.flush_seconds
+
+    def _loop(self):
+        while not self.closed:
+            self.wake.wait(timeout=min(self.flush_seconds, 1.0))
+            self.wake.clear()
+            self._spool_overflow()
+            if self.closed or time.time() < self.next_try_ts:
+                continue
+            if self._send_spool() and self._send_queue():
+                if self._flush_due():
+                    self.last_flush_ts = time.time()
+
+    def close(self, timeout=5.0):
+        """
+        Stops the sender, tries once to send what is left and spools the
+        rest for the next session.
+        """
+        self.closed = True
+        self.wake.set()
+        self.thread.join(timeout=timeout)
+        self._spool_overflow()
+
+        if self._send_spool():
+            if self._send_queue(final=True):
+                return
+        with self.lock:
+            rest = list(self.queue)
+            self.queue.clear()
+        if rest:
+            self._spool(self._encode(rest), len(rest))
+
+    def status_text(self):
+        s = self.stats
+        with self.lock:
+            queued = len(self.queue)
+        return (f"reported={s['reported']} sent={s['sent']} batches={s['batches']} queued={queued} "
+                f"spooled={s['spooled']} resent={s['resent']} dropped={s['dropped']} failures={s['failures']}")
+
+
+class _BoundReporter:
+    """FleetReporter view that stamps events with its own client id."""
+
+    def __init__(self, reporter, client_id):
+        self.reporter = reporter
+        self.client_id = client_id
+
+    def report(self, event: dict):
+        self.reporter.report(event, client=self.client_id)
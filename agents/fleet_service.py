@@ -0,0 +1,327 @@
+import hmac
+import json
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    ts      REAL NOT NULL,      -- event time on the client (unix seconds)
+    client  TEXT NOT NULL,
+    kind    TEXT NOT NULL,      -- decision / action
+    state   TEXT,               -- decision state
+    action  TEXT,               -- ACTION=<name>
+    detail  TEXT                -- decision reason / action details
+);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts);
+CREATE INDEX IF NOT EXISTS idx_events_client_ts ON events(client, ts);
+"""
+
+MAX_BODY_BYTES = 8 * 1024 * 1024         # compressed request body
+MAX_INFLATED_BYTES = 64 * 1024 * 1024    # the same body after gunzip (decompression bombs)
+
+
+class BatchTooLarge(ValueError):
+    pass
+
+
+def gunzip_limited(body, limit=MAX_INFLATED_BYTES):
+    """gzip.decompress() that stops at `limit` output bytes (BatchTooLarge) instead of exhausting memory."""
+    d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    out = d.decompress(body, limit + 1)
+    if len(out) > limit or d.unconsumed_tail:
+        raise BatchTooLarge(f"batch inflates to more than {limit} bytes")
+    if not d.eof:
+        raise ValueError("truncated gzip stream")
+    return out
+
+
+class FleetStore:
+    """
+    SQLite storage of the fleet service. Rows are written in bulk
+    (one executemany + commit per flush) by the service's writer thread.
+    """
+
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+
+    def add_many(self, rows):
+        with self.lock:
+            self.conn.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self.conn.commit()
+
+    def stats(self, since_ts=0.0, per_client=0):
+        """
+        Aggregated focus / drowsiness statistics since since_ts:
+        decision counts and shares, action counts, hourly buckets and
+        (per_client > 0) the clients with the highest drowsy share.
+        """
+        with self.lock:
+            c = self.conn
+            states = dict(c.execute(
+                "SELECT state, COUNT(*) FROM events WHERE kind = 'decision' AND ts >= ? GROUP BY state",
+                (since_ts,)
+            ).fetchall())
+            actions = dict(c.execute(
+                "SELECT action, COUNT(*) FROM events WHERE kind = 'action' AND ts >= ? GROUP BY action",
+                (since_ts,)
+            ).fetchall())
+            clients, events = c.execute(
+                "SELECT COUNT(DISTINCT client), COUNT(*) FROM events WHERE ts >= ?", (since_ts,)
+            ).fetchone()
+            hourly = c.execute(
+                """
+                SELECT CAST(ts / 3600 AS INTEGER) * 3600 AS hour, COUNT(*),
+                       SUM(state = 'drowsy'), SUM(state = 'engaged'), SUM(state = 'stressed')
+                FROM events WHERE kind = 'decision' AND ts >= ?
+                GROUP BY hour ORDER BY hour
+                """,
+                (since_ts,)
+            ).fetchall()
+            top = []
+            if per_client > 0:
+                top = c.execute(
+                    """
+                    SELECT client, COUNT(*) AS n,
+                           SUM(state = 'drowsy') * 1.0 / COUNT(*) AS drowsy_share,
+                           SUM(state = 'engaged') * 1.0 / COUNT(*) AS focus_share,
+                           MAX(ts)
+                    FROM events WHERE kind = 'decision' AND ts >= ?
+                    GROUP BY client ORDER BY drowsy_share DESC, n DESC LIMIT ?
+                    """,
+                    (since_ts, per_client)
+                ).fetchall()
+
+        windows = sum(states.values())
+        return {
+            "since": since_ts,
+            "clients": clients,
+            "events": events,
+            "windows": windows,
+            "states": states,
+            "drowsy_share": states.get("drowsy", 0) / windows if windows else None,
+            "focus_share": states.get("engaged", 0) / windows if windows else None,
+            "stress_share": states.get("stressed", 0) / windows if windows else None,
+            "actions": actions,
+            "hourly": [
+                {"hour": h, "windows": n, "drowsy": d, "engaged": e, "stressed": s}
+                for h, n, d, e, s in hourly
+            ],
+            "per_client": [
+                {"client": cl, "windows": n, "drowsy_share": ds, "focus_share": fs, "last_ts": last}
+                for cl, n, ds, fs, last in top
+            ],
+        }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class FleetService:
+    """
+    Central aggregation service for FleetReporter clients (stdlib HTTP).
+
+        POST /ingest   gzip JSON lines -> 202, or 503 + Retry-After when
+                       more than max_pending rows wait for the database
+        GET  /stats    ?since=<unix ts>&per_client=<n> -> JSON aggregates
+        GET  /health   -> {"pending", "ingested", ...}
+
+    Request threads only decode and queue rows; one writer thread
+    inserts them in bulk (up to flush_rows per transaction), so many
+    clients cost few commits. The same class runs as the office-wide
+    service (fleet_server.py) or as an in-process stand-in for tests
+    (port=0 picks a free port, db_path=":memory:").
+
+    With token set, every request needs the header X-Fleet-Token: <token>
+    (401 otherwise). Bodies are capped at MAX_BODY_BYTES compressed and
+    MAX_INFLATED_BYTES after gunzip (413).
+    """
+
+    def __init__(self, db_path, host="127.0.0.1", port=6170, max_pending=200_000,
+                 flush_rows=5000, flush_seconds=0.5, retry_after=2, token=None):
+        self.store = FleetStore(db_path)
+        self.token = token
+        self.rows = queue.Queue()
+        self.max_pending = max_pending
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.retry_after = retry_after
+
+        self.stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "accepted": 0, "ingested": 0, "rejected": 0, "throttled": 0,
+                      "flushes": 0, "bytes_in": 0, "unauthorized": 0}
+        self.stop = threading.Event()
+
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.service = self
+        self.url = f"http://{host}:{self.httpd.server_address[1]}"
+        self.threads = []
+
+    def start(self):
+        for target in (self._writer_loop, self.httpd.serve_forever):
+            t = threading.Thread(target=target, daemon=True)
+            t.start()
+            self.threads.append(t)
+        return self
+
+    def pending(self):
+        return self.rows.qsize()
+
+    def _count(self, key, n=1):
+        with self.stats_lock:
+            self.stats[key] += n
+
+    def authorized(self, header_token):
+        if self.token is None:
+            return True
+        if header_token is not None and hmac.compare_digest(header_token.encode("utf-8"),
+                                                            self.token.encode("utf-8")):
+            return True
+        self._count("unauthorized")
+        return False
+
+    # ---- ingest ----
+    def ingest(self, body, client_header=None):
+        """Returns (http_status, payload)."""
+        self._count("requests")
+        self._count("bytes_in", len(body))
+
+        if self.pending() >= self.max_pending:
+            self._count("throttled")
+            return 503, {"error": "busy"}
+
+        try:
+            text = gunzip_limited(body).decode("utf-8")
+            rows = []
+            for line in text.splitlines():
+                if not line.strip():
+                    continue
+                e = json.loads(line)
+                rows.append((
+                    float(e["ts"]),
+                    str(e.get("client") or client_header or "unknown"),
+                    str(e["kind"]),
+                    e.get("state"),
+                    e.get("action"),
+                    e.get("reason") or e.get("detail"),
+                ))
+        except BatchTooLarge as ex:
+            self._count("rejected")
+            return 413, {"error": f"too_large: {ex}"}
+        except (OSError, EOFError, zlib.error, ValueError, KeyError, TypeError) as ex:
+            self._count("rejected")
+            return 400, {"error": f"bad_batch: {ex}"}
+
+        self._count("accepted", len(rows))
+        for row in rows:
+            self.rows.put(row)
+        return 202, {"accepted": len(rows)}
+
+    def _writer_loop(self):
+        while not self.stop.is_set() or not self.rows.empty():
+            try:
+                batch = [self.rows.get(timeout=self.flush_seconds)]
+            except queue.Empty:
+                continue
+            deadline = time.time() + self.flush_seconds
+            while len(batch) < self.flush_rows and time.time() < deadline:
+                try:
+                    batch.append(self.rows.get(timeout=max(0.0, deadline - time.time())))
+                except queue.Empty:
+                    break
+            self.store.add_many(batch)
+            self._count("ingested", len(batch))
+            self._count("flushes")
+
+    def drain(self, timeout=10.0):
+        """Waits until every accepted row is in the database."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self.stats_lock:
+                if self.stats["ingested"] >= self.stats["accepted"]:
+                    return True
+            time.sleep(0.05)
+        return False
+
+    def health(self):
+        with self.stats_lock:
+            s = dict(self.stats)
+        s["pending"] = self.pending()
+        return s
+
+    def close(self):
+        if self.threads:            # shutdown() waits for serve_forever, which only start() runs
+            self.httpd.shutdown()
+        self.httpd.server_close()
+        self.stop.set()
+        for t in self.threads:
+            t.join(timeout=5.0)
+        self.store.close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        service = self.server.service
+        # rejected before the body is read: the connection cannot be reused
+        if not service.authorized(self.headers.get("X-Fleet-Token")):
+            self.close_connection = True
+            self._reply(401, {"error": "unauthorized"})
+            return
+        if urlparse(self.path).path != "/ingest":
+            self.close_connection = True
+            self._reply(404, {"error": "not_found"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0 or length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._reply(413 if length > 0 else 400, {"error": "bad_length"})
+            return
+
+        status, payload = service.ingest(self.rfile.read(length), self.headers.get("X-Client-Id"))
+        headers = {"Retry-After": str(service.retry_after)} if status == 503 else None
+        self._reply(status, payload, headers)
+
+    def do_GET(self):
+        service = self.server.service
+        if not service.authorized(self.headers.get("X-Fleet-Token")):
+            self._reply(401, {"error": "unauthorized"})
+            return
+        url = urlparse(self.path)
+        q = parse_qs(url.query)
+
+        if url.path == "/stats":
+            since = float(q.get("since", [time.time() - 86400])[0])
+            per_client = int(q.get("per_client", [0])[0])
+            self._reply(200, service.store.stats(since, per_client))
+        elif url.path == "/health":
+            self._reply(200, service.health())
+        else:
+            self._reply(404, {"error": "not_found"})
+
+    def log_message(self, fmt, *args):
+        # one line per request would flood the console with thousands of clients
+        pass
@@ -0,0 +1,129 @@
+import threading
+import tracemalloc
+
+import numpy as np
+
+from agents.frame_utils import EMOTION_INPUT_SIZE, emotion_tensor
+
+
+class ReusableBuffer:
+    """
+    One growable block of memory handed out as contiguous arrays of any
+    shape that fits. The block only grows (never shrinks), so after the
+    first few frames there are no new allocations.
+
+    A view stays valid until the next view() call on the same buffer.
+    """
+
+    def __init__(self, nbytes: int = 0):
+        self.block = np.empty(nbytes, dtype=np.uint8)
+        self.grows = 0
+
+    def view(self, shape, dtype=np.uint8):
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        if nbytes > self.block.nbytes:
+            self.block = np.empty(int(nbytes * 1.25), dtype=np.uint8)   # headroom for bbox jitter
+            self.grows += 1
+        return self.block[:nbytes].view(dtype).reshape(shape)
+
+
+class CropPool:
+    """
+    Fixed set of emotion-tensor buffers for in-flight emotion jobs: the
+    48x48 model input of a face crop is written straight into a slot
+    (emotion_tensor(out=...)), so a request allocates nothing (aligning
+    a tilted face costs one 48x48 temporary).
+    """
+
+    def __init__(self, slots: int):
+        self.buffers = [ReusableBuffer() for _ in range(slots)]
+        self.scratch = [ReusableBuffer() for _ in range(slots)]    # resized colour crop
+        self.free = list(range(slots))
+        self.lock = threading.Lock()
+
+    def tensor(self, face_crop, landmarks=None):
+        """
+        Returns (slot, emotion_tensor(face_crop, landmarks=landmarks) in
+        the slot's buffer), or (None, None) if all slots are busy.
+        """
+        with self.lock:
+            if not self.free:
+                return None, None
+            slot = self.free.pop()
+
+        w, h = EMOTION_INPUT_SIZE
+        out = self.buffers[slot].view((h, w), np.uint8)
+        scratch = self.scratch[slot].view((h, w, 3), np.uint8)
+        return slot, emotion_tensor(face_crop, out=out, scratch=scratch, landmarks=landmarks)
+
+    def release(self, slot):
+        if slot is None:
+            return
+        with self.lock:
+            self.free.append(slot)
+
+
+class AllocationMeter:
+    """
+    Debug helper: per-frame allocation report for the camera loop.
+
+    Uses tracemalloc (NumPy reports its array buffers to it) and takes
+    a snapshot at both ends of every frame, so it slows the loop down a
+    lot; only enable it while investigating.
+      - allocs:  memory blocks allocated during the frame and still
+        alive at its end, counted per source line (sum of the positive
+        count_diff of the snapshot diff): a new frame / RGB copy / crop
+        per iteration shows up here, reused buffers do not
+      - peak_kb: highest traced memory during the frame above its
+        starting level (temporaries freed within the frame)
+    begin_frame() closes a frame that is still open, so a loop that
+    skips to the next iteration (continue) is measured too.
+    """
+
+    _FILTERS = (tracemalloc.Filter(False, tracemalloc.__file__),)
+
+    def __init__(self, report_every: int = 100):
+        self.report_every = report_every
+        self.frames = 0
+        self.sum_allocs = 0
+        self.sum_peak = 0
+        self._snapshot0 = None
+        self._mem0 = 0
+        self._open = False
+        tracemalloc.start()
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(self._FILTERS)
+
+    def begin_frame(self):
+        if self._open:
+            self.end_frame()
+        self._snapshot0 = self._snapshot()
+        tracemalloc.reset_peak()
+        self._mem0 = tracemalloc.get_traced_memory()[0]
+        self._open = True
+
+    def end_frame(self):
+        if not self._open:
+            return
+        self._open = False
+        _cur, peak = tracemalloc.get_traced_memory()
+        self.sum_peak += max(0, peak - self._mem0)
+        diff = self._snapshot().compare_to(self._snapshot0, "lineno")
+        self.sum_allocs += sum(d.count_diff for d in diff if d.count_diff > 0)
+        self._snapshot0 = None
+        self.frames += 1
+
+        if self.frames >= self.report_every:
+            print(
+                f"[ALLOC] frames={self.frames} "
+                f"avg allocs={self.sum_allocs / self.frames:.1f} "
+                f"avg peak_kb={self.sum_peak / self.frames / 1024:.1f}"
+            )
+            self.frames = 0
+            self.sum_allocs = 0
+            self.sum_peak = 0
+
+    def stop(self):
+        tracemalloc.stop()
@@ -0,0 +1,129 @@
+import math
+
+import cv2
+import numpy as np
+
+from agents.expression_cascade import L_EYE_OUT, R_EYE_OUT, L_EYE, R_EYE
+
+
+NOSE_TIP = 1        # FaceMesh landmark index
+
+
+def face_quality(face_crop_bgr, landmarks=None, probe_width=64, good_size=96,
+                 sharp_ref=100.0, open_ear=0.2):
+    """
+    Cheap usefulness score (0..1) of one face crop for the emotion model,
+    the product of
+      - sharpness: Laplacian variance of a probe_width px gray copy
+        (v / (v + sharp_ref), so motion blur drags it towards 0)
+      - size:      crop width / good_size, capped at 1 (48 px model input)
+      - exposure:  mean brightness near mid-grey and few clipped pixels
+      - frontal:   (FaceMesh landmarks = (landmarks, w, h)) nose tip centred
+                   between the outer eye corners, eyes open (no blink);
+                   1.0 without landmarks
+    Returns (score, {"sharp", "size", "exposure", "frontal"}).
+    """
+    h, w = face_crop_bgr.shape[:2]
+    gray = cv2.cvtColor(face_crop_bgr, cv2.COLOR_BGR2GRAY)
+    if w > probe_width:
+        gray = cv2.resize(gray, (probe_width, max(1, int(h * probe_width / w))), interpolation=cv2.INTER_AREA)
+
+    v = float(cv2.Laplacian(gray, cv2.CV_32F).var())
+    sharp = v / (v + sharp_ref)
+    size = min(1.0, w / float(good_size))
+
+    mean = float(gray.mean())
+    clipped = float(np.count_nonzero((gray < 10) | (gray > 245))) / gray.size
+    exposure = max(0.0, 1.0 - abs(mean - 128.0) / 128.0) * (1.0 - clipped)
+
+    frontal = 1.0
+    if landmarks is not None:
+        lm, lw, lh = landmarks
+
+        def p(i):
+            return (lm[i].x * lw, lm[i].y * lh)
+
+        nose_x = p(NOSE_TIP)[0]
+        d_left, d_right = abs(nose_x - p(L_EYE_OUT)[0]), abs(p(R_EYE_OUT)[0] - nose_x)
+        yaw = min(d_left, d_right) / max(d_left, d_right, 1e-6)      # 1 = looking at the camera
+
+        def ear(idx):
+            c1, t1, t2, c2, b2, b1 = (p(i) for i in idx)
+            return (math.dist(t1, b1) + math.dist(t2, b2)) / max(2.0 * math.dist(c1, c2), 1e-6)
+
+        eyes = min(1.0, 0.5 * (ear(L_EYE) + ear(R_EYE)) / open_ear)  # < 1 while blinking
+        frontal = yaw * eyes
+
+    score = sharp * size * exposure * frontal
+    return score, {"sharp": sharp, "size": size, "exposure": exposure, "frontal": frontal}
+
+
+class FrameSelector:
+    """
+    Picks the face crop that goes to the emotion model.
+
+    The camera loop offers every face crop (offer(), ~0.1 ms: scored on a
+    64 px copy); only a crop that beats the best one of the current slot
+    is copied. When EmotionSampler says a sample is due, take() returns
+    the best crop seen since the last sample (at most `lookback` seconds
+    old, so the expression is still current) instead of whatever frame
+    happens to be current, often blurred, half-turned or mid-blink.
+
+    Every report_every samples a [SELECT] line compares the average score
+    of the submitted crops with that of the frame that was current at the
+    time (what would have been sent without the selector).
+    """
+
+    def __init__(self, lookback=2.0, report_every=20, **quality_kwargs):
+        self.lookback = lookback
+        self.report_every = report_every
+        self.quality_kwargs = quality_kwargs
+
+        self.best = None            # (ts, score, crop copy, landmarks)
+        self.last_score = None      # score of the newest offered crop
+        self.stats = {"offered": 0, "kept": 0, "taken": 0, "best_sum": 0.0, "current_sum": 0.0}
+
+    def offer(self, face_crop_bgr, ts, landmarks=None, require_landmarks=False):
+        """
+        Scores one crop and keeps it if it is the best of the slot.
+        require_landmarks: FaceMesh runs in this process, so a crop
+        without landmarks of its own frame is skipped (None). Judged
+        without head pose / blink it would beat every frontal-checked one.
+        """
+        if face_crop_bgr is None or face_crop_bgr.size == 0:
+            return None
+        if require_landmarks and landmarks is None:
+            return None
+        score, _parts = face_quality(face_crop_bgr, landmarks, **self.quality_kwargs)
+        self.last_score = score
+        self.stats["offered"] += 1
+
+        if self.best is None or score > self.best[1] or ts - self.best[0] > self.lookback:
+            self.best = (ts, score, face_crop_bgr.copy(), landmarks)
+            self.stats["kept"] += 1
+        return score
+
+    def take(self, now, face_crop_bgr, landmarks=None):
+        """
+        (crop, landmarks) to submit for the sample that is due now; falls
+        back to the given current crop when nothing recent was offered.
+        Starts a new slot.
+        """
+        best = self.best
+        self.best = None
+        if best is None or now - best[0] > self.lookback:
+            return face_crop_bgr, landmarks
+
+        s = self.stats
+        s["taken"] += 1
+        s["best_sum"] += best[1]
+        s["current_sum"] += self.last_score if self.last_score is not None else best[1]
+        if self.report_every and s["taken"] % self.report_every == 0:
+            print(f"[SELECT] samples={s['taken']} avg_score={s['best_sum'] / s['taken']:.2f} "
+                  f"(current frame would be {s['current_sum'] / s['taken']:.2f}) "
+                  f"offered={s['offered']} kept={s['kept']}")
+        return best[2], best[3]
+
+    def reset(self):
+        self.best = None
+        self.last_score = None
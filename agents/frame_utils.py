@@ -0,0 +1,124 @@
+import base64
+import math
+
+import cv2
+import numpy as np
+
+
+EMOTION_INPUT_SIZE = (48, 48)   # DeepFace emotion CNN input (grayscale)
+EYE_CORNERS = (33, 263)         # FaceMesh outer eye corners (image left, image right)
+MIN_ROLL_DEGREES = 2.0          # smaller head roll is left alone (rotating only blurs)
+
+
+def clamp_crop(frame, bbox):
+    h, w = frame.shape[:2]
+    x, y, bw, bh = bbox
+
+    x1 = max(0, x)
+    y1 = max(0, y)
+    x2 = min(w, x + bw)
+    y2 = min(h, y + bh)
+
+    if x2 <= x1 or y2 <= y1:
+        return None
+
+    crop = frame[y1:y2, x1:x2]
+    if crop.size == 0:
+        return None
+
+    return crop
+
+
+def expand_bbox(bbox, margin: float):
+    """
+    Grows bbox by margin * size on every side (clamping happens in clamp_crop).
+    """
+    x, y, bw, bh = bbox
+    mx = int(bw * margin)
+    my = int(bh * margin)
+    return (x - mx, y - my, bw + 2 * mx, bh + 2 * my)
+
+
+def eye_roll(landmarks):
+    """
+    Head roll in degrees from FaceMesh landmarks = (landmarks, w, h):
+    angle of the line through the outer eye corners (33 -> 263) against
+    the horizontal, or None without landmarks.
+    """
+    if landmarks is None:
+        return None
+    lm, w, h = landmarks
+    dx = (lm[EYE_CORNERS[1]].x - lm[EYE_CORNERS[0]].x) * w
+    dy = (lm[EYE_CORNERS[1]].y - lm[EYE_CORNERS[0]].y) * h
+    return math.degrees(math.atan2(dy, dx))
+
+
+def emotion_tensor(face_crop_bgr, out=None, scratch=None, landmarks=None):
+    """
+    Canonical emotion-model input for a face crop: 48x48 grayscale uint8.
+    The model sees exactly this / 255, so it is the only thing that has
+    to cross the process boundary (~2 KB instead of a full-res crop).
+
+    landmarks = (FaceMesh landmarks, w, h) of the same face aligns it:
+    the thumbnail is rotated about its centre so the outer eye corners
+    are level. Without landmarks the crop is used as detected.
+
+    out (48x48 uint8) and scratch (48x48x3 uint8, the resized colour
+    crop) let the caller supply reused buffers (CropPool).
+    """
+    if out is None:
+        out = np.empty(EMOTION_INPUT_SIZE[::-1], dtype=np.uint8)
+
+    if face_crop_bgr.ndim == 2:
+        cv2.resize(face_crop_bgr, EMOTION_INPUT_SIZE, dst=out, interpolation=cv2.INTER_AREA)
+    else:
+        small = cv2.resize(face_crop_bgr, EMOTION_INPUT_SIZE, dst=scratch, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=out)
+
+    roll = eye_roll(landmarks)
+    if roll is None or abs(roll) < MIN_ROLL_DEGREES:
+        return out
+
+    # rotation by -roll in crop pixels, expressed in thumbnail pixels
+    # (the resize scales x and y differently for a non-square crop)
+    h, w = face_crop_bgr.shape[:2]
+    tw, th = EMOTION_INPUT_SIZE
+    k = (tw / w) / (th / h)
+    c, s = math.cos(math.radians(roll)), math.sin(math.radians(roll))
+    a = np.array([[c, s * k], [-s / k, c]])
+    centre = np.array([tw / 2.0, th / 2.0])
+    m = np.hstack([a, (centre - a @ centre)[:, None]])
+    cv2.warpAffine(out.copy(), m, EMOTION_INPUT_SIZE, dst=out,
+                   flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+    return out
+
+
+def pack_tensor(x):
+    """
+    Wire format for emotion_tensor() output (JSON and pickle safe):
+        {"shape": [48, 48], "dtype": "u1" | "f4", "data": base64}
+    "u1" = 0..255 gray (scaled by 1/255 on arrival), "f4" = already normalized.
+    """
+    x = np.ascontiguousarray(x)
+    dtype = "u1" if x.dtype == np.uint8 else "f4"
+    return {
+        "shape": list(x.shape),
+        "dtype": dtype,
+        "data": base64.b64encode(x.astype(dtype, copy=False).tobytes()).decode("ascii"),
+    }
+
+
+def unpack_tensor(msg):
+    """
+    pack_tensor() dict -> float32 (48, 48) array in [0, 1], ready for the model.
+    """
+    shape = tuple(msg["shape"])
+    if shape != EMOTION_INPUT_SIZE[::-1]:
+        raise ValueError(f"expected a {EMOTION_INPUT_SIZE} tensor, got {shape}")
+    if msg["dtype"] not in ("u1", "f4"):
+        raise ValueError(f"unsupported tensor dtype {msg['dtype']!r}")
+
+    x = np.frombuffer(base64.b64decode(msg["data"]), dtype=msg["dtype"]).reshape(shape)
+    if msg["dtype"] == "u1":
+        return x.astype(np.float32) / 255.0
+    return x.astype(np.float32)
@@ -0,0 +1,192 @@
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+
+
+DEFAULT_MODEL_DIR = Path(__file__).resolve().parent.parent / "models"
+
+ALIGN = 64                      # byte alignment of every tensor in weights.bin
+BUNDLE_VERSION = 1
+
+# Keras layer types the NumPy runtime understands
+SUPPORTED_LAYERS = {"InputLayer", "Conv2D", "MaxPooling2D", "AveragePooling2D",
+                    "Flatten", "Dense", "Dropout", "Activation"}
+
+
+def bundle_path(name: str, model_dir=None) -> Path:
+    return Path(model_dir or DEFAULT_MODEL_DIR) / name
+
+
+def _sha256(path: Path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def export_keras_model(model, out_dir, labels=None):
+    """
+    Writes a Keras Sequential model as a model bundle:
+
+        out_dir/manifest.json   layer list + tensor offsets/shapes + checksum
+        out_dir/weights.bin     all float32 tensors, 64-byte aligned
+
+    weights.bin is meant to be memory-mapped read-only (MappedModel), so
+    every process on the host shares one page-cache copy of the weights.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    layers = []
+    offset = 0
+    bin_path = out_dir / "weights.bin"
+    with open(bin_path, "wb") as f:
+        for layer in model.layers:
+            kind = layer.__class__.__name__
+            if kind not in SUPPORTED_LAYERS:
+                raise ValueError(f"layer {layer.name!r}: {kind} is not supported by the NumPy runtime")
+
+            cfg = layer.get_config()
+            spec = {"name": layer.name, "type": kind}
+            for key in ("strides", "padding", "activation", "pool_size", "kernel_size"):
+                if key in cfg:
+                    spec[key] = cfg[key]
+
+            tensors = []
+            for w in layer.get_weights():
+                arr = np.ascontiguousarray(w, dtype=np.float32)
+                pad = (-offset) % ALIGN
+                f.write(b"\0" * pad)
+                offset += pad
+                tensors.append({"offset": offset, "shape": list(arr.shape)})
+                f.write(arr.tobytes())
+                offset += arr.nbytes
+            spec["tensors"] = tensors
+            layers.append(spec)
+
+    manifest = {
+        "version": BUNDLE_VERSION,
+        "dtype": "float32",
+        "input_shape": list(model.input_shape[1:]),
+        "labels": labels,
+        "layers": layers,
+        "size": offset,
+        "sha256": _sha256(bin_path),
+    }
+    with open(out_dir / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def _activation(x, name):
+    if name in (None, "linear"):
+        return x
+    if name == "relu":
+        return np.maximum(x, 0.0, out=x)
+    if name == "softmax":
+        x = x - x.max(axis=-1, keepdims=True)
+        np.exp(x, out=x)
+        x /= x.sum(axis=-1, keepdims=True)
+        return x
+    raise ValueError(f"unsupported activation {name!r}")
+
+
+def _pad_same(x, kh, kw, sh, sw):
+    h, w = x.shape[1:3]
+    ph = max((-(-h // sh) - 1) * sh + kh - h, 0)
+    pw = max((-(-w // sw) - 1) * sw + kw - w, 0)
+    if ph == 0 and pw == 0:
+        return x
+    return np.pad(x, ((0, 0), (ph // 2, ph - ph // 2), (pw // 2, pw - pw // 2), (0, 0)))
+
+
+def _windows(x, kh, kw, sh, sw):
+    # (N, H, W, C) -> (N, Ho, Wo, C, kh, kw) view, no copy
+    v = np.lib.stride_tricks.sliding_window_view(x, (kh, kw), axis=(1, 2))
+    return v[:, ::sh, ::sw]
+
+
+class MappedModel:
+    """
+    NumPy forward pass over a model bundle (export_keras_model) whose
+    weights are a read-only memory map of weights.bin.
+
+    No TensorFlow import, no ~/.deepface lookup and no network: cold
+    start is one mmap + a JSON read, and the OS keeps a single copy of
+    the weight pages however many workers map the same file.
+    """
+
+    def __init__(self, bundle_dir, verify: bool = False):
+        self.bundle_dir = Path(bundle_dir)
+        with open(self.bundle_dir / "manifest.json", "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != BUNDLE_VERSION:
+            raise ValueError(f"unsupported bundle version {self.manifest.get('version')!r}")
+
+        bin_path = self.bundle_dir / "weights.bin"
+        if verify and _sha256(bin_path) != self.manifest["sha256"]:
+            raise ValueError(f"{bin_path}: checksum mismatch")
+
+        self.blob = np.memmap(bin_path, dtype=np.uint8, mode="r")
+        if self.blob.size != self.manifest["size"]:
+            raise ValueError(f"{bin_path}: size {self.blob.size} != manifest {self.manifest['size']}")
+
+        self.labels = self.manifest.get("labels")
+        self.input_shape = tuple(self.manifest["input_shape"])
+        self.layers = []
+        for spec in self.manifest["layers"]:
+            if spec["type"] not in SUPPORTED_LAYERS:
+                raise ValueError(f"layer {spec['name']!r}: unsupported type {spec['type']}")
+            if spec["type"].endswith("Pooling2D") and spec.get("padding", "valid") != "valid":
+                raise ValueError(f"layer {spec['name']!r}: only 'valid' pooling is supported")
+            tensors = [self._tensor(t) for t in spec["tensors"]]
+            self.layers.append((spec, tensors))
+
+    def _tensor(self, t):
+        count = int(np.prod(t["shape"]))
+        # view into the mapping: no copy, read-only
+        return np.frombuffer(self.blob, dtype=np.float32, count=count, offset=t["offset"]).reshape(t["shape"])
+
+    def predict(self, batch):
+        """batch: float32 array of shape (N, *input_shape). Returns (N, outputs)."""
+        x = np.asarray(batch, dtype=np.float32)
+        for spec, tensors in self.layers:
+            kind = spec["type"]
+
+            if kind == "Conv2D":
+                kernel = tensors[0]
+                kh, kw, cin, cout = kernel.shape
+                sh, sw = spec.get("strides", (1, 1))
+                if spec.get("padding", "valid") == "same":
+                    x = _pad_same(x, kh, kw, sh, sw)
+                win = _windows(x, kh, kw, sh, sw)                  # (N, Ho, Wo, C, kh, kw)
+                n, ho, wo = win.shape[:3]
+                cols = win.transpose(0, 1, 2, 4, 5, 3).reshape(n * ho * wo, kh * kw * cin)
+                x = (cols @ kernel.reshape(kh * kw * cin, cout)).reshape(n, ho, wo, cout)
+                if len(tensors) > 1:
+                    x += tensors[1]
+                x = _activation(x, spec.get("activation"))
+
+            elif kind in ("MaxPooling2D", "AveragePooling2D"):
+                ph, pw = spec["pool_size"]
+                sh, sw = spec.get("strides") or (ph, pw)
+                win = _windows(x, ph, pw, sh, sw)
+                x = win.max(axis=(4, 5)) if kind == "MaxPooling2D" else win.mean(axis=(4, 5), dtype=np.float32)
+
+            elif kind == "Flatten":
+                x = x.reshape(x.shape[0], -1)
+
+            elif kind == "Dense":
+                x = x @ tensors[0]
+                if len(tensors) > 1:
+                    x += tensors[1]
+                x = _activation(x, spec.get("activation"))
+
+            elif kind == "Activation":
+                x = _activation(x, spec.get("activation"))
+
+            # InputLayer / Dropout: identity at inference time
+        return x
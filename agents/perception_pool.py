@@ -0,0 +1,259 @@
+import os
+import time
+import queue
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def _perception_worker(tasks, results, min_detect_width, max_detect_width, roi_margin, unified=False):
+    """
+    Worker process: face detection + FaceMesh MAR on frames in shared memory
+    (unified=True: one FaceMeshAgent pass gives both).
+    Results: ("result", frame_id, bbox, mar, mouth_points)
+    """
+    from agents.frame_utils import clamp_crop, expand_bbox
+
+    if unified:
+        # each worker tracks on every n-th frame only, so FaceMesh re-detects more often
+        from agents.face_mesh_agent import FaceMeshAgent
+        mesh_agent = FaceMeshAgent()
+    else:
+        from agents.sensor_agent import FaceDetectionAgent
+        from agents.yawn_agent import YawnAgent
+        face_agent = FaceDetectionAgent(min_detect_width=min_detect_width, max_detect_width=max_detect_width)
+        yawn_agent = YawnAgent()
+    results.put(("ready", os.getpid()))
+
+    shm = None
+    frames = None
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        frame_id, shm_name, n_slots, shape, slot = task
+        if shm is None or shm.name != shm_name:
+            if shm is not None:
+                shm.close()
+            shm = shared_memory.SharedMemory(name=shm_name)
+            frames = np.ndarray((n_slots, *shape), dtype=np.uint8, buffer=shm.buf)
+
+        frame = frames[slot]
+        try:
+            if unified:
+                bbox = mesh_agent.run(frame)
+                mar, mouth = mesh_agent.last["mar"], mesh_agent.last["mouth"]
+            else:
+                bbox = face_agent.run(frame)
+                mar, mouth = None, None
+                if bbox is not None:
+                    roi = clamp_crop(frame, expand_bbox(bbox, roi_margin))
+                    if roi is not None:
+                        mouth = yawn_agent.mouth_points(roi)
+                        if mouth is not None:
+                            mar = yawn_agent.mar_from_points(mouth)
+        except Exception as e:
+            print(f"[POOL] worker {os.getpid()} failed on frame {frame_id}: {e}")
+            bbox, mar, mouth = None, None, None
+
+        results.put(("result", frame_id, bbox, mar, mouth))
+
+    if shm is not None:
+        shm.close()
+
+
+class PerceptionPool:
+    """
+    Runs FaceDetectionAgent + FaceMesh (YawnAgent.measure) in a pool of
+    worker processes so perception can use more than one core.
+
+    Frames are copied once into a shared-memory ring of slots; workers
+    read them in place. Results are put back in frame order before they
+    are returned, so the window/yawn logic sees frames in capture order.
+
+        pool = PerceptionPool(workers=3).start()
+        out = pool.process(frame, ts)   # oldest finished frame or None
+        # out = {"frame_id", "ts", "frame", "bbox", "mar", "mouth"}
+        # out["frame"] stays valid until the next process() call
+
+    Yawn timing stays in the caller (YawnAgent.update), because it needs
+    the ordered stream of MAR values.
+    """
+
+    def __init__(self, workers: int = 2, min_detect_width=None, max_detect_width=None,
+                 roi_margin: float = 0.4, result_timeout: float = 2.0, unified: bool = False):
+        self.workers = max(1, workers)
+        self.min_detect_width = min_detect_width
+        self.max_detect_width = max_detect_width
+        self.roi_margin = roi_margin
+        self.result_timeout = result_timeout
+
+        # in flight (one per worker + one queued each) + one held by the caller
+        self.n_slots = 2 * self.workers + 1
+
+        ctx = mp.get_context("spawn")
+        self.tasks = ctx.Queue()
+        self.results = ctx.Queue()
+        self.procs = [
+            ctx.Process(
+                target=_perception_worker,
+                args=(self.tasks, self.results, min_detect_width, max_detect_width, roi_margin, unified),
+                daemon=True
+            )
+            for _ in range(self.workers)
+        ]
+
+        self.shm = None
+        self.frames = None
+        self.shape = None
+        self.free_slots = []
+
+        self.next_frame_id = 0       # next id to submit
+        self.next_result_id = 0      # next id to hand out (ordering)
+        self.pending = {}            # frame_id -> (slot, ts)
+        self.done = {}               # frame_id -> (bbox, mar, mouth), waiting for order
+        self.abandoned = {}          # frame_id -> slot of a frame given up on, until its late result comes
+        self.held_slot = None        # slot of the frame returned last time
+
+    def start(self, ready_timeout: float = 120.0):
+        for p in self.procs:
+            p.start()
+
+        for _ in self.procs:
+            msg = self.results.get(timeout=ready_timeout)
+            if msg[0] != "ready":
+                raise RuntimeError(f"unexpected pool message: {msg}")
+
+        print(f"[POOL] {self.workers} perception workers ready")
+        return self
+
+    def _ensure_slots(self, shape):
+        if self.shape == shape:
+            return
+
+        if self.pending:
+            raise ValueError(f"frame shape changed from {self.shape} to {shape} with frames in flight")
+
+        self._free_shm()
+        nbytes = int(np.prod(shape)) * self.n_slots
+        self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self.frames = np.ndarray((self.n_slots, *shape), dtype=np.uint8, buffer=self.shm.buf)
+        self.shape = shape
+        self.free_slots = list(range(self.n_slots))
+        self.held_slot = None
+        self.abandoned.clear()       # workers still reading them keep the old mapping
+
+    def submit(self, frame, ts: float):
+        """
+        Copies frame into a free slot and queues it. Returns False when
+        all slots are busy (caller should drop the frame).
+        """
+        self._ensure_slots(tuple(frame.shape))
+        if not self.free_slots and not self.pending and self.abandoned:
+            # Every slot waits for a result that never came: the worker died.
+            # Last resort, a hung worker could still be reading one of them.
+            print(f"[POOL] reclaiming {len(self.abandoned)} slots of lost frames")
+            self.free_slots.extend(self.abandoned.values())
+            self.abandoned.clear()
+        if not self.free_slots:
+            return False
+
+        slot = self.free_slots.pop()
+        np.copyto(self.frames[slot], frame)
+
+        frame_id = self.next_frame_id
+        self.next_frame_id += 1
+        self.pending[frame_id] = (slot, ts)
+        self.tasks.put((frame_id, self.shm.name, self.n_slots, self.shape, slot))
+        return True
+
+    def _collect(self, timeout=None):
+        """
+        Moves one worker result into self.done. Returns False if none arrived.
+        """
+        try:
+            msg = self.results.get(timeout=timeout) if timeout else self.results.get_nowait()
+        except queue.Empty:
+            return False
+
+        if msg[0] == "result":
+            _, frame_id, bbox, mar, mouth = msg
+            if frame_id in self.abandoned:
+                # late result of a skipped frame: the worker is done with the slot now
+                self.free_slots.append(self.abandoned.pop(frame_id))
+            elif frame_id >= self.next_result_id:
+                self.done[frame_id] = (bbox, mar, mouth)
+        return True
+
+    def next_result(self, block: bool = False):
+        """
+        Returns the next finished frame in submit order, or None.
+        With block=True waits up to result_timeout for it; a frame that
+        still has no result then is treated as lost and skipped.
+        """
+        if self.held_slot is not None:
+            self.free_slots.append(self.held_slot)
+            self.held_slot = None
+
+        while self._collect():
+            pass
+
+        frame_id = self.next_result_id
+        if frame_id not in self.pending:
+            return None
+
+        if frame_id not in self.done:
+            if not block:
+                return None
+
+            deadline = time.time() + self.result_timeout
+            while frame_id not in self.done and time.time() < deadline:
+                self._collect(timeout=0.05)
+
+            if frame_id not in self.done:
+                # Worker lost this frame (crash/hang): skip it instead of stalling.
+                # Its slot stays out of use until the result turns up (a slow
+                # worker may still be reading it), see _collect().
+                slot, _ts = self.pending.pop(frame_id)
+                self.abandoned[frame_id] = slot
+                self.next_result_id += 1
+                print(f"[POOL] frame {frame_id} lost, skipping")
+                return None
+
+        self.next_result_id += 1
+        bbox, mar, mouth = self.done.pop(frame_id)
+        slot, ts = self.pending.pop(frame_id)
+        self.held_slot = slot
+
+        return {"frame_id": frame_id, "ts": ts, "frame": self.frames[slot],
+                "bbox": bbox, "mar": mar, "mouth": mouth}
+
+    def process(self, frame, ts: float):
+        """
+        Submit one frame and return the oldest finished one (or None).
+        Blocks only when every slot is in flight.
+        """
+        submitted = self.submit(frame, ts)
+        out = self.next_result(block=not self.free_slots)
+        if not submitted and out is not None:
+            self.submit(frame, ts)
+        return out
+
+    def _free_shm(self):
+        if self.shm is not None:
+            self.frames = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def close(self):
+        for _ in self.procs:
+            self.tasks.put(None)
+        for p in self.procs:
+            p.join(timeout=3)
+            if p.is_alive():
+                p.terminate()
+        self._free_shm()
@@ -1,34 +1,91 @@
+import os
+import sys
 import cv2
 import mediapipe as mp
 
+# make project root importable when run directly (launcher option 1)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.frame_buffers import ReusableBuffer
+
 mp_face_detection = mp.solutions.face_detection
 
 
 class FaceDetectionAgent:
-    def __init__(self):
+    """
+    MediaPipe face detection.
+
+    With min_detect_width/max_detect_width set, detection runs on a
+    downscaled copy of the frame and the bbox is mapped back to full
+    resolution. The detection width adapts to the last face size so the
+    face stays around TARGET_FACE_PX wide in the small image: big faces
+    (close to the camera) are detected on a tiny image, small or lost
+    faces get the larger one. Without them the full frame is used.
+    """
+
+    TARGET_FACE_PX = 64   # face width we want in the detection image
+
+    def __init__(self, min_detect_width=None, max_detect_width=None):
         self.fd = mp_face_detection.FaceDetection(
             model_selection=0,
             min_detection_confidence=0.6
         )
 
+        self.min_detect_width = min_detect_width
+        self.max_detect_width = max_detect_width
+        self.last_face_frac = None   # last bbox width / frame width
+        self.last_detect_width = None
+
+        # reused every frame instead of allocating new images
+        self._small_buf = ReusableBuffer()
+        self._rgb_buf = ReusableBuffer()
+
+    def _detect_width(self, frame_w):
+        if self.max_detect_width is None:
+            return frame_w
+
+        lo = self.min_detect_width or self.max_detect_width
+        hi = self.max_detect_width
+
+        if self.last_face_frac is None:
+            width = hi
+        else:
+            width = int(self.TARGET_FACE_PX / max(self.last_face_frac, 1e-3))
+
+        return min(frame_w, max(lo, min(hi, width)))
+
     def run(self, frame_bgr):
-        frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+        h, w, _ = frame_bgr.shape
+
+        detect_w = self._detect_width(w)
+        self.last_detect_width = detect_w
+        if detect_w < w:
+            detect_h = max(1, int(h * detect_w / w))
+            small = self._small_buf.view((detect_h, detect_w, 3))
+            cv2.resize(frame_bgr, (detect_w, detect_h), dst=small, interpolation=cv2.INTER_AREA)
+        else:
+            small = frame_bgr
+
+        frame_rgb = self._rgb_buf.view(small.shape)
+        cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=frame_rgb)
 
         results = self.fd.process(frame_rgb)
 
         if not results.detections:
+            self.last_face_frac = None
             return None
 
         detection = max(results.detections, key=lambda d: d.score[0])
         bbox = detection.location_data.relative_bounding_box
 
-        h, w, _ = frame_bgr.shape
-
+        # Relative bbox -> full-resolution pixels
         x = max(int(bbox.xmin * w), 0)
         y = max(int(bbox.ymin * h), 0)
         bw = max(int(bbox.width * w), 1)
         bh = max(int(bbox.height * h), 1)
 
+        self.last_face_frac = bw / w
+
         return (x, y, bw, bh)
 
 
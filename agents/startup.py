@@ -0,0 +1,80 @@
+import time
+import threading
+
+
+class StartupClock:
+    """
+    Measures startup milestones (first frame, first decision, ...)
+    relative to the moment the program started.
+    Each milestone is printed only once.
+    """
+
+    def __init__(self, start_ts=None):
+        self.start_ts = start_ts if start_ts is not None else time.perf_counter()
+        self.marks = {}
+
+    def mark(self, name: str):
+        if name in self.marks:
+            return self.marks[name]
+
+        elapsed = time.perf_counter() - self.start_ts
+        self.marks[name] = elapsed
+        print(f"[STARTUP] time_to_{name}={elapsed:.2f}s")
+        return elapsed
+
+
+class AgentLoader:
+    """
+    Builds heavy agents (MediaPipe graphs, emotion backend) in background
+    threads so the camera can open and show frames right away.
+
+    Usage:
+        loader = AgentLoader()
+        loader.load("face", lambda: FaceDetectionAgent())
+        ...
+        face_agent = loader.get("face")   # None until ready
+    """
+
+    def __init__(self, clock: StartupClock = None):
+        self.clock = clock or StartupClock()
+        self._agents = {}
+        self._status = {}
+        self._lock = threading.Lock()
+
+    def load(self, name: str, factory):
+        with self._lock:
+            self._status[name] = "loading"
+
+        def _job():
+            t0 = time.perf_counter()
+            try:
+                agent = factory()
+            except Exception as e:
+                with self._lock:
+                    self._status[name] = "failed"
+                print(f"[STARTUP] {name} failed: {e}")
+                return
+
+            with self._lock:
+                self._agents[name] = agent
+                self._status[name] = "ready"
+            print(f"[STARTUP] {name} ready in {time.perf_counter() - t0:.2f}s")
+            self.clock.mark(f"{name}_ready")
+
+        threading.Thread(target=_job, daemon=True).start()
+
+    def get(self, name: str):
+        with self._lock:
+            return self._agents.get(name)
+
+    def status(self, name: str):
+        with self._lock:
+            return self._status.get(name, "missing")
+
+    def all_ready(self):
+        with self._lock:
+            return all(s == "ready" for s in self._status.values())
+
+    def status_text(self):
+        with self._lock:
+            return " | ".join(f"{name}={s}" for name, s in self._status.items())
@@ -0,0 +1,300 @@
+import os
+import subprocess
+import time
+from collections import deque
+from pathlib import Path
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except Exception:
+    PSUTIL_AVAILABLE = False
+
+
+# The supervisor tells each child where to put its heartbeat file
+HEARTBEAT_ENV = "AGENT_HEARTBEAT_FILE"
+
+
+class Heartbeat:
+    """
+    Child side of the supervisor: beat() touches the heartbeat file
+    (at most once per `every` seconds, so it is cheap to call per frame
+    or per request). The supervisor restarts a child whose file stops
+    changing, so beat() belongs in the loop that must keep moving, not
+    in a helper thread.
+    """
+
+    def __init__(self, path, every=1.0):
+        self.path = Path(path)
+        self.every = every
+        self.last_ts = 0.0
+
+    def beat(self, now=None):
+        now = time.time() if now is None else now
+        if now - self.last_ts < self.every:
+            return
+        self.last_ts = now
+        try:
+            self.path.touch()
+        except OSError:
+            pass
+
+
+def heartbeat_from_env(every=1.0):
+    """Heartbeat for this process when it runs under a Supervisor, else None."""
+    path = os.environ.get(HEARTBEAT_ENV)
+    return Heartbeat(path, every) if path else None
+
+
+class ManagedProcess:
+    """
+    One long-lived child of the Supervisor.
+
+    cmd runs with cwd, its stdout/stderr are appended to
+    <log_dir>/<name>.log. The child is restarted when
+      - it exits (stop_on_clean_exit: exit code 0 ends the supervisor instead,
+        e.g. the camera process after ESC)
+      - its heartbeat file is older than heartbeat_timeout seconds
+        (after startup_grace seconds for imports / model loading)
+      - its memory (with its own children) exceeds max_rss_mb (needs psutil)
+    Restarts wait min_backoff, doubling up to max_backoff; a child that
+    stayed up for stable_seconds starts again from min_backoff.
+    """
+
+    def __init__(self, name, cmd, cwd, log_dir, heartbeat_timeout=None, startup_grace=120.0,
+                 max_rss_mb=None, min_backoff=1.0, max_backoff=60.0, stable_seconds=60.0,
+                 stop_on_clean_exit=False, env=None):
+        self.name = name
+        self.cmd = [str(c) for c in cmd]
+        self.cwd = cwd
+        self.log_path = Path(log_dir) / f"{name}.log"
+        self.heartbeat_path = Path(log_dir) / f"{name}.heartbeat"
+        self.heartbeat_timeout = heartbeat_timeout
+        self.startup_grace = startup_grace
+        self.max_rss_mb = max_rss_mb
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.stable_seconds = stable_seconds
+        self.stop_on_clean_exit = stop_on_clean_exit
+        self.env = env or {}
+
+        self.proc = None
+        self.ps = None
+        self.started_ts = None
+        self.next_start_ts = 0.0
+        self.failures = 0           # restarts since the last stable run
+        self.restarts = 0
+        self.last_reason = None
+        self.cpu_mark = None        # (wall ts, cpu seconds) of the last usage() call
+
+    def start(self, now=None):
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self.heartbeat_path.unlink(missing_ok=True)
+
+        env = dict(os.environ, **self.env)
+        env[HEARTBEAT_ENV] = str(self.heartbeat_path)
+        env.setdefault("PYTHONUNBUFFERED", "1")     # log lines show up while the child runs
+
+        with open(self.log_path, "a", encoding="utf-8") as log:
+            log.write(f"\n==== {time.strftime('%Y-%m-%d %H:%M:%S')} start: {' '.join(self.cmd)}\n")
+            log.flush()
+            self.proc = subprocess.Popen(self.cmd, cwd=str(self.cwd), stdout=log,
+                                         stderr=subprocess.STDOUT, env=env)
+
+        self.started_ts = time.time() if now is None else now
+        self.cpu_mark = None
+        self.ps = None
+        if PSUTIL_AVAILABLE:
+            try:
+                self.ps = psutil.Process(self.proc.pid)
+            except Exception:
+                pass
+        print(f"[SUPERVISOR] {self.name} started (pid={self.proc.pid})")
+        return self
+
+    def is_running(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def heartbeat_age(self, now):
+        try:
+            return now - self.heartbeat_path.stat().st_mtime
+        except OSError:
+            return now - self.started_ts   # no beat yet
+
+    def _measure(self):
+        """(cpu seconds, rss bytes) of the child and its own children."""
+        procs = [self.ps]
+        try:
+            procs += self.ps.children(recursive=True)
+        except Exception:
+            pass
+
+        cpu_s, rss = 0.0, 0
+        for p in procs:
+            try:
+                cpu_s += sum(p.cpu_times()[:2])
+                rss += p.memory_info().rss
+            except Exception:
+                pass    # exited / no access
+        return cpu_s, rss
+
+    def usage(self, now):
+        """(cpu share of one core since the last call, rss MB) incl. children; (None, None) without psutil."""
+        if self.ps is None:
+            return None, None
+        cpu_s, rss = self._measure()
+        cpu = None
+        if self.cpu_mark is not None and now > self.cpu_mark[0]:
+            cpu = max(0.0, cpu_s - self.cpu_mark[1]) / (now - self.cpu_mark[0])
+        self.cpu_mark = (now, cpu_s)
+        return cpu, rss / (1024 * 1024)
+
+    def check(self, now):
+        """Reason this child needs a restart ("exit:<code>", "hung", "memory") or None."""
+        code = self.proc.poll()
+        if code is not None:
+            return f"exit:{code}"
+
+        uptime = now - self.started_ts
+        if self.heartbeat_timeout is not None:
+            age = self.heartbeat_age(now)
+            limit = self.heartbeat_timeout if self.heartbeat_path.exists() else self.startup_grace
+            if uptime > limit and age > limit:
+                return "hung"
+
+        if self.max_rss_mb is not None and self.ps is not None:
+            _cpu_s, rss = self._measure()
+            if rss / (1024 * 1024) > self.max_rss_mb:
+                return "memory"
+        return None
+
+    def stop(self, timeout=5.0):
+        proc = self.proc
+        if proc is None:
+            return
+        self.proc = None
+
+        # workers started by the child (emotion / perception processes) go too
+        orphans = []
+        if self.ps is not None:
+            try:
+                orphans = self.ps.children(recursive=True)
+            except Exception:
+                pass
+        self.ps = None
+
+        if proc.poll() is None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+        for child in orphans:
+            try:
+                child.kill()
+            except Exception:
+                pass
+
+    def schedule_restart(self, now, reason):
+        uptime = now - self.started_ts if self.started_ts is not None else 0.0
+        if uptime >= self.stable_seconds:
+            self.failures = 0
+        delay = min(self.max_backoff, self.min_backoff * 2 ** self.failures)
+        self.failures += 1
+        self.restarts += 1
+        self.last_reason = reason
+        self.next_start_ts = now + delay
+        return delay
+
+    def log_tail(self, lines=5):
+        try:
+            with open(self.log_path, "r", encoding="utf-8", errors="replace") as f:
+                return [line.rstrip() for line in deque(f, maxlen=lines)]
+        except OSError:
+            return []
+
+
+class Supervisor:
+    """
+    Keeps the agent processes (camera pipeline, emotion server, ...)
+    running as independent children, so a TensorFlow crash, a hang or a
+    slow memory leak in one of them costs a restart of that process only.
+
+    run() polls every poll_interval seconds: crashed, hung and oversized
+    children are killed and restarted with backoff (ManagedProcess), and
+    every report_every seconds one [SUPERVISOR] line per child shows
+    pid, uptime, restarts, heartbeat age and (psutil) CPU / RSS.
+    run() returns when a stop_on_clean_exit child exits with code 0 or
+    on Ctrl+C, and stops all children.
+    """
+
+    def __init__(self, processes, poll_interval=1.0, report_every=30.0):
+        self.processes = list(processes)
+        self.poll_interval = poll_interval
+        self.report_every = report_every
+        self.last_report_ts = 0.0
+
+    def poll(self, now):
+        """One supervision pass. False = a primary child finished, stop."""
+        for p in self.processes:
+            if p.proc is None:
+                if now >= p.next_start_ts:
+                    try:
+                        p.start(now)
+                    except OSError as e:
+                        delay = p.schedule_restart(now, f"start_failed: {e}")
+                        print(f"[SUPERVISOR] {p.name} failed to start: {e} (retry in {delay:.0f}s)")
+                continue
+
+            reason = p.check(now)
+            if reason is None:
+                continue
+            if reason == "exit:0" and p.stop_on_clean_exit:
+                print(f"[SUPERVISOR] {p.name} finished, stopping")
+                return False
+
+            p.stop()
+            delay = p.schedule_restart(now, reason)
+            print(f"[SUPERVISOR] {p.name} {reason} after {now - p.started_ts:.0f}s "
+                  f"-> restart #{p.restarts} in {delay:.0f}s")
+            for line in p.log_tail():
+                print(f"[SUPERVISOR]   {p.name}| {line}")
+        return True
+
+    def report(self, now):
+        for p in self.processes:
+            if not p.is_running():
+                wait = max(0.0, p.next_start_ts - now)
+                print(f"[SUPERVISOR] {p.name:<14} down restarts={p.restarts} "
+                      f"last={p.last_reason} next_start={wait:.0f}s")
+                continue
+            cpu, rss = p.usage(now)
+            usage = "" if rss is None else (
+                f" cpu={'n/a' if cpu is None else f'{cpu:.0%}'} rss={rss:.0f}MB")
+            beat = f"{p.heartbeat_age(now):.1f}s" if p.heartbeat_path.exists() else "none"
+            print(f"[SUPERVISOR] {p.name:<14} pid={p.proc.pid} up={now - p.started_ts:.0f}s "
+                  f"restarts={p.restarts} heartbeat={beat}{usage}")
+
+    def run(self):
+        if not PSUTIL_AVAILABLE:
+            print("[SUPERVISOR] psutil not installed: no CPU/RSS report, memory limits off")
+        try:
+            while True:
+                now = time.time()
+                if not self.poll(now):
+                    break
+                if now - self.last_report_ts >= self.report_every:
+                    self.last_report_ts = now
+                    self.report(now)
+                time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            print("\n[SUPERVISOR] Stopped by user.")
+        finally:
+            self.stop_all()
+
+    def stop_all(self):
+        for p in reversed(self.processes):
+            p.stop()
+        print("[SUPERVISOR] all processes stopped")
+
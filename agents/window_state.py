@@ -0,0 +1,154 @@
+"""
+Window state shared by every camera loop (final_agent, the warm
+launcher, the bus window node, replay / evaluation / load generation):
+a window starts when a face appears, resets when it is lost and ends
+with one decision over its emotion samples and yawn stats.
+
+state is the plain dict from new_window_state(); the camera loop is its
+only writer.
+"""
+
+
+def record_emotion(state, emo, ts, recorder=None, source="deepface"):
+    if emo:
+        if recorder is not None:
+            recorder.add_emotion(ts, emo)
+        state["emotion_samples"].append(emo)
+        state["last_emotion_text"] = f"{emo['emotion']} ({emo['confidence']:.1f})"
+        print(f"[EMOTION] {state['last_emotion_text']} via {source}")
+    else:
+        state["last_emotion_text"] = "none"
+
+
+def apply_emotion_results(state, emotion_pipeline, sampler=None, recorder=None, cascade=None):
+    """
+    Drains finished emotion jobs into the window state.
+    Called once per frame from the camera loop (the only writer of state).
+    """
+    for job, emo in emotion_pipeline.drain():
+        if sampler is not None and job.latency is not None:
+            sampler.record_latency(job.latency)
+
+        # DeepFace answers train the cheap stage, even for an old window
+        if cascade is not None and job.features is not None:
+            cascade.learn(job.features, emo, job.guess)
+
+        # Result of an older window (or a cancelled job): ignore
+        if job.cancelled or job.window_seq != state["window_seq"]:
+            continue
+
+        record_emotion(state, emo, job.submitted_ts, recorder)
+
+
+def summarize_emotions(samples):
+    if not samples:
+        return None
+
+    counts = {}
+    best_conf = {}
+
+    for s in samples:
+        emo = s.get("emotion")
+        conf = float(s.get("confidence", 0.0))
+        if not emo:
+            continue
+
+        counts[emo] = counts.get(emo, 0) + 1
+        best_conf[emo] = max(best_conf.get(emo, 0.0), conf)
+
+    if not counts:
+        return None
+
+    winner = sorted(
+        counts.keys(),
+        key=lambda e: (counts[e], best_conf.get(e, 0.0)),
+        reverse=True
+    )[0]
+
+    return {"emotion": winner, "confidence": best_conf.get(winner, 0.0)}
+
+
+def new_window_state():
+    return {
+        "window_start_ts": None,
+        "window_seq": 0,                  # increments whenever window resets/restarts
+        "last_emotion_sample_ts": 0.0,
+        "emotion_samples": [],
+        "yawn_any": False,
+        "max_yawn_duration": 0.0,
+        "max_mar": 0.0,
+        "last_emotion_text": "none",
+        "last_decision_text": "none",
+        "yawn_text": None                 # cached overlay text for the yawn stats
+    }
+
+
+def _clear_window_stats(state):
+    state["last_emotion_sample_ts"] = 0.0
+    state["emotion_samples"] = []
+    state["yawn_any"] = False
+    state["max_yawn_duration"] = 0.0
+    state["max_mar"] = 0.0
+    state["yawn_text"] = None
+
+
+def reset_window(state, yawn_agent=None, emotion_pipeline=None):
+    state["window_start_ts"] = None
+    state["window_seq"] += 1
+
+    # results for the old window are useless: stop spending CPU on them
+    if emotion_pipeline is not None:
+        emotion_pipeline.cancel(state["window_seq"])
+
+    _clear_window_stats(state)
+    state["last_emotion_text"] = "none"
+
+    # reset yawn memory when face disappears
+    if yawn_agent is not None:
+        yawn_agent.reset()
+
+
+def start_window(state, now, emotion_pipeline=None):
+    """
+    Starts a fresh window at now: when a face appears and
+    right after each decision (face still present). The overlay texts
+    stay; the caller resets its EmotionSampler / FrameSelector.
+    """
+    state["window_start_ts"] = now
+    state["window_seq"] += 1
+    if emotion_pipeline is not None:
+        emotion_pipeline.cancel(state["window_seq"])
+    _clear_window_stats(state)
+
+
+def add_yawn(state, yawn_out):
+    """
+    Folds one YawnAgent.update() result ({"yawn", "duration", "mar"})
+    into the window; state["yawn_text"] is rebuilt only when the numbers change.
+    """
+    prev = (state["yawn_any"], state["max_yawn_duration"], state["max_mar"])
+    state["yawn_any"] = state["yawn_any"] or bool(yawn_out.get("yawn", False))
+    state["max_yawn_duration"] = max(state["max_yawn_duration"], float(yawn_out.get("duration", 0.0)))
+    state["max_mar"] = max(state["max_mar"], float(yawn_out.get("mar", 0.0)))
+
+    if state["yawn_text"] is None or prev != (state["yawn_any"], state["max_yawn_duration"], state["max_mar"]):
+        state["yawn_text"] = (
+            f"Yawn: {state['yawn_any']} "
+            f"(dur={state['max_yawn_duration']:.1f}s mar={state['max_mar']:.3f})"
+        )
+
+
+def close_window(state, decision_agent):
+    """
+    Decision for the finished window. Returns (decision, emotion_info, yawn_info);
+    state["last_decision_text"] is updated, the caller starts the next window.
+    """
+    emotion_info = summarize_emotions(state["emotion_samples"])
+    yawn_info = {
+        "yawn": state["yawn_any"],
+        "duration": state["max_yawn_duration"],
+        "mar": state["max_mar"]
+    }
+    decision = decision_agent.run(emotion_info, yawn_info)
+    state["last_decision_text"] = f"{decision['state']} ({decision['reason']})"
+    return decision, emotion_info, yawn_info
@@ -1,18 +1,45 @@
 import time
 import cv2
-import mediapipe as mp
 import math
 
+from agents.frame_buffers import ReusableBuffer
+
 
 class YawnAgent:
-    def __init__(self):
-        self.mesh = mp.solutions.face_mesh.FaceMesh(
-            static_image_mode=False,
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
+    """
+    Mouth-aspect-ratio (MAR) yawn detector.
+
+    run(frame) = update(measure(frame), now). The two halves can also be
+    used separately: measure() only needs FaceMesh (can run in a worker
+    process), update() only keeps the yawn timing state.
+
+    update() works on timestamps, not frame counts, so FaceMesh does not
+    have to run on every frame:
+      - MAR is smoothed with an EMA whose weight depends on the time
+        since the previous sample (same smoothing at 30, 10 or 5 fps)
+      - hysteresis: the mouth opens after staying above MAR_THRESHOLD
+        for OPEN_HOLD_SECONDS and only closes
+        after staying below MAR_THRESHOLD * MAR_CLOSE_RATIO for
+        CLOSE_HOLD_SECONDS, so one noisy sample does not end a yawn;
+        a closing mouth only counts as open again after staying above
+        that level for REOPEN_HOLD_SECONDS, so one noisy sample does not
+        stretch a yawn either
+      - open/close times are interpolated between samples, so the
+        measured duration does not depend on when the mesh happened to run
+    """
+
+    def __init__(self, use_mesh: bool = True):
+        self.mesh = None
+        if use_mesh:
+            # imported here so the yawn timer (use_mesh=False) works without mediapipe
+            import mediapipe as mp
+            self.mesh = mp.solutions.face_mesh.FaceMesh(
+                static_image_mode=False,
+                max_num_faces=1,
+                refine_landmarks=True,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5
+            )
 
         # Landmark indices (MediaPipe FaceMesh)
         self.UP = 13   # upper inner lip
@@ -20,46 +47,166 @@ class YawnAgent:
         self.LC = 61   # left mouth corner
         self.RC = 291  # right mouth corner
 
-        self.yawn_start = None
+        self.yawn_start = None      # interpolated time the mouth opened (None = closed)
+        self.mouth_open = False
+        self.mar_ema = None
+        self.last_ts = None
+        self.close_since = None     # interpolated time the mouth started closing
+        self.reopen_since = None    # ... and the time it went back above the close level
+        self.open_since = None      # interpolated time a closed mouth went above MAR_THRESHOLD
+        self.yawn_counted = False   # current opening already counted as a yawn
+        self.yawn_count = 0
+        self._rgb_buf = ReusableBuffer()   # reused RGB copy of the FaceMesh input
+        self.last_landmarks = None         # (landmarks, w, h) of the last mesh pass, for other consumers
 
         # Tune these if needed
-        self.MAR_THRESHOLD = 0.08
+        self.MAR_THRESHOLD = 0.08     # mouth opens above this (smoothed MAR)
+        self.MAR_CLOSE_RATIO = 0.75   # ... and closes below MAR_THRESHOLD * this
         self.YAWN_MIN_SECONDS = 1.6
+        self.OPEN_HOLD_SECONDS = 0.2  # mouth must stay open this long to start one
+        self.CLOSE_HOLD_SECONDS = 0.3 # mouth must stay closed this long to end a yawn
+        self.REOPEN_HOLD_SECONDS = 0.3 # ... and open again this long to cancel the closing
+        self.EMA_TAU = 0.15           # smoothing time constant (s)
+        self.MAX_GAP_SECONDS = 1.0    # longer gaps between samples restart the smoothing
 
-    def run(self, frame_bgr):
-        frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+    def mouth_points(self, frame_bgr):
+        """
+        Returns the pixel coordinates of (UP, LO, LC, RC) in frame_bgr,
+        or None if no face was found.
+        """
+        frame_rgb = self._rgb_buf.view(frame_bgr.shape)
+        cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB, dst=frame_rgb)
         res = self.mesh.process(frame_rgb)
 
         if not res.multi_face_landmarks:
-            self.yawn_start = None
-            return {"yawn": False, "duration": 0.0, "mar": 0.0}
+            self.last_landmarks = None
+            return None
 
         lm = res.multi_face_landmarks[0].landmark
         h, w = frame_bgr.shape[:2]
+        self.last_landmarks = (lm, w, h)
 
         def pt(i):
             return (lm[i].x * w, lm[i].y * h)
 
+        return (pt(self.UP), pt(self.LO), pt(self.LC), pt(self.RC))
+
+    @staticmethod
+    def mar_from_points(points):
+        up, lo, lc, rc = points
+
         def dist(a, b):
             return math.hypot(a[0] - b[0], a[1] - b[1])
 
-        up = pt(self.UP)
-        lo = pt(self.LO)
-        lc = pt(self.LC)
-        rc = pt(self.RC)
-
         vertical = dist(up, lo)
         horizontal = dist(lc, rc)
-        mar = vertical / max(horizontal, 1e-6)
-
-        now = time.time()
-        if mar > self.MAR_THRESHOLD:
-            if self.yawn_start is None:
-                self.yawn_start = now
-            duration = now - self.yawn_start
-            is_yawn = duration >= self.YAWN_MIN_SECONDS
-            return {"yawn": is_yawn, "duration": duration, "mar": mar}
+        return vertical / max(horizontal, 1e-6)
+
+    def measure(self, frame_bgr):
+        """
+        Returns the MAR of the face in frame_bgr, or None if no face was found.
+        """
+        points = self.mouth_points(frame_bgr)
+        if points is None:
+            return None
+        return self.mar_from_points(points)
+
+    def reset(self):
+        """
+        Forgets the current mouth state (face lost or window restarted).
+        """
+        self._reset_timing()
+        self.last_landmarks = None
+
+    def _reset_timing(self):
+        # smoothing and open/close state only: the landmarks measure()
+        # stored for the current frame stay valid
+        self.yawn_start = None
+        self.mouth_open = False
+        self.mar_ema = None
+        self.last_ts = None
+        self.close_since = None
+        self.reopen_since = None
+        self.open_since = None
+        self.yawn_counted = False
+
+    @staticmethod
+    def _crossing(t0, v0, t1, v1, level):
+        # linear interpolation of when the smoothed MAR crossed `level`
+        if v1 == v0:
+            return t1
+        return t0 + (t1 - t0) * min(1.0, max(0.0, (level - v0) / (v1 - v0)))
+
+    def update(self, mar, now):
+        """
+        Advances the yawn state with one MAR measurement taken at `now`
+        (capture timestamp; None = no face). Frames without a measurement
+        can simply be skipped.
+        """
+        if mar is None:
+            self.reset()
+            return {"yawn": False, "duration": 0.0, "mar": 0.0}
+
+        prev_ts, prev_ema = self.last_ts, self.mar_ema
+        if prev_ts is None or now - prev_ts > self.MAX_GAP_SECONDS:
+            # first sample (or a long gap): no history to smooth or interpolate over
+            self._reset_timing()
+            prev_ts, prev_ema = now, mar
+            ema = mar
         else:
-            self.yawn_start = None
-            return {"yawn": False, "duration": 0.0, "mar": mar}
-        
\ No newline at end of file
+            alpha = 1.0 - math.exp(-max(0.0, now - prev_ts) / self.EMA_TAU)
+            ema = prev_ema + alpha * (mar - prev_ema)
+        self.mar_ema = ema
+        self.last_ts = now
+
+        close_level = self.MAR_THRESHOLD * self.MAR_CLOSE_RATIO
+
+        if not self.mouth_open:
+            if ema <= self.MAR_THRESHOLD:
+                self.open_since = None
+                return {"yawn": False, "duration": 0.0, "mar": mar}
+            if self.open_since is None:
+                self.open_since = self._crossing(prev_ts, prev_ema, now, ema, self.MAR_THRESHOLD)
+            if now - self.open_since < self.OPEN_HOLD_SECONDS:
+                return {"yawn": False, "duration": 0.0, "mar": mar}
+            # open since the crossing, not since it was confirmed
+            self.mouth_open = True
+            self.close_since = None
+            self.reopen_since = None
+            self.yawn_counted = False
+            self.yawn_start = self.open_since
+            self.open_since = None
+
+        if ema < close_level:
+            self.reopen_since = None
+            if self.close_since is None:
+                self.close_since = self._crossing(prev_ts, prev_ema, now, ema, close_level)
+            if now - self.close_since >= self.CLOSE_HOLD_SECONDS:
+                # closed: the yawn lasted until the interpolated close time
+                duration = max(0.0, self.close_since - self.yawn_start)
+                is_yawn = duration >= self.YAWN_MIN_SECONDS
+                if is_yawn and not self.yawn_counted:
+                    self.yawn_count += 1
+                self.mouth_open = False
+                self.yawn_start = None
+                self.close_since = None
+                self.yawn_counted = False
+                return {"yawn": is_yawn, "duration": duration, "mar": mar}
+        elif self.close_since is not None:
+            # back above the close level: the mouth reopened only if it stays there
+            if self.reopen_since is None:
+                self.reopen_since = self._crossing(prev_ts, prev_ema, now, ema, close_level)
+            if now - self.reopen_since >= self.REOPEN_HOLD_SECONDS:
+                self.close_since = None
+                self.reopen_since = None
+
+        end = now if self.close_since is None else self.close_since
+        duration = end - self.yawn_start
+        is_yawn = duration >= self.YAWN_MIN_SECONDS
+        if is_yawn and not self.yawn_counted:
+            self.yawn_counted = True
+            self.yawn_count += 1
+        return {"yawn": is_yawn, "duration": duration, "mar": mar}
+
+    def run(self, frame_bgr):
+        return self.update(self.measure(frame_bgr), time.time())
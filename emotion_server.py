@@ -0,0 +1,221 @@
+from pathlib import Path
+import os
+import sys
+import time
+import queue
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener
+
+import numpy as np
+
+# Optional: reduce TensorFlow logs a bit
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+# Make project root importable
+ROOT = Path(__file__).resolve().parent
+sys.path.append(str(ROOT))
+
+from agents.analysis_agent import EmotionBatchModel
+from agents.emotion_client import EMOTION_SERVER_ADDRESS, EMOTION_SERVER_AUTHKEY
+from agents.frame_utils import unpack_tensor
+from agents.supervisor import heartbeat_from_env
+
+
+MAX_BATCH = 16          # largest forward pass
+MAX_WAIT_MS = 5.0       # how long the first request waits for others to join its batch
+STATS_EVERY_S = 10.0    # print queue/batch statistics this often
+
+
+class BatchingServer:
+    """
+    One emotion model shared by every client on this host.
+
+    Connection threads decode incoming requests and put them on a queue.
+    The batch thread takes the first waiting request, collects more for
+    up to MAX_WAIT_MS (or until MAX_BATCH), and runs them as one batch.
+
+    Protocol (multiprocessing.connection, local TCP):
+        ("analyze", req_id, tensor) -> ("result", req_id, {"emotion", "confidence"} | None)
+        ("stats",)                  -> ("stats", {...})
+
+    tensor is a frame_utils.pack_tensor() dict: the face is already
+    cropped, resized to 48x48, grayscale and normalized by the client.
+
+    Under the launcher's supervisor (heartbeat set) the batch thread
+    beats while idle and after every batch, so a forward pass that hangs
+    gets the server restarted.
+    """
+
+    def __init__(self, model, address=EMOTION_SERVER_ADDRESS, authkey=EMOTION_SERVER_AUTHKEY,
+                 max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS, heartbeat=None):
+        self.model = model
+        self.heartbeat = heartbeat
+        self.listener = Listener(address, authkey=authkey)
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_ms / 1000.0
+        self.requests = queue.Queue()
+
+        self.stats_lock = threading.Lock()
+        self.stats = {
+            "clients": 0,
+            "requests": 0,
+            "batches": 0,
+            "max_queue_depth": 0,
+            "batch_sizes": {},        # size -> count
+            "busy_s": 0.0,            # time spent in forward passes
+        }
+
+    # ---- stats ----
+    def snapshot(self):
+        with self.stats_lock:
+            s = dict(self.stats)
+            s["batch_sizes"] = dict(self.stats["batch_sizes"])
+        s["queue_depth"] = self.requests.qsize()
+        s["avg_batch"] = s["requests"] / max(s["batches"], 1)
+        return s
+
+    def _stats_loop(self):
+        while True:
+            time.sleep(STATS_EVERY_S)
+            s = self.snapshot()
+            sizes = " ".join(f"{k}:{v}" for k, v in sorted(s["batch_sizes"].items()))
+            print(
+                f"[SERVER] clients={s['clients']} requests={s['requests']} batches={s['batches']} "
+                f"avg_batch={s['avg_batch']:.2f} queue={s['queue_depth']} max_queue={s['max_queue_depth']} "
+                f"busy={s['busy_s']:.1f}s sizes=[{sizes}]",
+                flush=True
+            )
+
+    # ---- connections ----
+    def _conn_loop(self, conn):
+        send_lock = threading.Lock()
+        with self.stats_lock:
+            self.stats["clients"] += 1
+
+        try:
+            while True:
+                msg = conn.recv()
+
+                if msg[0] == "stats":
+                    with send_lock:
+                        conn.send(("stats", self.snapshot()))
+                    continue
+
+                if msg[0] != "analyze":
+                    continue
+
+                _, req_id, payload = msg
+                try:
+                    x = unpack_tensor(payload)
+                except (KeyError, TypeError, ValueError):
+                    with send_lock:
+                        conn.send(("result", req_id, None))
+                    continue
+
+                self.requests.put((conn, send_lock, req_id, x))
+                depth = self.requests.qsize()
+                with self.stats_lock:
+                    self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], depth)
+
+        except (EOFError, OSError):
+            pass
+        finally:
+            with self.stats_lock:
+                self.stats["clients"] -= 1
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    # ---- batching ----
+    def _beat(self):
+        if self.heartbeat is not None:
+            self.heartbeat.beat()
+
+    def _collect_batch(self):
+        while True:
+            try:
+                batch = [self.requests.get(timeout=1.0)]
+                break
+            except queue.Empty:
+                self._beat()
+        deadline = time.perf_counter() + self.max_wait_s
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _batch_loop(self):
+        while True:
+            batch = self._collect_batch()
+
+            t0 = time.perf_counter()
+            try:
+                results = self.model.predict_batch([item[3] for item in batch])
+            except Exception as e:
+                print(f"[SERVER] batch of {len(batch)} failed: {e}", flush=True)
+                results = [None] * len(batch)
+            busy = time.perf_counter() - t0
+            self._beat()
+
+            with self.stats_lock:
+                self.stats["requests"] += len(batch)
+                self.stats["batches"] += 1
+                self.stats["busy_s"] += busy
+                sizes = self.stats["batch_sizes"]
+                sizes[len(batch)] = sizes.get(len(batch), 0) + 1
+
+            for (conn, send_lock, req_id, _x), res in zip(batch, results):
+                try:
+                    with send_lock:
+                        conn.send(("result", req_id, res))
+                except (EOFError, OSError):
+                    pass
+
+    def serve_forever(self):
+        threading.Thread(target=self._batch_loop, daemon=True).start()
+        threading.Thread(target=self._stats_loop, daemon=True).start()
+
+        while True:
+            try:
+                conn = self.listener.accept()
+            except (AuthenticationError, EOFError, OSError) as e:
+                # wrong authkey / client gone during the handshake: keep serving the others
+                print(f"[SERVER] rejected connection: {e}", flush=True)
+                continue
+            threading.Thread(target=self._conn_loop, args=(conn,), daemon=True).start()
+
+
+def main():
+    t0 = time.perf_counter()
+    try:
+        # serves from the local bundle only, unless DeepFace (may download) is allowed
+        model = EmotionBatchModel(allow_deepface="--allow-deepface" in sys.argv[1:])
+    except FileNotFoundError as e:
+        print(f"[ERROR] {e} (or start with --allow-deepface)", flush=True)
+        sys.exit(1)
+
+    # Warm-up: first predict builds the TF graph
+    model.predict_batch([model.preprocess(np.zeros((48, 48, 3), dtype=np.uint8))])
+    print(f"[SERVER] model ready in {time.perf_counter() - t0:.2f}s", flush=True)
+
+    server = BatchingServer(model, heartbeat=heartbeat_from_env())
+    print(f"[SERVER] listening on {server.listener.address} "
+          f"(max_batch={server.max_batch}, max_wait={server.max_wait_s * 1000:.1f}ms)", flush=True)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[SERVER] Stopped by user.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+from pathlib import Path
+import argparse
+import csv
+import itertools
+import sys
+import time
+
+# Make project root importable
+ROOT = Path(__file__).resolve().parent
+sys.path.append(str(ROOT))
+
+from agents.evaluation import (load_clips, run_perception, score_clip, summarize, pareto_front,
+                               emotion_seconds_per_sample)
+from final_agent import get_env_python, MESH_ROI_MARGIN
+
+
+# Configuration grid (edit as needed)
+SCALES = [1.0, 0.75, 0.5]            # capture resolution relative to the clip
+DETECT_WIDTHS = [160, 320]           # DETECT_MAX_WIDTH
+DETECT_EVERY = [1, 2, 3]             # face detection on every Nth frame (CpuGovernor detect_every)
+MESH_EVERY = [1, 3, 6]               # MESH_EVERY_N_FRAMES
+UNIFIED = [False, True]              # UNIFIED_PERCEPTION (one FaceMesh graph, ignores det_w/det_n/mesh)
+EMOTION_INTERVALS = [2.0, 4.0, 8.0]  # EMOTION_SAMPLE_INTERVAL
+WINDOW_LENGTHS = [15, 30, 60]        # WINDOW_SECONDS
+
+EMOTION_GRID_SECONDS = 0.5           # emotion is computed once per this step and reused
+
+
+def build_emotion_fn():
+    """
+    Emotion inference through the emotion_env worker (same 48x48 tensor
+    path as final_agent), or None if that environment is not installed.
+    """
+    from agents.emotion_client import EmotionWorkerClient
+    from agents.frame_utils import emotion_tensor
+
+    emotion_python = get_env_python("emotion_env")
+    worker_script = ROOT / "tests" / "emotion_worker.py"
+    if not emotion_python.is_file() or not worker_script.exists():
+        print("[WARN] emotion_env not found -> emotion metrics skipped")
+        return None, None
+
+    client = EmotionWorkerClient(emotion_python, worker_script, ROOT).start()
+
+    def emotion_fn(crop):
+        return client.analyze_tensor(emotion_tensor(crop))
+
+    return emotion_fn, client
+
+
+def fmt(v, spec=".2f"):
+    return "-" if v is None else format(v, spec)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accuracy vs compute over labeled clips")
+    parser.add_argument("clip_dir", help="directory with <clip>.mp4 + <clip>.json label files")
+    parser.add_argument("--no-emotion", action="store_true", help="skip DeepFace (perception/yawn only)")
+    parser.add_argument("--csv", help="also write all rows to this CSV file")
+    args = parser.parse_args()
+
+    clips = load_clips(args.clip_dir)
+    if not clips:
+        print(f"[ERROR] No labeled clips in {args.clip_dir}")
+        return
+    print(f"[INFO] {len(clips)} labeled clips")
+
+    emotion_fn, emotion_client = (None, None) if args.no_emotion else build_emotion_fn()
+    emotion_caches = {}   # (clip, scale) -> grid index -> (ts, result, seconds)
+
+    rows = []
+    scored = []       # (row, counts, cpu_s, frame_ms, video_s), summarized once all emotion calls are timed
+    t_start = time.perf_counter()
+    try:
+        perception_grid = []
+        if False in UNIFIED:
+            perception_grid += [
+                (scale, detect_w, detect_every, mesh_every, False)
+                for scale, detect_w, detect_every, mesh_every
+                in itertools.product(SCALES, DETECT_WIDTHS, DETECT_EVERY, MESH_EVERY)
+            ]
+        if True in UNIFIED:
+            perception_grid += [(scale, None, 1, 1, True) for scale in SCALES]
+
+        for scale, detect_w, detect_every, mesh_every, unified in perception_grid:
+            traces = []
+            for clip in clips:
+                cache = emotion_caches.setdefault((clip.name, scale), {})
+                traces.append(run_perception(
+                    clip, scale, detect_w, mesh_every, roi_margin=MESH_ROI_MARGIN,
+                    emotion_fn=emotion_fn, emotion_cache=cache, emotion_grid=EMOTION_GRID_SECONDS,
+                    unified=unified, detect_every=detect_every
+                ))
+            print(f"[INFO] perception scale={scale} detect_w={detect_w} detect_every={detect_every} "
+                  f"mesh_every={mesh_every} unified={unified} done")
+
+            cpu_s = sum(tr["cpu_s"] for tr in traces)
+            video_s = sum(tr["duration"] for tr in traces)
+            frame_ms = [ms for tr in traces for ms in tr["frame_ms"].tolist()]
+
+            for interval, window_s in itertools.product(EMOTION_INTERVALS, WINDOW_LENGTHS):
+                counts = [
+                    score_clip(clip, tr, emotion_caches[(clip.name, scale)] if emotion_fn else None,
+                               interval, window_s, emotion_grid=EMOTION_GRID_SECONDS)
+                    for clip, tr in zip(clips, traces)
+                ]
+                row = {"scale": scale, "detect_w": detect_w if not unified else "mesh",
+                       "detect_every": detect_every, "mesh_every": mesh_every,
+                       "emotion_interval": interval, "window_s": window_s}
+                scored.append((row, counts, cpu_s, frame_ms, video_s))
+    finally:
+        if emotion_client is not None:
+            emotion_client.close()
+
+    # one price per emotion sample for every row, from all measured calls
+    emotion_s = emotion_seconds_per_sample(emotion_caches.values())
+    for row, counts, cpu_s, frame_ms, video_s in scored:
+        row.update(summarize(counts, cpu_s, frame_ms, video_s, emotion_s))
+
+        # one quality number for the Pareto front: mean of the available scores
+        scores = [row[k] for k in ("presence_f1", "yawn_f1", "emotion_f1", "window_acc") if row[k] is not None]
+        row["quality"] = sum(scores) / len(scores) if scores else None
+        rows.append(row)
+
+    pareto_front(rows, "cpu_ms_per_s", "quality")
+    rows.sort(key=lambda r: r["cpu_ms_per_s"])
+
+    print(
+        f"\n{'P':>1} {'scale':>5} {'det_w':>5} {'det_n':>5} {'mesh':>4} {'emo_s':>5} {'win':>4} "
+        f"{'cpu_ms/s':>8} {'perc':>6} {'emo':>6} {'p95_ms':>7} {'pres_P':>6} {'pres_R':>6} {'yawn_P':>6} {'yawn_R':>6} "
+        f"{'emo_P':>6} {'emo_R':>6} {'win_acc':>7} {'alert_s':>7} {'quality':>7}"
+    )
+    for r in rows:
+        print(
+            f"{'*' if r['pareto'] else ' ':>1} {r['scale']:>5.2f} {r['detect_w']:>5} {r['detect_every']:>5} "
+            f"{r['mesh_every']:>4} "
+            f"{r['emotion_interval']:>5.1f} {r['window_s']:>4} {r['cpu_ms_per_s']:>8.1f} "
+            f"{r['perception_ms_per_s']:>6.1f} {r['emotion_ms_per_s']:>6.1f} {r['frame_ms_p95']:>7.1f} "
+            f"{fmt(r['presence_p']):>6} {fmt(r['presence_r']):>6} {fmt(r['yawn_p']):>6} {fmt(r['yawn_r']):>6} "
+            f"{fmt(r['emotion_p']):>6} {fmt(r['emotion_r']):>6} {fmt(r['window_acc']):>7} "
+            f"{fmt(r['alert_delay_s'], '.1f'):>7} {fmt(r['quality'], '.3f'):>7}"
+        )
+    print(f"\n[INFO] * = Pareto-optimal (no cheaper configuration with equal or better quality). "
+          f"{len(rows)} configurations in {time.perf_counter() - t_start:.1f}s")
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"[INFO] Wrote {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
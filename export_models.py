@@ -0,0 +1,44 @@
+from pathlib import Path
+import os
+import sys
+import time
+
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+# Make project root importable
+ROOT = Path(__file__).resolve().parent
+sys.path.append(str(ROOT))
+
+from agents.analysis_agent import EmotionBatchModel, load_deepface_emotion_model
+from agents.model_store import bundle_path, export_keras_model, MappedModel
+
+
+def main():
+    """
+    Build step (run once in emotion_env, on a machine with the DeepFace
+    weights): writes models/emotion/{manifest.json, weights.bin}, then
+    checks that the NumPy runtime reproduces the Keras predictions.
+    Ship the models/ folder with the deployment.
+    """
+    import numpy as np
+
+    keras_model = load_deepface_emotion_model()
+
+    out_dir = bundle_path(EmotionBatchModel.BUNDLE_NAME)
+    manifest = export_keras_model(keras_model, out_dir, labels=EmotionBatchModel.LABELS)
+    print(f"[INFO] Wrote {out_dir} ({manifest['size'] / 1e6:.1f} MB, {len(manifest['layers'])} layers)")
+
+    t0 = time.perf_counter()
+    mapped = MappedModel(out_dir, verify=True)
+    print(f"[INFO] Bundle mapped in {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    batch = np.random.default_rng(0).random((8, 48, 48, 1), dtype=np.float32)
+    diff = float(np.abs(mapped.predict(batch) - keras_model.predict(batch, verbose=0)).max())
+    print(f"[INFO] Max difference vs Keras: {diff:.2e}")
+    if diff > 1e-4:
+        print("[ERROR] Bundle does not match the Keras model")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
+import time
+STARTUP_TS = time.perf_counter()
+
 from pathlib import Path
+import contextlib
+import getpass
+import socket
 import sys
-import time
-import json
-import subprocess
-import threading
 
 import cv2
 
@@ -11,16 +13,57 @@ import cv2
 ROOT = Path(__file__).resolve().parent
 sys.path.append(str(ROOT))
 
-from agents.sensor_agent import FaceDetectionAgent
-from agents.yawn_agent import YawnAgent
+# FaceDetectionAgent / YawnAgent import mediapipe -> loaded lazily in background
 from agents.decision_agent import MoodDecisionAgent
 from agents.action_agent import ActionAgent
+from agents.emotion_pipeline import EmotionPipeline
+from agents.emotion_client import EMOTION_SERVER_ADDRESS
+from agents.feature_store import WindowFeatureStore
+from agents.emotion_scheduler import EmotionSampler
+from agents.frame_utils import clamp_crop, expand_bbox
+from agents.feature_recording import FeatureRecorder
+from agents.frame_buffers import AllocationMeter
+from agents.expression_cascade import ExpressionCascade, expression_features
+from agents.frame_quality import FrameSelector
+from agents.calibration import UserCalibration
+from agents.fleet_reporter import FleetReporter
+from agents.evidence_buffer import EvidenceBuffer
+from agents.cpu_governor import CpuGovernor, DEFAULT_LEVELS
+from agents.startup import StartupClock, AgentLoader
+from agents.supervisor import heartbeat_from_env
+from agents.window_state import (new_window_state, reset_window, start_window, add_yawn, close_window,
+                                 record_emotion, apply_emotion_results)
 
 
 WINDOW_SECONDS = 30             # measurement window
-EMOTION_SAMPLE_INTERVAL = 8.0   # slower = smoother camera
+EMOTION_SAMPLE_INTERVAL = 8.0   # longest gap between emotion samples
+EMOTION_TARGET_SAMPLES = 4      # emotion samples wanted per window
+EMOTION_CPU_BUDGET = 0.25       # emotion worker may be busy at most this share of the time
+EMOTION_WORKERS = 1             # concurrent emotion requests (one worker process each)
+EMOTION_CANCEL_POLICY = "auto"  # stale in-flight inference: auto / kill / drop
+EMOTION_SERVER = None           # e.g. ("127.0.0.1", 6160): use a running emotion_server.py instead
+EMOTION_CASCADE = False         # answer confident samples from FaceMesh landmarks, DeepFace only when unsure
+EMOTION_FRAME_SELECT = True     # send the sharpest / most frontal recent face crop, not just the current frame
 SHOW_CAMERA = True              # set False if you don't want the preview window
 
+CAPTURE_SIZE = None             # (w, h) to force a capture size, None = camera default
+DETECT_MIN_WIDTH = 160          # face detection runs on a downscaled copy
+DETECT_MAX_WIDTH = 320          # (width adapts to face size between these)
+MESH_ROI_MARGIN = 0.4           # FaceMesh gets the full-res face bbox + this margin per side
+MESH_EVERY_N_FRAMES = 1         # run FaceMesh on every Nth frame (3 = ~10 fps at 30 fps capture)
+CPU_TARGET = None               # e.g. 0.15: governor trades resolution / frame stride / emotion rate for CPU
+PERCEPTION_WORKERS = 0          # >0: detection + FaceMesh run in this many worker processes
+UNIFIED_PERCEPTION = False      # True: one FaceMesh graph gives bbox + mouth (no separate FaceDetection)
+EVIDENCE_STATES = ()            # e.g. ("drowsy", "stressed"): save the last seconds of video to logs/evidence
+EVIDENCE_SECONDS = 10           # pre-event clip length
+EVIDENCE_FPS = 5                # frames kept per second (320 px JPEG in memory)
+FLEET_URL = None                # e.g. "http://10.0.0.5:6170": report decisions to fleet_server.py
+FLEET_TOKEN = None              # shared secret of fleet_server.py --token
+CALIBRATE_THRESHOLDS = False    # opt in: learn personal yawn / emotion thresholds (calibration/<user>.json)
+CALIBRATION_USER = None         # None = OS login name
+RECORD_FEATURES = False         # record bboxes / mouth landmarks / emotions to recordings/ for replay
+DEBUG_ALLOCS = False            # print allocations / peak memory per frame (slow, debugging only)
+
 
 def get_env_python(env_name: str) -> Path:
     p = ROOT / env_name / "Scripts" / "python.exe"   # Windows
@@ -32,157 +75,70 @@ def get_env_python(env_name: str) -> Path:
     return Path()
 
 
-def call_emotion_worker(face_crop_bgr, emotion_python: Path, worker_script: Path, temp_img_path: Path):
-    """
-    Save face crop and call emotion worker in emotion_env.
-    Returns: {"emotion": "...", "confidence": ...} or None
-    """
-    try:
-        ok = cv2.imwrite(str(temp_img_path), face_crop_bgr)
-        if not ok:
-            print("[EMOTION] Failed to write temp image")
-            return None
-
-        result = subprocess.run(
-            [str(emotion_python), str(worker_script), str(temp_img_path)],
-            cwd=str(ROOT),
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+def build_face_agent():
+    if PERCEPTION_WORKERS > 0:
+        from agents.perception_pool import PerceptionPool
+        return PerceptionPool(
+            workers=PERCEPTION_WORKERS,
+            min_detect_width=DETECT_MIN_WIDTH,
+            max_detect_width=DETECT_MAX_WIDTH,
+            roi_margin=MESH_ROI_MARGIN,
+            unified=UNIFIED_PERCEPTION
+        ).start()
+
+    if UNIFIED_PERCEPTION:
+        from agents.face_mesh_agent import FaceMeshAgent
+        return FaceMeshAgent()
 
-        if result.returncode != 0:
-            print("[EMOTION] Worker failed:", result.stderr.strip() or result.stdout.strip())
-            return None
+    from agents.sensor_agent import FaceDetectionAgent
+    return FaceDetectionAgent(min_detect_width=DETECT_MIN_WIDTH, max_detect_width=DETECT_MAX_WIDTH)
 
-        lines = [ln.strip() for ln in result.stdout.splitlines() if ln.strip()]
-        if not lines:
-            return None
 
-        data = json.loads(lines[-1])
-        if isinstance(data, dict) and "emotion" in data:
-            return data
+def build_yawn_agent():
+    from agents.yawn_agent import YawnAgent
+    # With the pool or the unified FaceMeshAgent, FaceMesh runs elsewhere;
+    # only the yawn timer stays here
+    return YawnAgent(use_mesh=PERCEPTION_WORKERS == 0 and not UNIFIED_PERCEPTION)
 
-        return None
 
-    except subprocess.TimeoutExpired:
-        print("[EMOTION] Worker timed out")
-        return None
-    except Exception as e:
-        print(f"[EMOTION] Error calling worker: {e}")
-        return None
+def build_emotion_pipeline(emotion_python: Path, worker_script: Path, server_address=EMOTION_SERVER):
+    # start() blocks until every worker finished its dummy warm-up inference
+    return EmotionPipeline(
+        emotion_python,
+        worker_script,
+        cwd=ROOT,
+        workers=EMOTION_WORKERS,
+        cancel_policy=EMOTION_CANCEL_POLICY,
+        server_address=server_address
+    ).start()
 
 
-def start_emotion_job(state, face_crop, emotion_python, worker_script, temp_img_path, window_seq: int):
+def apply_governor_settings(settings, cap, face_agent, sampler):
     """
-    Non-blocking emotion call so camera loop doesn't freeze.
+    Pushes a CpuGovernor level to the camera and the agents.
+    Returns (detect_every, mesh_every) for the camera loop.
+    The capture size stays fixed with PERCEPTION_WORKERS: the pool's
+    shared-memory slots are sized for the first frame and cannot change
+    shape while frames are in flight.
     """
-    if state.get("emotion_busy", False):
-        return
-
-    state["emotion_busy"] = True
-    crop_copy = face_crop.copy()
-
-    def _job():
-        try:
-            emo = call_emotion_worker(crop_copy, emotion_python, worker_script, temp_img_path)
-
-            # If window changed while worker was running, ignore stale result
-            if window_seq != state.get("window_seq"):
-                return
-
-            if emo:
-                state["emotion_samples"].append(emo)
-                state["last_emotion_text"] = f"{emo['emotion']} ({emo['confidence']:.1f})"
-                print(f"[EMOTION] {state['last_emotion_text']}")
-            else:
-                state["last_emotion_text"] = "none"
-        finally:
-            state["emotion_busy"] = False
-
-    threading.Thread(target=_job, daemon=True).start()
-
-
-def summarize_emotions(samples):
-    if not samples:
-        return None
-
-    counts = {}
-    best_conf = {}
-
-    for s in samples:
-        emo = s.get("emotion")
-        conf = float(s.get("confidence", 0.0))
-        if not emo:
-            continue
-
-        counts[emo] = counts.get(emo, 0) + 1
-        best_conf[emo] = max(best_conf.get(emo, 0.0), conf)
-
-    if not counts:
-        return None
-
-    winner = sorted(
-        counts.keys(),
-        key=lambda e: (counts[e], best_conf.get(e, 0.0)),
-        reverse=True
-    )[0]
-
-    return {"emotion": winner, "confidence": best_conf.get(winner, 0.0)}
+    if settings.get("capture") and PERCEPTION_WORKERS == 0:
+        w, h = settings["capture"]
+        if (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))) != (w, h):
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, w)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, h)
 
+    # perception workers / the unified mesh agent keep their own settings
+    if PERCEPTION_WORKERS == 0 and not UNIFIED_PERCEPTION:
+        face_agent.max_detect_width = settings["detect_width"]
+        face_agent.min_detect_width = min(DETECT_MIN_WIDTH, settings["detect_width"])
 
-def new_window_state():
-    return {
-        "window_start_ts": None,
-        "window_seq": 0,                  # increments whenever window resets/restarts
-        "last_emotion_sample_ts": 0.0,
-        "emotion_samples": [],
-        "emotion_busy": False,            # background worker running?
-        "yawn_any": False,
-        "max_yawn_duration": 0.0,
-        "max_mar": 0.0,
-        "last_emotion_text": "none",
-        "last_decision_text": "none"
-    }
+    sampler.max_interval = settings["emotion_interval"]
+    sampler.target_samples = max(1, min(EMOTION_TARGET_SAMPLES, round(WINDOW_SECONDS / settings["emotion_interval"])))
+    return settings["detect_every"], settings["mesh_every"]
 
 
-def reset_window(state, yawn_agent=None):
-    state["window_start_ts"] = None
-    state["window_seq"] += 1
-    state["last_emotion_sample_ts"] = 0.0
-    state["emotion_samples"] = []
-    state["yawn_any"] = False
-    state["max_yawn_duration"] = 0.0
-    state["max_mar"] = 0.0
-    state["last_emotion_text"] = "none"
-
-    # reset yawn memory when face disappears
-    if yawn_agent is not None:
-        if hasattr(yawn_agent, "yawn_start"):
-            yawn_agent.yawn_start = None
-        if hasattr(yawn_agent, "mouth_open"):
-            yawn_agent.mouth_open = False
-        if hasattr(yawn_agent, "mar_ema"):
-            yawn_agent.mar_ema = None
-
-
-def clamp_crop(frame, bbox):
-    h, w = frame.shape[:2]
-    x, y, bw, bh = bbox
-
-    x1 = max(0, x)
-    y1 = max(0, y)
-    x2 = min(w, x + bw)
-    y2 = min(h, y + bh)
-
-    if x2 <= x1 or y2 <= y1:
-        return None
-
-    crop = frame[y1:y2, x1:x2]
-    if crop.size == 0:
-        return None
-
-    return crop
+_NO_STAGE = contextlib.nullcontext()
+_overlay_cache = {"key": None, "lines": None}
 
 
 def draw_overlay(frame, bbox, face_present, remaining, state, yawn_text):
@@ -190,10 +146,17 @@ def draw_overlay(frame, bbox, face_present, remaining, state, yawn_text):
         x, y, bw, bh = bbox
         cv2.rectangle(frame, (x, y), (x + bw, y + bh), (0, 255, 0), 2)
 
-    line1 = f"Face: {'YES' if face_present else 'NO'} | Timer: {max(0, int(remaining))}s"
-    line2 = f"Emotion: {state['last_emotion_text']} | {yawn_text}"
-    line3 = f"Last Decision: {state['last_decision_text']}"
-    line4 = "ESC = Exit"
+    # Text only changes a few times per second: reuse the strings in between
+    key = (face_present, max(0, int(remaining)), state["last_emotion_text"], yawn_text, state["last_decision_text"])
+    if key != _overlay_cache["key"]:
+        _overlay_cache["key"] = key
+        _overlay_cache["lines"] = (
+            f"Face: {'YES' if face_present else 'NO'} | Timer: {key[1]}s",
+            f"Emotion: {state['last_emotion_text']} | {yawn_text}",
+            f"Last Decision: {state['last_decision_text']}",
+            "ESC = Exit",
+        )
+    line1, line2, line3, line4 = _overlay_cache["lines"]
 
     cv2.putText(frame, line1, (20, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.65, (0, 255, 0), 2)
     cv2.putText(frame, line2, (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (255, 255, 255), 2)
@@ -203,39 +166,100 @@ def draw_overlay(frame, bbox, face_present, remaining, state, yawn_text):
 
 def main():
     emotion_python = get_env_python("emotion_env")
-    if not emotion_python:
+    if not emotion_python.is_file():
         print("[ERROR] emotion_env python not found")
         print("Expected: emotion_env\\Scripts\\python.exe")
-        return
+        sys.exit(1)     # non-zero: a supervisor must not take this for ESC
 
     worker_script = ROOT / "tests" / "emotion_worker.py"
     if not worker_script.exists():
         print(f"[ERROR] Missing worker script: {worker_script}")
-        return
-
-    temp_dir = ROOT / "temp"
-    temp_dir.mkdir(exist_ok=True)
-    temp_img_path = temp_dir / "emotion_face.jpg"
+        sys.exit(1)
 
-    # face_env-side agents
-    face_agent = FaceDetectionAgent()
-    yawn_agent = YawnAgent()
-    decision_agent = MoodDecisionAgent()
-    action_agent = ActionAgent(log_path=str(ROOT / "logs" / "events.log"))
+    clock = StartupClock(STARTUP_TS)
 
-    # Camera (Windows DirectShow + low resolution for speed)
+    # Camera first (Windows DirectShow). Resolution is left to the camera:
+    # detection runs on a small copy, full resolution is only used for crops.
     cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
     if not cap.isOpened():
         cap = cv2.VideoCapture(0)
 
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    if CAPTURE_SIZE:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAPTURE_SIZE[0])
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAPTURE_SIZE[1])
 
     if not cap.isOpened():
         print("[ERROR] Camera not found")
-        return
+        sys.exit(1)
+
+    print(f"[INFO] Capture: {int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))}x{int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))}")
+
+    # Heavy agents are built in parallel while frames are already shown
+    loader = AgentLoader(clock)
+    loader.load("face", build_face_agent)
+    loader.load("yawn", build_yawn_agent)
+    # --emotion-server: launcher --supervise runs emotion_server.py as a separate child
+    emotion_server = EMOTION_SERVER
+    if "--emotion-server" in sys.argv[1:]:
+        emotion_server = EMOTION_SERVER or EMOTION_SERVER_ADDRESS
+    loader.load("emotion", lambda: build_emotion_pipeline(emotion_python, worker_script, emotion_server))
+
+    # Cheap face_env-side agents
+    decision_agent = MoodDecisionAgent()
+    fleet_reporter = None
+    if FLEET_URL:
+        fleet_reporter = FleetReporter(
+            FLEET_URL,
+            client_id=f"{socket.gethostname()}/{getpass.getuser()}",
+            spool_dir=ROOT / "logs" / "fleet_spool",
+            token=FLEET_TOKEN
+        )
+    action_agent = ActionAgent(log_path=str(ROOT / "logs" / "events.log"), reporter=fleet_reporter)
+    evidence = None
+    if EVIDENCE_STATES:
+        evidence = EvidenceBuffer(ROOT / "logs" / "evidence", states=EVIDENCE_STATES,
+                                  seconds=EVIDENCE_SECONDS, fps=EVIDENCE_FPS)
+    calibration = None
+    if CALIBRATE_THRESHOLDS:
+        user = CALIBRATION_USER or getpass.getuser()
+        calibration = UserCalibration(ROOT / "calibration" / f"{user}.json")
+        calibration.apply(decision_agent=decision_agent)
+    calibrated_windows = 0
+    feature_store = WindowFeatureStore(ROOT / "logs" / "windows.db")
+    recorder = None
+    if RECORD_FEATURES:
+        rec_dir = ROOT / "recordings" / time.strftime("%Y-%m-%d_%H%M%S")
+        recorder = FeatureRecorder(rec_dir)
+        print(f"[INFO] Recording features to {rec_dir}")
 
     state = new_window_state()
+    frame_id = 0
+    capture_buf = None      # cap.read() refills this array instead of allocating a new one
+    alloc_meter = AllocationMeter() if DEBUG_ALLOCS else None
+    sampler = EmotionSampler(
+        window_seconds=WINDOW_SECONDS,
+        target_samples=EMOTION_TARGET_SAMPLES,
+        cpu_budget=EMOTION_CPU_BUDGET,
+        max_interval=EMOTION_SAMPLE_INTERVAL
+    )
+    governor = None
+    detect_every, mesh_every = 1, MESH_EVERY_N_FRAMES
+    last_bbox = None
+    if CPU_TARGET:
+        camera_size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        top = {"capture": CAPTURE_SIZE or camera_size, "detect_width": DETECT_MAX_WIDTH, "detect_every": 1,
+               "mesh_every": MESH_EVERY_N_FRAMES, "emotion_interval": EMOTION_SAMPLE_INTERVAL}
+        governor = CpuGovernor(CPU_TARGET, levels=DEFAULT_LEVELS + [top])
+    stage = governor.stage if governor is not None else (lambda _name: _NO_STAGE)
+    heartbeat = heartbeat_from_env()    # set when launcher.py --supervise started this process
+
+    cascade = None
+    if EMOTION_CASCADE:
+        if PERCEPTION_WORKERS > 0:
+            print("[WARN] EMOTION_CASCADE needs landmarks in this process; disabled with PERCEPTION_WORKERS")
+        else:
+            cascade = ExpressionCascade()
+    selector = FrameSelector() if EMOTION_FRAME_SELECT else None
 
     print("[INFO] Final multi-agent system started.")
     print("[INFO] Face present = start 30s window | Face lost = reset timer")
@@ -243,99 +267,223 @@ def main():
 
     try:
         while True:
-            ret, frame = cap.read()
+            if alloc_meter is not None:
+                alloc_meter.begin_frame()   # also closes the previous frame, whichever way it ended
+
+            ret, capture_buf = cap.read(capture_buf)
+            capture_ts = time.time()
+            if heartbeat is not None:
+                heartbeat.beat(capture_ts)
+            frame = capture_buf
             if not ret:
                 print("[WARN] Camera frame not received")
                 break
 
-            now = time.time()
-            bbox = face_agent.run(frame)
+            clock.mark("first_frame")
+
+            face_agent = loader.get("face")
+            yawn_agent = loader.get("yawn")
+            emotion_pipeline = loader.get("emotion")
+
+            if face_agent is None:
+                # Still loading: keep the preview alive
+                if SHOW_CAMERA:
+                    cv2.putText(frame, f"Loading: {loader.status_text()}", (20, 30),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+                    cv2.imshow("Final Multi-Agent System", frame)
+                    if cv2.waitKey(1) & 0xFF == 27:  # ESC
+                        break
+                continue
+
+            if PERCEPTION_WORKERS > 0:
+                # face_agent is a PerceptionPool: results come back in frame order,
+                # a few frames behind capture
+                perceived = face_agent.process(frame, capture_ts)
+                if perceived is None:
+                    continue
+                frame = perceived["frame"]
+                frame_id = perceived["frame_id"]
+                now = perceived["ts"]
+                bbox = perceived["bbox"]
+            else:
+                frame_id += 1
+                now = capture_ts
+                if detect_every > 1 and last_bbox is not None and not UNIFIED_PERCEPTION \
+                        and frame_id % detect_every:
+                    bbox = last_bbox    # governor: detect on every Nth frame, keep the bbox in between
+                else:
+                    with stage("detect"):
+                        bbox = face_agent.run(frame)
+                last_bbox = bbox
             face_present = bbox is not None
 
             yawn_text = "Yawn: no_data"
             remaining = 0
+            mouth = None
+            mesh_fresh = False      # landmarks below come from this frame's FaceMesh pass
 
             if not face_present:
-                reset_window(state, yawn_agent=yawn_agent)
+                reset_window(state, yawn_agent=yawn_agent, emotion_pipeline=emotion_pipeline)
                 yawn_text = "Yawn: reset"
 
             else:
                 # Start window if needed
                 if state["window_start_ts"] is None:
-                    state["window_start_ts"] = now
-                    state["window_seq"] += 1
-                    state["last_emotion_sample_ts"] = 0.0
-                    state["emotion_samples"] = []
-                    state["yawn_any"] = False
-                    state["max_yawn_duration"] = 0.0
-                    state["max_mar"] = 0.0
+                    start_window(state, now, emotion_pipeline)
+                    sampler.reset_window()
+                    if selector is not None:
+                        selector.reset()
+                    if calibration is not None:
+                        calibration.apply(yawn_agent, decision_agent)
                     print("[INFO] Face detected -> 30s window started")
 
                 elapsed = now - state["window_start_ts"]
                 remaining = WINDOW_SECONDS - elapsed
 
-                # --- Yawn (continuous) ---
-                yawn_out = yawn_agent.run(frame)
+                # --- Yawn (continuous, FaceMesh on the full-res face ROI) ---
+                # Frames without a MAR (mesh skipped or no landmarks) are simply
+                # not fed to the yawn agent; it interpolates over the gap.
+                yawn_out = None
+                if yawn_agent is not None:
+                    mar = None
+                    if PERCEPTION_WORKERS > 0:
+                        mouth = perceived["mouth"]
+                        mar = perceived["mar"]
+                    elif UNIFIED_PERCEPTION:
+                        # same landmark pass that produced the bbox
+                        mouth = face_agent.last["mouth"]
+                        mar = face_agent.last["mar"]
+                        mesh_fresh = True
+                    elif frame_id % mesh_every == 0:
+                        with stage("mesh"):
+                            mesh_roi = clamp_crop(frame, expand_bbox(bbox, MESH_ROI_MARGIN))
+                            if mesh_roi is not None:
+                                mesh_fresh = True
+                                mouth = yawn_agent.mouth_points(mesh_roi)
+                                mar = yawn_agent.mar_from_points(mouth) if mouth is not None else None
+                    if mar is not None:
+                        if calibration is not None:
+                            calibration.observe_mar(mar)
+                        yawn_out = yawn_agent.update(mar, now)
                 if yawn_out:
-                    state["yawn_any"] = state["yawn_any"] or bool(yawn_out.get("yawn", False))
-                    state["max_yawn_duration"] = max(state["max_yawn_duration"], float(yawn_out.get("duration", 0.0)))
-                    state["max_mar"] = max(state["max_mar"], float(yawn_out.get("mar", 0.0)))
-                    yawn_text = (
-                        f"Yawn: {state['yawn_any']} "
-                        f"(dur={state['max_yawn_duration']:.1f}s mar={state['max_mar']:.3f})"
-                    )
-
-                # --- Emotion (non-blocking background job) ---
-                if (now - state["last_emotion_sample_ts"]) >= EMOTION_SAMPLE_INTERVAL and not state["emotion_busy"]:
-                    face_crop = clamp_crop(frame, bbox)
-                    if face_crop is not None:
-                        start_emotion_job(
-                            state=state,
-                            face_crop=face_crop,
-                            emotion_python=emotion_python,
-                            worker_script=worker_script,
-                            temp_img_path=temp_img_path,
-                            window_seq=state["window_seq"]
-                        )
-                    else:
-                        state["last_emotion_text"] = "crop_failed"
-
-                    state["last_emotion_sample_ts"] = now
+                    add_yawn(state, yawn_out)
+                yawn_text = state["yawn_text"] or yawn_text
+
+                # --- Emotion (worker pool, adaptive sampling) ---
+                with stage("emotion"):
+                    if emotion_pipeline is not None:
+                        apply_emotion_results(state, emotion_pipeline, sampler, recorder, cascade)
+
+                        face_crop = clamp_crop(frame, bbox)
+                        # eye alignment / cascade / selector; the landmarks stay in the worker
+                        # processes with PERCEPTION_WORKERS (crops are then sent as detected)
+                        landmarks = None
+                        if PERCEPTION_WORKERS == 0:
+                            landmarks = (face_agent.last["landmarks"] if UNIFIED_PERCEPTION
+                                         else getattr(yawn_agent, "last_landmarks", None))
+                        if selector is not None:
+                            # With FaceMesh in this process only frames with their own landmarks are
+                            # scored (MESH_EVERY_N_FRAMES > 1): stale ones would judge this crop by an
+                            # older head pose / blink. Without FaceMesh here, all frames are scored.
+                            local_mesh = PERCEPTION_WORKERS == 0 and (UNIFIED_PERCEPTION or yawn_agent is not None)
+                            selector.offer(face_crop, now, landmarks if mesh_fresh else None,
+                                           require_landmarks=local_mesh)
+
+                        if emotion_pipeline.has_capacity():
+                            if face_crop is None:
+                                state["last_emotion_text"] = "crop_failed"
+
+                            elif sampler.should_sample(now, remaining, face_crop):
+                                state["last_emotion_sample_ts"] = now
+                                if selector is not None:
+                                    # best crop of this slot (and its landmarks for the cascade)
+                                    face_crop, landmarks = selector.take(now, face_crop, landmarks)
+                                feats, cheap = None, None
+                                if cascade is not None and landmarks is not None:
+                                    feats = expression_features(*landmarks)
+                                    cheap = cascade.classify(feats)
+
+                                if cheap is not None:
+                                    # cascade is sure: no DeepFace call for this sample
+                                    record_emotion(state, cheap, now, recorder, source="cascade")
+                                else:
+                                    job = emotion_pipeline.submit(face_crop, state["window_seq"], landmarks)
+                                    if job is not None and feats is not None:
+                                        job.features = feats
+                                        job.guess = cascade.last_guess
 
                 # --- End of 30s window -> decision + action ---
                 if elapsed >= WINDOW_SECONDS:
-                    emotion_info = summarize_emotions(state["emotion_samples"])
-                    yawn_info = {
-                        "yawn": state["yawn_any"],
-                        "duration": state["max_yawn_duration"],
-                        "mar": state["max_mar"]
-                    }
-
-                    decision = decision_agent.run(emotion_info, yawn_info)
+                    decision, emotion_info, yawn_info = close_window(state, decision_agent)
                     action_agent.run(decision)
+                    if evidence is not None:
+                        evidence.on_decision(decision, now)
+                    if calibration is not None:
+                        # thresholds for the next window; saved every 10 windows and on exit
+                        calibration.observe_window(emotion_info)
+                        calibration.apply(yawn_agent, decision_agent)
+                        calibrated_windows += 1
+                        if calibrated_windows % 10 == 0:
+                            calibration.save()
+                    feature_store.add_window(
+                        yawn_info=yawn_info,
+                        emotion_info=emotion_info,
+                        emotion_samples=state["emotion_samples"],
+                        decision=decision,
+                        window_seconds=elapsed
+                    )
 
-                    state["last_decision_text"] = f"{decision['state']} ({decision['reason']})"
                     print("[DECISION]", state["last_decision_text"])
+                    clock.mark("first_decision")
 
                     # Start a fresh 30s window immediately (face is still present)
-                    state["window_start_ts"] = now
-                    state["window_seq"] += 1
-                    state["last_emotion_sample_ts"] = 0.0
-                    state["emotion_samples"] = []
-                    state["yawn_any"] = False
-                    state["max_yawn_duration"] = 0.0
-                    state["max_mar"] = 0.0
+                    start_window(state, now, emotion_pipeline)
+                    sampler.reset_window()
+                    if selector is not None:
+                        selector.reset()
 
-            if SHOW_CAMERA:
-                draw_overlay(frame, bbox, face_present, remaining, state, yawn_text)
-                cv2.imshow("Final Multi-Agent System", frame)
+            if recorder is not None:
+                recorder.add_frame(frame_id, now, bbox, mouth)
+
+            if evidence is not None:
+                # before the overlay is drawn on the frame
+                evidence.add(frame, now, bbox)
 
-                if cv2.waitKey(1) & 0xFF == 27:  # ESC
+            if SHOW_CAMERA:
+                with stage("display"):
+                    draw_overlay(frame, bbox, face_present, remaining, state, yawn_text)
+                    if not loader.all_ready():
+                        cv2.putText(frame, f"Loading: {loader.status_text()}", (20, 150),
+                                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+                    cv2.imshow("Final Multi-Agent System", frame)
+                    key = cv2.waitKey(1) & 0xFF
+
+                if key == 27:  # ESC
                     break
 
+            if governor is not None:
+                settings = governor.tick(now)
+                if settings is not None:
+                    detect_every, mesh_every = apply_governor_settings(settings, cap, face_agent, sampler)
+
     except KeyboardInterrupt:
         print("\n[INFO] Stopped by user.")
     finally:
+        emotion_pipeline = loader.get("emotion")
+        if emotion_pipeline is not None:
+            emotion_pipeline.close()
+        feature_store.close()
+        if evidence is not None:
+            evidence.close()
+        if fleet_reporter is not None:
+            fleet_reporter.close()
+            print(f"[FLEET] {fleet_reporter.status_text()}")
+        if calibration is not None:
+            calibration.save()
+        if recorder is not None:
+            recorder.close()
+        if PERCEPTION_WORKERS > 0 and loader.get("face") is not None:
+            loader.get("face").close()
         cap.release()
         cv2.destroyAllWindows()
 
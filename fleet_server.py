@@ -0,0 +1,55 @@
+from pathlib import Path
+import argparse
+import os
+import sys
+import time
+
+# Make project root importable
+ROOT = Path(__file__).resolve().parent
+sys.path.append(str(ROOT))
+
+from agents.fleet_service import FleetService
+
+
+STATS_EVERY_S = 30.0    # print ingest statistics this often
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Central aggregation service for fleet reporters")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="interface to listen on (0.0.0.0 = whole office, needs --token)")
+    parser.add_argument("--port", type=int, default=6170)
+    parser.add_argument("--db", default=str(ROOT / "logs" / "fleet.db"))
+    parser.add_argument("--token", default=os.environ.get("FLEET_TOKEN"),
+                        help="shared secret clients send as X-Fleet-Token (default: $FLEET_TOKEN)")
+    args = parser.parse_args()
+
+    if args.host not in ("127.0.0.1", "localhost", "::1") and not args.token:
+        print(f"[ERROR] --host {args.host} exposes the service to the network: set --token (or FLEET_TOKEN)")
+        sys.exit(2)
+
+    Path(args.db).parent.mkdir(parents=True, exist_ok=True)
+    service = FleetService(args.db, host=args.host, port=args.port, token=args.token).start()
+    print(f"[FLEET] listening on {service.url} db={args.db}", flush=True)
+
+    last = service.health()
+    try:
+        while True:
+            time.sleep(STATS_EVERY_S)
+            h = service.health()
+            rate = (h["ingested"] - last["ingested"]) / STATS_EVERY_S
+            print(
+                f"[FLEET] requests={h['requests']} ingested={h['ingested']} ({rate:.0f} rows/s) "
+                f"pending={h['pending']} flushes={h['flushes']} throttled={h['throttled']} "
+                f"rejected={h['rejected']} unauthorized={h['unauthorized']} in={h['bytes_in'] / 1024:.0f}KB",
+                flush=True
+            )
+            last = h
+    except KeyboardInterrupt:
+        print("\n[FLEET] Stopped by user.")
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
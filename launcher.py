@@ -2,6 +2,7 @@ import os
 import sys
 import time
 import importlib
+from pathlib import Path
 import cv2
 
 # ----------------------------
@@ -186,10 +187,316 @@ def run_full_system():
     cv2.destroyAllWindows()
 
 
+# ----------------------------
+# Warm mode (agents + camera stay loaded)
+# ----------------------------
+class WarmSession:
+    """
+    Keeps the camera open and the heavy agents (face detection, FaceMesh,
+    emotion worker) built for the whole launcher session, so switching
+    between views costs milliseconds instead of a cold start.
+
+    Agents load in the background on first use (AgentLoader), the camera
+    preview runs meanwhile. Inside the window:
+        1 = face, 2 = yawn, 3 = emotion, 4 = full system, ESC = back to menu
+    Leaving with ESC keeps everything loaded; close() releases it.
+    """
+
+    VIEWS = {ord("1"): "face", ord("2"): "yawn", ord("3"): "emotion", ord("4"): "full"}
+    WIN_NAME = "Warm Launcher (1 face | 2 yawn | 3 emotion | 4 full | ESC menu)"
+
+    def __init__(self):
+        import final_agent as fa
+        from agents.startup import StartupClock, AgentLoader
+        from agents.emotion_scheduler import EmotionSampler
+        from agents.decision_agent import MoodDecisionAgent
+        from agents.action_agent import ActionAgent
+
+        self.fa = fa
+        self.clock = StartupClock()
+        self.loader = AgentLoader(self.clock)
+        self.loader.load("face", self._build_face)
+        self.loader.load("yawn", self._build_yawn)
+        self.loader.load("emotion", self._build_emotion)
+
+        self.decision_agent = MoodDecisionAgent()
+        self.action_agent = ActionAgent(log_path=str(fa.ROOT / "logs" / "events.log"))
+        self.sampler = EmotionSampler(
+            window_seconds=fa.WINDOW_SECONDS,
+            target_samples=fa.EMOTION_TARGET_SAMPLES,
+            cpu_budget=fa.EMOTION_CPU_BUDGET,
+            max_interval=fa.EMOTION_SAMPLE_INTERVAL
+        )
+        self.state = fa.new_window_state()
+        self.view = "full"
+        self.cap = None
+        self.frame_buf = None
+
+    # ---- agent factories (run in loader threads) ----
+    def _build_face(self):
+        from agents.sensor_agent import FaceDetectionAgent
+        return FaceDetectionAgent(min_detect_width=self.fa.DETECT_MIN_WIDTH,
+                                  max_detect_width=self.fa.DETECT_MAX_WIDTH)
+
+    def _build_yawn(self):
+        from agents.yawn_agent import YawnAgent
+        return YawnAgent(use_mesh=True)
+
+    def _build_emotion(self):
+        emotion_python = self.fa.get_env_python("emotion_env")
+        worker_script = self.fa.ROOT / "tests" / "emotion_worker.py"
+        if not emotion_python.is_file() or not worker_script.exists():
+            raise RuntimeError("emotion_env or tests/emotion_worker.py not found")
+        return self.fa.build_emotion_pipeline(emotion_python, worker_script)
+
+    def _open_camera(self):
+        if self.cap is not None and self.cap.isOpened():
+            return True
+        self.cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
+        if not self.cap.isOpened():
+            self.cap = cv2.VideoCapture(0)
+        return self.cap.isOpened()
+
+    # ---- views ----
+    def _face_view(self, frame, bbox, now):
+        if bbox:
+            x, y, w, h = bbox
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+            cv2.putText(frame, "Face Detected", (x, max(20, y - 10)),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+
+    def _measure_mar(self, frame, bbox):
+        from agents.frame_utils import clamp_crop, expand_bbox
+
+        yawn_agent = self.loader.get("yawn")
+        if yawn_agent is None or bbox is None:
+            return yawn_agent, None
+        roi = clamp_crop(frame, expand_bbox(bbox, self.fa.MESH_ROI_MARGIN))
+        return yawn_agent, (yawn_agent.measure(roi) if roi is not None else None)
+
+    def _yawn_view(self, frame, bbox, now):
+        yawn_agent, mar = self._measure_mar(frame, bbox)
+        if yawn_agent is None:
+            return
+        if bbox is None:
+            yawn_agent.reset()
+            return
+        if mar is not None:
+            out = yawn_agent.update(mar, now)
+            text = f"MAR: {out['mar']:.3f} | Yawn: {out['yawn']} | Dur: {out['duration']:.1f}s"
+            cv2.putText(frame, text, (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+
+    def _window(self, bbox, now, yawn_agent=None):
+        """
+        final_agent's window rules on self.state: resets when the face is
+        lost, starts when one appears. Returns (pipeline, remaining seconds
+        or None without a face).
+        """
+        fa, state = self.fa, self.state
+        pipeline = self.loader.get("emotion")
+        if bbox is None:
+            fa.reset_window(state, yawn_agent=yawn_agent, emotion_pipeline=pipeline)
+            self.sampler.reset_window()
+            return pipeline, None
+        if state["window_start_ts"] is None:
+            fa.start_window(state, now, pipeline)
+            self.sampler.reset_window()
+        return pipeline, fa.WINDOW_SECONDS - (now - state["window_start_ts"])
+
+    def _sample_emotion(self, pipeline, frame, bbox, now, remaining, landmarks=None):
+        """Emotion jobs at EmotionSampler's pace, as in final_agent."""
+        from agents.frame_utils import clamp_crop
+
+        self.fa.apply_emotion_results(self.state, pipeline, self.sampler)
+        if not pipeline.has_capacity():
+            return
+        crop = clamp_crop(frame, bbox)
+        if crop is not None and self.sampler.should_sample(now, remaining, crop):
+            self.state["last_emotion_sample_ts"] = now
+            pipeline.submit(crop, self.state["window_seq"], landmarks)
+
+    def _emotion_view(self, frame, bbox, now):
+        pipeline, remaining = self._window(bbox, now)
+        if pipeline is None or remaining is None:
+            return
+        self._sample_emotion(pipeline, frame, bbox, now, remaining)
+        if remaining <= 0:
+            # no decision in this view: just keep the sampler's budget per window
+            self.fa.start_window(self.state, now, pipeline)
+            self.sampler.reset_window()
+        cv2.putText(frame, f"Emotion: {self.state['last_emotion_text']}", (20, 40),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+
+    def _full_view(self, frame, bbox, now):
+        """
+        Same window logic as final_agent (window starts with a face, resets
+        when it is lost, decides every WINDOW_SECONDS).
+        """
+        fa, state = self.fa, self.state
+        yawn_agent, mar = self._measure_mar(frame, bbox)
+        landmarks = yawn_agent.last_landmarks if mar is not None else None   # this frame's mesh pass
+        pipeline, remaining = self._window(bbox, now, yawn_agent)
+        yawn_text = "Yawn: no_data"
+
+        if remaining is None:
+            remaining = 0
+            yawn_text = "Yawn: reset"
+        else:
+            if yawn_agent is not None and mar is not None:
+                fa.add_yawn(state, yawn_agent.update(mar, now))
+            yawn_text = state["yawn_text"] or yawn_text
+
+            if pipeline is not None:
+                self._sample_emotion(pipeline, frame, bbox, now, remaining, landmarks)
+
+            if remaining <= 0:
+                decision, _emotion_info, _yawn_info = fa.close_window(state, self.decision_agent)
+                self.action_agent.run(decision)
+                print("[DECISION]", state["last_decision_text"])
+
+                # fresh window right away (face still present), keep the overlay texts
+                fa.start_window(state, now, pipeline)
+                self.sampler.reset_window()
+
+        fa.draw_overlay(frame, bbox, bbox is not None, remaining, state, yawn_text)
+
+    def _enter_view(self, view):
+        """A view starts with a fresh window: no samples / yawns carried over from the previous one."""
+        self.view = view
+        yawn_agent = self.loader.get("yawn")
+        self.fa.reset_window(self.state, yawn_agent=yawn_agent, emotion_pipeline=self.loader.get("emotion"))
+        self.sampler.reset_window()
+
+    # ---- main loop ----
+    def run(self, view=None):
+        self._enter_view(view if view is not None else self.view)
+        if not self._open_camera():
+            print("Camera not found / not accessible.")
+            return
+
+        views = {"face": self._face_view, "yawn": self._yawn_view,
+                 "emotion": self._emotion_view, "full": self._full_view}
+        switch_ts = time.perf_counter()
+        first_frame = True
+
+        while True:
+            ret, self.frame_buf = self.cap.read(self.frame_buf)
+            if not ret:
+                print("[WARN] Camera frame not received")
+                break
+            frame = self.frame_buf
+            now = time.time()
+
+            face_agent = self.loader.get("face")
+            bbox = face_agent.run(frame) if face_agent is not None else None
+            views[self.view](frame, bbox, now)
+
+            if not self.loader.all_ready():
+                cv2.putText(frame, f"Loading: {self.loader.status_text()}", (20, frame.shape[0] - 15),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+            cv2.imshow(self.WIN_NAME, frame)
+
+            if first_frame:
+                first_frame = False
+                print(f"[WARM] view={self.view} first frame in {(time.perf_counter() - switch_ts) * 1000:.0f} ms")
+
+            key = cv2.waitKey(1) & 0xFF
+            if key == 27:  # ESC: back to the menu, keep agents + camera
+                break
+            if key in self.VIEWS and self.VIEWS[key] != self.view:
+                self._enter_view(self.VIEWS[key])
+                switch_ts = time.perf_counter()
+                first_frame = True
+
+        cv2.destroyWindow(self.WIN_NAME)
+        cv2.waitKey(1)
+
+    def close(self):
+        pipeline = self.loader.get("emotion")
+        if pipeline is not None:
+            pipeline.close()
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        cv2.destroyAllWindows()
+
+
+_warm_session = None
+
+
+def run_warm_mode():
+    """
+    Views on one persistent WarmSession (built on first use).
+    """
+    global _warm_session
+    if _warm_session is None:
+        _warm_session = WarmSession()
+    _warm_session.run()
+
+
+# ----------------------------
+# Supervised mode (camera + emotion server as restartable processes)
+# ----------------------------
+SUPERVISE_CAMERA_MAX_RSS_MB = 1500     # restart the camera process above this (needs psutil)
+SUPERVISE_EMOTION_MAX_RSS_MB = 3000    # TensorFlow leak guard for the emotion server
+
+
+def build_supervised_processes():
+    """
+    Camera pipeline (final_agent.py, face_env) and emotion server
+    (emotion_server.py, emotion_env) as two independent children: the
+    camera keeps running while the emotion server restarts, and its
+    emotion requests simply fail until the server answers again.
+    """
+    import final_agent as fa
+    from agents.analysis_agent import EmotionBatchModel
+    from agents.model_store import bundle_path
+    from agents.supervisor import ManagedProcess
+
+    root = Path(ROOT)
+    log_dir = root / "logs" / "supervisor"
+
+    face_python = fa.get_env_python("face_env")
+    if not face_python.is_file():
+        face_python = Path(sys.executable)
+    emotion_python = fa.get_env_python("emotion_env")
+    if not emotion_python.is_file():
+        raise RuntimeError("emotion_env python not found")
+    if not (bundle_path(EmotionBatchModel.BUNDLE_NAME) / "manifest.json").exists():
+        # the server would only fail and be restarted over and over
+        raise RuntimeError("emotion model bundle not found (run export_models.py in emotion_env)")
+
+    return [
+        ManagedProcess("emotion_server", [emotion_python, root / "emotion_server.py"], root, log_dir,
+                       heartbeat_timeout=60.0, startup_grace=180.0,      # TensorFlow import + warm-up
+                       max_rss_mb=SUPERVISE_EMOTION_MAX_RSS_MB),
+        ManagedProcess("camera", [face_python, root / "final_agent.py", "--emotion-server"], root, log_dir,
+                       heartbeat_timeout=15.0, startup_grace=60.0,
+                       max_rss_mb=SUPERVISE_CAMERA_MAX_RSS_MB, stop_on_clean_exit=True),
+    ]
+
+
+def run_supervised():
+    """
+    Runs the full system under a Supervisor until ESC in the camera window
+    (or Ctrl+C here). Child output goes to logs/supervisor/<name>.log.
+    """
+    from agents.supervisor import Supervisor
+
+    Supervisor(build_supervised_processes()).run()
+
+
 # ----------------------------
 # CLI Menu
 # ----------------------------
 def main():
+    if "--supervise" in sys.argv[1:]:
+        run_supervised()
+        return
+    if "--warm" in sys.argv[1:]:
+        run_warm_mode()
+        return
+
     while True:
         print("\n==== AI Multi-Agent Launcher ====")
         print("1) Face Detection (live)")
@@ -199,6 +506,8 @@ def main():
         print("5) Decision Agent (demo samples)")
         print("6) Action Agent (demo print/log/beep)")
         print("7) FULL SYSTEM (all agents together)")
+        print("8) WARM MODE (agents + camera stay loaded, switch views with 1-4)")
+        print("9) SUPERVISED (camera + emotion server as separate, auto-restarted processes)")
         print("0) Exit")
 
         choice = input("Select option: ").strip()
@@ -218,7 +527,13 @@ def main():
                 run_action_demo()
             elif choice == "7":
                 run_full_system()
+            elif choice == "8":
+                run_warm_mode()
+            elif choice == "9":
+                run_supervised()
             elif choice == "0":
+                if _warm_session is not None:
+                    _warm_session.close()
                 print("Bye 👋")
                 break
             else:
@@ -0,0 +1,285 @@
+from pathlib import Path
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import urllib.request
+
+# Make project root importable
+ROOT = Path(__file__).resolve().parent
+sys.path.append(str(ROOT))
+
+from agents.yawn_agent import YawnAgent
+from agents.decision_agent import MoodDecisionAgent
+from agents.action_agent import ActionAgent
+from agents.fleet_reporter import FleetReporter
+from agents.fleet_service import FleetService
+from agents.window_state import summarize_emotions
+from final_agent import WINDOW_SECONDS
+
+
+# Phase behaviour of a synthetic user
+#   face:       whether the user is at the desk
+#   dropout:    detector misses per second (each drops 1-3 frames and,
+#               as in final_agent, restarts the window)
+#   yawn_rate:  yawns started per second
+#   yawn_len:   (min, max) yawn length in seconds
+#   emotions:   emotion -> weight for emotion samples
+#   conf:       (min, max) emotion confidence
+PHASES = {
+    "focused": {"face": True, "dropout": 0.002, "yawn_rate": 0.0, "yawn_len": (0, 0),
+                "emotions": {"happy": 0.6, "neutral": 0.4}, "conf": (60, 95)},
+    "normal": {"face": True, "dropout": 0.005, "yawn_rate": 0.002, "yawn_len": (0.5, 1.2),
+               "emotions": {"neutral": 0.8, "happy": 0.1, "sad": 0.1}, "conf": (35, 80)},
+    "drowsy_burst": {"face": True, "dropout": 0.01, "yawn_rate": 0.08, "yawn_len": (1.8, 4.0),
+                     "emotions": {"neutral": 0.7, "sad": 0.3}, "conf": (40, 70)},
+    "stress": {"face": True, "dropout": 0.005, "yawn_rate": 0.0, "yawn_len": (0, 0),
+               "emotions": {"angry": 0.4, "sad": 0.3, "fear": 0.2, "neutral": 0.1}, "conf": (60, 95)},
+    "away": {"face": False, "dropout": 0.0, "yawn_rate": 0.0, "yawn_len": (0, 0),
+             "emotions": {"neutral": 1.0}, "conf": (0, 0)},
+}
+
+# Scripted scenarios: list of (phase, seconds), repeated until the run ends
+SCENARIOS = {
+    "office": [("focused", 120), ("normal", 90), ("drowsy_burst", 40), ("normal", 60),
+               ("stress", 60), ("away", 15)],
+    "drowsy": [("normal", 30), ("drowsy_burst", 90)],
+    "stress": [("normal", 30), ("stress", 90)],
+    "flapping": [("focused", 35), ("away", 2), ("stress", 35), ("drowsy_burst", 35)],
+}
+
+
+class SyntheticClient:
+    """
+    One simulated workstation: generates face presence, MAR and emotion
+    samples in virtual time, and runs them through the real YawnAgent
+    timer, the final_agent window rules, MoodDecisionAgent and ActionAgent.
+    """
+
+    def __init__(self, scenario, fps, emotion_interval, log_path, seed, reporter=None):
+        self.rng = random.Random(seed)
+        self.phases = SCENARIOS[scenario]
+        self.fps = fps
+        self.emotion_interval = emotion_interval
+        self.vt = 0.0                              # virtual clock (seconds)
+
+        self.yawn_agent = YawnAgent(use_mesh=False)
+        self.decision_agent = MoodDecisionAgent()
+        self.action_agent = ActionAgent(
+            log_path=str(log_path),
+            break_seconds=0,
+            notifications=False,
+            clock=lambda: self.vt,
+            reporter=reporter
+        )
+
+        self.yawn_until = 0.0
+        self.dropout_frames = 0
+        self.window_start = None
+        self.last_emotion_ts = 0.0
+        self.samples = []
+        self.yawn_info = None
+        self.decisions = {}
+        self.events = 0
+
+    def _phase(self):
+        total = sum(sec for _, sec in self.phases)
+        t = self.vt % total
+        for name, sec in self.phases:
+            if t < sec:
+                return PHASES[name]
+            t -= sec
+        return PHASES[self.phases[-1][0]]
+
+    def step(self):
+        """
+        Advances one frame. Returns decision+action latency (s) when a
+        window closed on this frame, else None.
+        """
+        dt = 1.0 / self.fps
+        self.vt += dt
+        p = self._phase()
+        rng = self.rng
+
+        if p["face"] and self.dropout_frames == 0 and rng.random() < p["dropout"] * dt:
+            self.dropout_frames = rng.randint(1, 3)
+        face = p["face"] and self.dropout_frames == 0
+        self.dropout_frames = max(0, self.dropout_frames - 1)
+        self.events += 1
+
+        if not face:
+            self.window_start = None
+            self.yawn_agent.reset()
+            return None
+
+        if self.window_start is None:
+            self.window_start = self.vt
+            self.samples = []
+            self.yawn_info = {"yawn": False, "duration": 0.0, "mar": 0.0}
+
+        # Yawn event stream
+        if self.vt >= self.yawn_until and rng.random() < p["yawn_rate"] * dt:
+            self.yawn_until = self.vt + rng.uniform(*p["yawn_len"])
+        mar = rng.uniform(0.10, 0.20) if self.vt < self.yawn_until else rng.uniform(0.01, 0.05)
+
+        out = self.yawn_agent.update(mar, self.vt)
+        y = self.yawn_info
+        y["yawn"] = y["yawn"] or out["yawn"]
+        y["duration"] = max(y["duration"], out["duration"])
+        y["mar"] = max(y["mar"], out["mar"])
+
+        # Emotion sample stream
+        if self.vt - self.last_emotion_ts >= self.emotion_interval:
+            self.last_emotion_ts = self.vt
+            emotion = rng.choices(list(p["emotions"]), weights=list(p["emotions"].values()))[0]
+            self.samples.append({"emotion": emotion, "confidence": rng.uniform(*p["conf"])})
+            self.events += 1
+
+        # Window end -> decision + action
+        if self.vt - self.window_start >= WINDOW_SECONDS:
+            t0 = time.perf_counter()
+            decision = self.decision_agent.run(summarize_emotions(self.samples), y)
+            self.action_agent.run(decision)
+            latency = time.perf_counter() - t0
+
+            state = decision["state"]
+            self.decisions[state] = self.decisions.get(state, 0) + 1
+            self.window_start = self.vt
+            self.samples = []
+            self.yawn_info = {"yawn": False, "duration": 0.0, "mar": 0.0}
+            return latency
+
+        return None
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic load for the decision/action path")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="office")
+    parser.add_argument("--clients", type=int, default=10, help="simulated workstations")
+    parser.add_argument("--fps", type=float, default=30.0, help="frames per second per client (virtual)")
+    parser.add_argument("--emotion-interval", type=float, default=8.0, help="seconds between emotion samples")
+    parser.add_argument("--minutes", type=float, default=60.0, help="virtual minutes to simulate per client")
+    parser.add_argument("--rate", type=float, default=0.0, help="max events/s in real time (0 = as fast as possible)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--fleet", help="report to a fleet service: URL, or 'local' for an in-process stand-in")
+    parser.add_argument("--fleet-token", help="X-Fleet-Token of the fleet service (fleet_server.py --token)")
+    args = parser.parse_args()
+
+    log_dir = Path(tempfile.mkdtemp(prefix="mood_load_"))
+
+    fleet_service, fleet_reporter = None, None
+    if args.fleet:
+        url = args.fleet
+        if url == "local":
+            fleet_service = FleetService(log_dir / "fleet.db", port=0).start()
+            url = fleet_service.url
+        # one sender thread for all simulated desks; events carry their client id
+        fleet_reporter = FleetReporter(url, client_id="load", spool_dir=log_dir / "fleet_spool",
+                                       batch_size=1000, flush_seconds=1.0, max_queue=100_000,
+                                       token=args.fleet_token)
+        print(f"[LOAD] fleet -> {url}")
+
+    clients = [
+        SyntheticClient(args.scenario, args.fps, args.emotion_interval, log_dir / f"client_{i}.log", args.seed + i,
+                        reporter=fleet_reporter.bind(f"sim-{i:04d}") if fleet_reporter else None)
+        for i in range(args.clients)
+    ]
+
+    frames_per_client = int(args.minutes * 60 * args.fps)
+    latencies = []
+
+    print(f"[LOAD] scenario={args.scenario} clients={args.clients} fps={args.fps} "
+          f"virtual={args.minutes:.0f}min rate={'max' if args.rate <= 0 else args.rate}")
+    print(f"[LOAD] action logs -> {log_dir}")
+
+    t0 = time.perf_counter()
+    events = 0
+    # ActionAgent prints every log line; keep the console quiet during the run
+    with contextlib.redirect_stdout(io.StringIO()) as sink:
+        for _ in range(frames_per_client):
+            for c in clients:
+                lat = c.step()
+                if lat is not None:
+                    latencies.append(lat)
+
+            if args.rate > 0:
+                events = sum(c.events for c in clients)
+                ahead = events / args.rate - (time.perf_counter() - t0)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+            sink.seek(0)
+            sink.truncate()
+
+        elapsed = time.perf_counter() - t0
+        time.sleep(0.1)     # let the last break timer threads (break_seconds=0) log inside the redirect
+
+    events = sum(c.events for c in clients)
+
+    decisions = {}
+    for c in clients:
+        for state, n in c.decisions.items():
+            decisions[state] = decisions.get(state, 0) + n
+
+    log_lines = 0
+    log_bytes = 0
+    notifications = 0
+    for f in log_dir.glob("*.log"):
+        log_bytes += os.path.getsize(f)
+        with open(f, "r", encoding="utf-8") as fh:
+            for line in fh:
+                log_lines += 1
+                notifications += "NOTIFY |" in line
+
+    n_windows = max(len(latencies), 1)
+    print(f"\n[LOAD] events={events:,} in {elapsed:.2f}s -> {events / max(elapsed, 1e-9):,.0f} events/s")
+    print(f"[LOAD] windows={len(latencies):,} decisions={decisions}")
+    print(
+        f"[LOAD] decision+action latency: p50={percentile(latencies, 0.50) * 1000:.3f}ms "
+        f"p95={percentile(latencies, 0.95) * 1000:.3f}ms p99={percentile(latencies, 0.99) * 1000:.3f}ms "
+        f"max={max(latencies, default=0) * 1000:.3f}ms"
+    )
+    print(
+        f"[LOAD] log: {log_lines:,} lines, {log_bytes / 1024:.1f} KB "
+        f"({log_lines / n_windows:.2f} lines/window), notifications={notifications:,} "
+        f"({notifications / n_windows:.2f}/window)"
+    )
+
+    if fleet_reporter is not None:
+        t1 = time.perf_counter()
+        fleet_reporter.close(timeout=30.0)
+        if fleet_service is not None:
+            fleet_service.drain()
+        print(f"[LOAD] fleet reporter: {fleet_reporter.status_text()} "
+              f"(flushed in {time.perf_counter() - t1:.2f}s)")
+
+        req = urllib.request.Request(f"{fleet_reporter.url}/stats?since=0&per_client=3",
+                                     headers={"X-Fleet-Token": args.fleet_token} if args.fleet_token else {})
+        with urllib.request.urlopen(req, timeout=10) as resp:
+            stats = json.load(resp)
+        shares = " ".join(
+            f"{k}={stats[k]:.1%}" for k in ("drowsy_share", "focus_share", "stress_share") if stats[k] is not None
+        )
+        print(f"[LOAD] fleet stats: clients={stats['clients']} events={stats['events']:,} "
+              f"windows={stats['windows']:,} {shares}")
+        if fleet_service is not None:
+            h = fleet_service.health()
+            print(f"[LOAD] fleet service: requests={h['requests']} flushes={h['flushes']} "
+                  f"throttled={h['throttled']} in={h['bytes_in'] / 1024:.0f}KB")
+            fleet_service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+from pathlib import Path
+import sys
+import time
+import itertools
+
+# Make project root importable
+ROOT = Path(__file__).resolve().parent
+sys.path.append(str(ROOT))
+
+from agents.feature_recording import FeatureReplay, replay_windows
+from final_agent import WINDOW_SECONDS
+
+
+# Parameter grid for the sweep (edit as needed)
+MAR_THRESHOLDS = [0.06, 0.07, 0.08, 0.09, 0.10, 0.12]
+YAWN_MIN_SECONDS = [1.0, 1.3, 1.6, 2.0]
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python replay_features.py recordings/<session>")
+        return
+
+    rec = FeatureReplay(sys.argv[1])
+    if len(rec.frames) < 2:
+        print("[ERROR] Recording has no frames")
+        return
+
+    span = rec.frames["ts"][-1] - rec.frames["ts"][0]
+    print(f"[INFO] {len(rec)} frames, {len(rec.emotions)} emotion samples, {span / 60:.1f} min")
+
+    print(f"\n{'MAR_THR':>8} {'MIN_S':>6} {'windows':>8} {'drowsy':>7} {'stressed':>9} {'engaged':>8} {'normal':>7} {'unknown':>8}")
+    t0 = time.perf_counter()
+    runs = 0
+
+    for thr, min_s in itertools.product(MAR_THRESHOLDS, YAWN_MIN_SECONDS):
+        windows = replay_windows(rec, WINDOW_SECONDS, mar_threshold=thr, yawn_min_seconds=min_s)
+        runs += 1
+
+        counts = {}
+        for w in windows:
+            state = w["decision"]["state"]
+            counts[state] = counts.get(state, 0) + 1
+
+        print(
+            f"{thr:>8.3f} {min_s:>6.1f} {len(windows):>8} {counts.get('drowsy', 0):>7} "
+            f"{counts.get('stressed', 0):>9} {counts.get('engaged', 0):>8} "
+            f"{counts.get('normal', 0):>7} {counts.get('unknown', 0):>8}"
+        )
+
+    elapsed = time.perf_counter() - t0
+    print(f"\n[INFO] {runs} configurations in {elapsed:.2f}s "
+          f"({runs * len(rec) / max(elapsed, 1e-9):,.0f} frames/s replayed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+from pathlib import Path
+import sys
+import time
+import threading
+import multiprocessing as mp
+
+import cv2
+
+# Make project root importable
+ROOT = Path(__file__).resolve().parent
+sys.path.append(str(ROOT))
+
+from agents.bus import LocalBus, BusBroker, BusClient, start_node_process
+from agents.bus_nodes import face_node, yawn_node, emotion_node, window_node, action_node
+from final_agent import get_env_python, WINDOW_SECONDS, EMOTION_SAMPLE_INTERVAL
+
+
+# Every agent runs as its own process, pinned to its own core.
+# Run with --inprocess to use threads + LocalBus instead (same node code).
+IN_PROCESS = "--inprocess" in sys.argv
+
+NODE_CORES = {
+    "face": 1,
+    "yawn": 2,
+    "emotion": 3,
+    "window": 0,
+    "action": 0,
+}
+
+
+def main():
+    emotion_python = get_env_python("emotion_env")
+    worker_script = ROOT / "tests" / "emotion_worker.py"
+
+    nodes = {
+        "face": (face_node, ()),
+        "yawn": (yawn_node, ()),
+        "emotion": (emotion_node, (str(emotion_python), str(worker_script), EMOTION_SAMPLE_INTERVAL)),
+        "window": (window_node, (WINDOW_SECONDS,)),
+        "action": (action_node, (str(ROOT / "logs" / "events.log"),)),
+    }
+
+    cores = mp.cpu_count()
+    broker = None
+    if IN_PROCESS:
+        bus = LocalBus()
+        stop = threading.Event()
+        for name, (fn, args) in nodes.items():
+            threading.Thread(target=fn, args=(bus, stop, *args), daemon=True, name=name).start()
+    else:
+        broker = BusBroker().start()
+        bus = BusClient(broker.address)
+        stop = mp.Event()
+        for name, (fn, args) in nodes.items():
+            core = NODE_CORES[name] % cores
+            start_node_process(fn, stop, *args, address=broker.address, core=core)
+            print(f"[BUS] started {name} node (core {core})")
+
+    bboxes = bus.subscribe("face_bbox", maxsize=1)
+    yawns = bus.subscribe("yawn_metrics", maxsize=1)
+    emotions = bus.subscribe("emotion")
+    decisions = bus.subscribe("decision")
+
+    cap = cv2.VideoCapture(0)
+    if not cap.isOpened():
+        print("[ERROR] Camera not found")
+        stop.set()
+        return
+
+    bbox = None
+    yawn_text = "Yawn: no_data"
+    emotion_text = "none"
+    decision_text = "none"
+    frame_id = 0
+
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            frame_id += 1
+            # LocalBus hands the array itself to the node threads: give them their own
+            # copy, the overlay below is drawn on `frame` (BusClient pickles it anyway)
+            published = frame.copy() if IN_PROCESS else frame
+            bus.publish("frames", {"frame_id": frame_id, "ts": time.time(), "frame": published})
+
+            for m in bboxes.drain():
+                bbox = m["bbox"]
+            for m in yawns.drain():
+                yawn_text = f"Yawn: {m['yawn']} (dur={m['duration']:.1f}s mar={m['mar']:.3f})"
+            for m in emotions.drain():
+                emotion_text = f"{m['emotion']} ({m['confidence']:.1f})"
+            for m in decisions.drain():
+                decision_text = f"{m['state']} ({m['reason']})"
+                print("[DECISION]", decision_text)
+
+            if bbox:
+                x, y, bw, bh = bbox
+                cv2.rectangle(frame, (x, y), (x + bw, y + bh), (0, 255, 0), 2)
+
+            cv2.putText(frame, f"Emotion: {emotion_text} | {yawn_text}", (20, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.55, (255, 255, 255), 2)
+            cv2.putText(frame, f"Last Decision: {decision_text}", (20, 60),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.55, (255, 255, 0), 2)
+
+            cv2.imshow("Bus Multi-Agent System", frame)
+            if cv2.waitKey(1) & 0xFF == 27:  # ESC
+                break
+
+    except KeyboardInterrupt:
+        print("\n[INFO] Stopped by user.")
+    finally:
+        stop.set()
+        cap.release()
+        cv2.destroyAllWindows()
+        bus.close()
+        if broker is not None:
+            time.sleep(0.5)  # let nodes see the stop flag
+            broker.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import sys
 import os
 import json
 import cv2
+import numpy as np
 
 # Optional: reduce TensorFlow logs a bit
 os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
@@ -10,7 +11,64 @@ os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
 PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
 sys.path.append(PROJECT_ROOT)
 
-from agents.analysis_agent import EmotionAgent
+from agents.analysis_agent import EmotionAgent, EmotionBatchModel
+from agents.frame_utils import unpack_tensor
+
+
+def warm_up(agent, model):
+    """
+    Runs one dummy inference so TensorFlow and the model weights
+    are loaded before the first real face arrives. With a bundled
+    model DeepFace is left unloaded until a {"path"} request needs it.
+    """
+    dummy = np.zeros((48, 48, 3), dtype=np.uint8)
+    if not model.bundled:
+        agent.run(dummy)
+    model.predict_batch([model.preprocess(dummy)])
+
+
+def serve(agent):
+    """
+    Long-lived mode (--serve): one JSON request per stdin line,
+    one JSON result per stdout line.
+        in : {"tensor": {"shape", "dtype", "data"}}   (frame_utils.pack_tensor)
+             {"path": "temp/emotion_face.jpg"}        (full crop, DeepFace.analyze)
+        out: {"emotion": "...", "confidence": ...} or null
+
+    Tensors are already cropped, resized, grayscale and normalized on the
+    camera side, so they go straight into the model.
+    """
+    # DeepFace.analyze serves the path requests anyway: its model is allowed here
+    model = EmotionBatchModel(allow_deepface=True)
+    warm_up(agent, model)
+    print(json.dumps({"ready": True}), flush=True)
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            req = json.loads(line)
+        except ValueError:
+            print(json.dumps({"error": "bad_request"}), flush=True)
+            continue
+
+        if "tensor" in req:
+            try:
+                x = unpack_tensor(req["tensor"])
+            except (KeyError, ValueError) as e:
+                print(json.dumps({"error": f"bad_tensor: {e}"}), flush=True)
+                continue
+            print(json.dumps(model.predict_batch([x])[0]), flush=True)
+            continue
+
+        frame = cv2.imread(str(req.get("path", "")))
+        if frame is None:
+            print(json.dumps({"error": "cannot_read_image"}), flush=True)
+            continue
+
+        print(json.dumps(agent.run(frame)), flush=True)
 
 
 def main():
@@ -18,6 +76,12 @@ def main():
         print(json.dumps({"error": "missing_image_path"}))
         sys.exit(1)
 
+    agent = EmotionAgent(cooldown_s=0.0)  # worker should not self-throttle
+
+    if sys.argv[1] == "--serve":
+        serve(agent)
+        return
+
     image_path = sys.argv[1]
 
     frame = cv2.imread(image_path)
@@ -25,7 +89,6 @@ def main():
         print(json.dumps({"error": "cannot_read_image"}))
         sys.exit(1)
 
-    agent = EmotionAgent(cooldown_s=0.0)  # worker should not self-throttle
     result = agent.run(frame)
 
     # Print only JSON to stdout so final_agent can parse it
@@ -33,4 +96,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,85 @@
+import sys, os
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from agents.bus import BusBroker, BusClient, LocalBus
+from agents.bus_nodes import window_node
+
+
+def face(frame_id, ts, bbox=(10, 10, 50, 50)):
+    return {"frame_id": frame_id, "ts": ts, "bbox": bbox}
+
+
+def main():
+    # typed topics: unknown topics and missing fields are refused
+    bus = LocalBus()
+    for bad in (lambda: bus.publish("nope", {}), lambda: bus.publish("face_bbox", {"ts": 1.0})):
+        try:
+            bad()
+            raise AssertionError("bad message accepted")
+        except ValueError:
+            pass
+
+    # bounded subscription keeps the newest messages
+    latest = bus.subscribe("face_bbox", maxsize=2)
+    every = bus.subscribe("face_bbox")
+    for i in range(5):
+        bus.publish("face_bbox", face(i, float(i)))
+    assert [m["frame_id"] for m in latest.drain()] == [3, 4]
+    assert [m["frame_id"] for m in every.drain()] == [0, 1, 2, 3, 4]
+    print("local bus: typed topics, bounded queues keep the newest")
+
+    # broker: messages cross connections, in order
+    broker = BusBroker(address=("127.0.0.1", 0)).start()
+    pub, sub = BusClient(broker.address), BusClient(broker.address)
+    faces = sub.subscribe("face_bbox")
+    time.sleep(0.2)     # subscription reaches the broker
+    for i in range(20):
+        pub.publish("face_bbox", face(i, float(i)))
+    got = []
+    while len(got) < 20:
+        m = faces.get(timeout=2.0)
+        assert m is not None, f"only {len(got)} of 20 messages arrived"
+        got.append(m["frame_id"])
+    assert got == list(range(20))
+    pub.close()
+    sub.close()
+    broker.close()
+    print("broker: 20 messages delivered in order")
+
+    # window node: decision after window_seconds of face, yawns / emotions of the window only
+    bus = LocalBus()
+    decisions = bus.subscribe("decision")
+    stop = threading.Event()
+    t = threading.Thread(target=window_node, args=(bus, stop, 2.0), daemon=True)
+    t.start()
+    deadline = time.time() + 5.0          # the node subscribes once its thread runs
+    while bus.subscriber_count("emotion") == 0:
+        assert time.time() < deadline, "window node did not subscribe"
+        time.sleep(0.01)
+    bus.publish("face_bbox", face(0, 100.0))
+    time.sleep(0.2)
+    bus.publish("yawn_metrics", {"frame_id": 1, "ts": 99.0, "yawn": True, "duration": 3.0, "mar": 0.8})  # before the window
+    bus.publish("emotion", {"frame_id": 1, "ts": 100.5, "emotion": "angry", "confidence": 90.0})
+    time.sleep(0.2)
+    bus.publish("face_bbox", face(2, 102.5))
+    d = decisions.get(timeout=2.0)
+    assert d is not None and d["state"] == "stressed", d
+
+    bus.publish("face_bbox", face(3, 103.0, bbox=None))      # face lost: window reset
+    time.sleep(0.2)
+    bus.publish("face_bbox", face(4, 104.0))
+    time.sleep(0.2)
+    bus.publish("face_bbox", face(5, 105.0))
+    assert decisions.get(timeout=0.5) is None                # only 1 s into the new window
+    stop.set()
+    t.join(timeout=2.0)
+    print(f"window node: {d['state']} ({d['reason']}), reset on face loss")
+
+    print("bus OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import sys, os
+import contextlib
+import io
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from agents.calibration import P2Quantile, UserCalibration
+from agents.decision_agent import MoodDecisionAgent
+from agents.yawn_agent import YawnAgent
+import final_agent
+
+
+def main():
+    # P-square estimates vs exact percentiles of a skewed, MAR-like sample
+    rng = np.random.default_rng(3)
+    values = rng.gamma(2.0, 0.02, size=20000)
+    for p in (0.5, 0.8, 0.9):
+        sketch = P2Quantile(p)
+        for v in values:
+            sketch.add(v)
+        exact = float(np.percentile(values, p * 100))
+        assert abs(sketch.value() - exact) <= 0.02 * exact, (p, sketch.value(), exact)
+        print(f"p{int(p * 100)}: P2 {sketch.value():.4f} vs numpy {exact:.4f}")
+
+    # save / load keeps the sketch state
+    path = Path(tempfile.mkdtemp(prefix="calibration_test_")) / "user.json"
+    calib = UserCalibration(path, min_mar_samples=1000, min_windows=5)
+    for v in rng.normal(0.03, 0.003, size=2000):     # resting mouth
+        calib.observe_mar(v)
+    for conf in (70.0, 75.0, 80.0, 85.0, 90.0, 72.0):
+        calib.observe_window({"emotion": "sad", "confidence": conf})
+    calib.observe_window({"emotion": "happy", "confidence": 99.0})      # too few windows yet
+    calib.save()
+    with contextlib.redirect_stdout(io.StringIO()):
+        loaded = UserCalibration(path, min_mar_samples=1000, min_windows=5)
+    assert loaded.mar_threshold() == calib.mar_threshold()
+
+    # personal thresholds: MAR from median + spread (clamped), confidence from p80 (clamped)
+    median, p90 = calib.mar_median.value(), calib.mar_p90.value()
+    want = median + UserCalibration.MAR_SPREAD * (p90 - median)
+    assert 0.5 * calib.default_mar < want < 2.0 * calib.default_mar   # inside the clamp
+    assert abs(calib.mar_threshold() - want) < 1e-12
+    conf = calib.confidence_thresholds()
+    assert list(conf) == ["sad"] and 60.0 <= conf["sad"] <= 95.0, conf
+    print(f"personal: mar_threshold={calib.mar_threshold():.3f} sad>={conf['sad']:.1f}")
+
+    # not enough data yet: the global defaults are applied unchanged
+    fresh = UserCalibration(path.parent / "new.json")
+    yawn_agent, decision_agent = YawnAgent(use_mesh=False), MoodDecisionAgent()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fresh.apply(yawn_agent, decision_agent)
+    assert yawn_agent.MAR_THRESHOLD == YawnAgent(use_mesh=False).MAR_THRESHOLD
+    assert decision_agent.run({"emotion": "sad", "confidence": 65.0}, None) == \
+        MoodDecisionAgent().run({"emotion": "sad", "confidence": 65.0}, None)
+
+    # calibration changes decisions, so the camera loop only runs it when enabled
+    assert final_agent.CALIBRATE_THRESHOLDS is False
+    print("calibration off by default, defaults until enough data")
+
+    print("calibration OK")
+
+
+if __name__ == "__main__":
+    main()
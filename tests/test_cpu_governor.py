@@ -0,0 +1,70 @@
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from agents.cpu_governor import CpuGovernor
+
+
+class FakeCpuGovernor(CpuGovernor):
+    """CpuGovernor fed with a scripted CPU share instead of the real process."""
+
+    def __init__(self, **kwargs):
+        self.cpu_total = 0.0
+        super().__init__(**kwargs)
+
+    def _cpu_seconds(self):
+        return self.cpu_total
+
+
+def run_period(gov, now, cpu_share):
+    """One governor period at cpu_share of a core; returns (now, tick result)."""
+    gov.cpu_total += cpu_share * gov.period
+    now += gov.period
+    return now, gov.tick(now)
+
+
+def main():
+    gov = FakeCpuGovernor(target=0.15, period=5.0, up_ratio=0.6, up_periods=3)
+    gov.t0 = now = 0.0
+    top = len(gov.levels) - 1
+    assert gov.level == top
+
+    # over budget: one level cheaper right away
+    now, out = run_period(gov, now, 0.30)
+    assert out is not None and gov.level == top - 1, gov.level
+
+    # the period after a change is not judged, even when still over budget
+    now, out = run_period(gov, now, 0.30)
+    assert out is None and gov.level == top - 1
+
+    now, out = run_period(gov, now, 0.30)
+    assert gov.level == top - 2
+
+    # between target * up_ratio and target: hold
+    now, _ = run_period(gov, now, 0.0)      # settling period
+    for _ in range(5):
+        now, out = run_period(gov, now, 0.12)
+        assert out is None and gov.level == top - 2
+
+    # calm, but only up_periods calm checks in a row step up
+    now, _ = run_period(gov, now, 0.05)
+    now, _ = run_period(gov, now, 0.05)
+    now, _ = run_period(gov, now, 0.12)     # not calm: the count starts over
+    now, _ = run_period(gov, now, 0.05)
+    now, out = run_period(gov, now, 0.05)
+    assert out is None and gov.level == top - 2
+    now, out = run_period(gov, now, 0.05)
+    assert out is not None and gov.level == top - 1, gov.level
+
+    # never below the cheapest / above the richest level
+    for _ in range(20):
+        now, _ = run_period(gov, now, 1.0)
+    assert gov.level == 0
+    for _ in range(40):
+        now, _ = run_period(gov, now, 0.0)
+    assert gov.level == top
+
+    print(f"governor hysteresis OK ({gov.changes} level changes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,4 +13,26 @@ samples = [
 ]
 
 for i, (emo, yawn) in enumerate(samples, 1):
-    print(i, agent.run(emo, yawn))
\ No newline at end of file
+    print(i, agent.run(emo, yawn))
+
+# Same samples through the vectorized path (replay / threshold tuning):
+# it must decide exactly like run(), with and without personal thresholds
+columns = {
+    "emotion": [(e or {}).get("emotion", "unknown") for e, _ in samples],
+    "confidence": [(e or {}).get("confidence", 0.0) for e, _ in samples],
+    "yawn": [y["yawn"] for _, y in samples],
+    "duration": [y["duration"] for _, y in samples],
+    "mar": [y["mar"] for _, y in samples],
+}
+batch = agent.run_batch(columns)
+print("batch:", batch["state"].tolist())
+assert batch["state"].tolist() == [agent.run(e, y)["state"] for e, y in samples]
+
+for personal, expected in (
+    ({"confidence": {"sad": 80.0, "happy": 90.0}}, ["normal", "normal", "drowsy", "unknown"]),
+    ({"confidence": 70.0}, ["engaged", "stressed", "drowsy", "unknown"]),
+):
+    agent.set_personal_thresholds(personal)
+    batch = agent.run_batch(columns)
+    print("batch", personal, batch["state"].tolist())
+    assert batch["state"].tolist() == [agent.run(e, y)["state"] for e, y in samples] == expected
@@ -0,0 +1,87 @@
+import sys, os
+import contextlib
+import io
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from agents.emotion_pipeline import EmotionPipeline
+
+
+# Stand-in for emotion_worker.py --serve: same stdin/stdout protocol, every
+# answer takes LATENCY seconds. Each start appends its pid to starts.log.
+SLOW_WORKER = """
+import json, os, sys, time
+with open(os.path.join(os.path.dirname(__file__), "starts.log"), "a") as f:
+    f.write(f"{os.getpid()}\\n")
+print(json.dumps({"ready": True}), flush=True)
+for line in sys.stdin:
+    time.sleep(float(os.environ.get("SLOW_WORKER_LATENCY", "0.6")))
+    print(json.dumps({"emotion": "happy", "confidence": 90.0}), flush=True)
+"""
+
+
+def wait_until(cond, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def main():
+    work = Path(tempfile.mkdtemp(prefix="emotion_pipeline_test_"))
+    script = work / "slow_worker.py"
+    script.write_text(SLOW_WORKER, encoding="utf-8")
+    starts = work / "starts.log"
+    crop = np.full((120, 100, 3), 128, dtype=np.uint8)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        pipeline = EmotionPipeline(Path(sys.executable), script, cwd=work, workers=1, cancel_policy="kill").start()
+    try:
+        # normal job: delivered with its latency
+        job = pipeline.submit(crop, window_seq=1)
+        assert wait_until(lambda: not pipeline.results.empty())
+        [(done, emo)] = pipeline.drain()
+        assert done is job and emo["emotion"] == "happy" and job.latency >= 0.5
+
+        # a worker whose answer is already back is not killed (no respawn for nothing)
+        first = pipeline.clients[0]
+        assert not first.abort() and first.is_alive()
+        pipeline.cancel(2)
+        assert pipeline.stats["killed"] == 0
+
+        # cancelled while running: killed, its result never delivered
+        job = pipeline.submit(crop, window_seq=2)
+        assert wait_until(lambda: pipeline.running[0] is job)
+        first_proc = first.proc
+        pipeline.cancel(3)
+        assert pipeline.stats["killed"] == 1 and job.cancelled
+        assert wait_until(lambda: first_proc.poll() is not None, timeout=2.0)    # reaped, no zombie
+        time.sleep(1.0)                                                          # past its latency
+        assert pipeline.drain() == []
+        print("cancelled job: worker killed, result never delivered")
+
+        # next job respawns exactly one worker
+        job = pipeline.submit(crop, window_seq=3)
+        assert wait_until(lambda: not pipeline.results.empty())
+        [(done, emo)] = pipeline.drain()
+        assert done is job and not job.cancelled
+        second_proc = pipeline.clients[0].proc
+        alive = [p for p in (first_proc, second_proc) if p.poll() is None]
+        assert alive == [second_proc], alive
+        assert len(starts.read_text().split()) == 2
+        print("respawn: one worker process alive afterwards")
+    finally:
+        pipeline.close()
+
+    print("emotion pipeline OK")
+
+
+if __name__ == "__main__":
+    main()
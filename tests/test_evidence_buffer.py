@@ -0,0 +1,75 @@
+import sys, os
+import contextlib
+import io
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from agents.evidence_buffer import EvidenceBuffer
+
+
+def noise_frame(rng, w=640, h=480):
+    # random pixels compress badly: ~100+ KB per 320 px JPEG
+    return rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    out_dir = Path(tempfile.mkdtemp(prefix="evidence_test_"))
+
+    # byte cap: noisy frames would fill 10 s x 5 fps far beyond 300 KB
+    buf = EvidenceBuffer(out_dir, seconds=10.0, fps=5.0, max_bytes=300 * 1024, min_gap=60.0)
+    ts = 1000.0
+    for _ in range(50):
+        buf.add(noise_frame(rng), ts)
+        assert buf.memory_bytes() <= buf.max_bytes or len(buf.ring) == 1
+        assert buf.memory_bytes() == sum(len(j) for _ts, j in buf.ring)
+        ts += 0.2
+    print(f"byte cap: {len(buf.ring)} frames, {buf.memory_bytes() / 1024:.0f} KB (cap {buf.max_bytes / 1024:.0f} KB)")
+    assert 1 <= len(buf.ring) < 50
+
+    # frame-rate limit and time window
+    buf = EvidenceBuffer(out_dir, seconds=2.0, fps=5.0)
+    flat = np.full((480, 640, 3), 128, dtype=np.uint8)
+    for i in range(300):                 # 10 s at 30 fps
+        buf.add(flat, 2000.0 + i / 30.0)
+    assert len(buf.ring) <= buf.max_frames, len(buf.ring)
+    assert buf.ring[-1][0] - buf.ring[0][0] <= buf.seconds
+    buf.add(flat, 2100.0)                # after a pause only the new frame is left
+    assert len(buf.ring) == 1
+    print(f"window: {buf.max_frames} frames max, pause -> {len(buf.ring)} frame")
+
+    # clips: only configured states, at most one per state per min_gap
+    for i in range(10):
+        buf.add(noise_frame(rng), 2100.0 + (i + 1) * 0.2)
+    assert not buf.on_decision({"state": "normal", "reason": "ok"}, 2103.0)
+    assert buf.on_decision({"state": "drowsy", "reason": "yawn"}, 2103.0)
+    assert not buf.on_decision({"state": "drowsy", "reason": "yawn"}, 2110.0)
+    buf.close()
+    clips = sorted(out_dir.glob("*_drowsy.json"))
+    assert len(clips) == 1 and clips[0].with_suffix(".mp4").exists(), clips
+    print(f"clip written: {clips[0].with_suffix('.mp4').name}")
+
+    # shutdown with a stuck writer and both queue slots taken: close() still returns
+    buf = EvidenceBuffer(out_dir, seconds=2.0, fps=5.0, states=("drowsy", "stressed", "engaged"), min_gap=0.0)
+    buf._write_clip = lambda job: time.sleep(5.0)
+    buf.add(flat, 3000.0)
+    for state in ("drowsy", "stressed", "engaged"):     # one being written, two queued
+        buf.on_decision({"state": state, "reason": "test"}, 3000.0)
+        time.sleep(0.1)
+    assert buf.jobs.full()
+    t0 = time.monotonic()
+    with contextlib.redirect_stdout(io.StringIO()):
+        buf.close(timeout=0.5)
+    assert time.monotonic() - t0 < 1.5
+    print("close: returns with a stuck writer and a full queue")
+
+    print("evidence buffer OK")
+
+
+if __name__ == "__main__":
+    main()
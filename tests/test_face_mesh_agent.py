@@ -0,0 +1,80 @@
+import sys, os
+import types
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from agents.face_mesh_agent import FaceMeshAgent
+from agents.yawn_agent import YawnAgent
+
+
+class ScriptedMesh:
+    """
+    Stands in for mediapipe's FaceMesh: 468 landmarks spread over the
+    normalized box (x0, y0)-(x1, y1), mouth opened by `mouth_open`.
+    """
+
+    def __init__(self):
+        self.box = None
+        self.mouth_open = 0.0
+        self.input_shapes = []
+
+    def process(self, frame_rgb):
+        self.input_shapes.append(frame_rgb.shape)
+        res = types.SimpleNamespace(multi_face_landmarks=None)
+        if self.box is None:
+            return res
+
+        x0, y0, x1, y1 = self.box
+        lm = [types.SimpleNamespace(x=x0 + (x1 - x0) * (i % 20) / 19.0, y=y0 + (y1 - y0) * (i // 20) / 23.0)
+              for i in range(468)]
+        mx, my, mw = (x0 + x1) / 2, y0 + 0.75 * (y1 - y0), 0.3 * (x1 - x0)
+        lm[13] = types.SimpleNamespace(x=mx, y=my)                      # upper lip
+        lm[14] = types.SimpleNamespace(x=mx, y=my + self.mouth_open)    # lower lip
+        lm[61] = types.SimpleNamespace(x=mx - mw / 2, y=my)             # corners
+        lm[291] = types.SimpleNamespace(x=mx + mw / 2, y=my)
+        res.multi_face_landmarks = [types.SimpleNamespace(landmark=lm)]
+        return res
+
+
+def main():
+    mesh = ScriptedMesh()
+    agent = FaceMeshAgent(max_input_width=640, mesh=mesh)
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+
+    # no face -> None and an empty last
+    assert agent.run(frame) is None and agent.last["mar"] is None
+
+    # bbox in full-resolution pixels although the mesh ran on a 640 px copy
+    mesh.box = (0.25, 0.2, 0.5, 0.8)
+    bbox = agent.run(frame)
+    assert mesh.input_shapes[-1][:2] == (360, 640), mesh.input_shapes[-1]
+    x, y, w, h = bbox
+    assert abs(x - 320) <= 1 and abs(y - 144) <= 1 and abs(w - 320) <= 2 and abs(h - 432) <= 2, bbox
+    assert agent.last["score"] == 1.0 and agent.last["landmarks"][1:] == (1280, 720)
+    print(f"bbox {bbox} from landmarks on a {mesh.input_shapes[-1][1]} px copy")
+
+    # MAR: the same formula as YawnAgent, so the yawn timer works unchanged
+    mar_closed = agent.last["mar"]
+    mesh.mouth_open = 0.05
+    agent.run(frame)
+    assert agent.last["mar"] == YawnAgent.mar_from_points(agent.last["mouth"])
+    assert agent.last["mar"] > mar_closed + 0.1, (mar_closed, agent.last["mar"])
+    assert agent.measure(frame) == agent.last["mar"]
+    print(f"mar closed={mar_closed:.3f} open={agent.last['mar']:.3f}")
+
+    # face mostly outside the image: below min_score -> treated as no face
+    mesh.box = (0.7, 0.2, 1.6, 0.8)
+    assert agent.run(frame) is None and agent.last["bbox"] is None
+
+    # small frames are not resized
+    small = np.zeros((240, 320, 3), dtype=np.uint8)
+    mesh.box = (0.25, 0.2, 0.5, 0.8)
+    assert agent.run(small) is not None and mesh.input_shapes[-1][:2] == (240, 320)
+
+    print("face mesh agent OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import sys, os
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from agents.feature_store import WindowFeatureStore, bucket_start
+
+
+def add(store, ts, state, mar, yawn=False, samples=1):
+    store.add_window(
+        yawn_info={"yawn": yawn, "duration": 2.0 if yawn else 0.0, "mar": mar},
+        emotion_info={"emotion": "neutral", "confidence": 80.0},
+        emotion_samples=[{"emotion": "neutral", "confidence": 80.0}] * samples,
+        decision={"state": state, "reason": "test"},
+        window_seconds=30.0,
+        ts=ts
+    )
+
+
+def snapshot(store, end):
+    return {level: store.rollups(level, 0, end) for level in ("5min", "hour", "day")}
+
+
+def main():
+    if hasattr(time, "tzset"):
+        # half-hour UTC offset: hour buckets must still start on local full hours
+        os.environ["TZ"] = "Asia/Kolkata"
+        time.tzset()
+
+    db = Path(tempfile.mkdtemp(prefix="feature_store_test_")) / "windows.db"
+    ten = time.mktime((2026, 3, 10, 10, 0, 0, 0, 0, -1))     # local 10:00
+    midnight = time.mktime((2026, 3, 10, 0, 0, 0, 0, 0, -1))
+    end = ten + 86400
+
+    store = WindowFeatureStore(db)
+    add(store, ten - 90, "drowsy", 0.30, yawn=True, samples=2)  # 09:58:30
+    add(store, ten - 30, "normal", 0.10)                        # 09:59:30
+    add(store, ten + 30, "stressed", 0.20, samples=3)           # 10:00:30
+    add(store, ten + 400, "focused", 0.40)                      # 10:06:40, not a known state
+
+    hours = store.rollups("hour", 0, end)
+    assert [h["bucket_start"] for h in hours] == [ten - 3600, ten], hours
+    h9, h10 = hours
+    assert (h9["n_windows"], h9["n_drowsy"], h9["n_normal"], h9["n_yawn_windows"]) == (2, 1, 1, 1)
+    assert (h10["n_windows"], h10["n_stressed"], h10["n_other"], h10["n_emotion_samples"]) == (2, 1, 1, 4)
+    assert abs(h9["avg_max_mar"] - 0.20) < 1e-9 and abs(h10["avg_max_mar"] - 0.30) < 1e-9
+    assert h9["max_mar"] == 0.30 and h9["max_yawn_duration"] == 2.0
+
+    fives = store.rollups("5min", 0, end)
+    assert [(f["bucket_start"], f["n_windows"]) for f in fives] == [(ten - 300, 2), (ten, 1), (ten + 300, 1)]
+    days = store.rollups("day", 0, end)
+    assert [(d["bucket_start"], d["n_windows"]) for d in days] == [(midnight, 4)]
+    assert bucket_start("hour", ten + 30) == ten
+    print(f"rollups: hour buckets {[h['n_windows'] for h in hours]}, local midnight day bucket")
+
+    # re-open: rollups kept as they are, new windows added on top
+    before = snapshot(store, end)
+    store.close()
+    store = WindowFeatureStore(db)
+    assert snapshot(store, end) == before
+    add(store, ten + 60, "normal", 0.50)
+    h10 = store.rollups("hour", 0, end)[1]
+    assert h10["n_windows"] == 3 and h10["n_normal"] == 1 and abs(h10["avg_max_mar"] - 1.1 / 3) < 1e-9
+    before = snapshot(store, end)
+    store.close()
+    print("re-open: rollups kept, upsert adds to the existing bucket")
+
+    # database from before the local-time buckets: rollups rebuilt from the raw rows
+    conn = sqlite3.connect(str(db))
+    with conn:
+        conn.execute("UPDATE rollups SET bucket_start = bucket_start + 1800, n_windows = 99")
+        conn.execute("PRAGMA user_version = 0")
+    conn.close()
+    store = WindowFeatureStore(db)
+    assert snapshot(store, end) == before
+    assert store.conn.execute("PRAGMA user_version").fetchone()[0] == 1
+    store.close()
+    print("old schema: rollups rebuilt from the raw windows")
+
+    print("feature store OK")
+
+
+if __name__ == "__main__":
+    main()
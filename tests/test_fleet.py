@@ -0,0 +1,80 @@
+import sys, os
+import gzip
+import json
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from agents.fleet_reporter import FleetReporter
+from agents.fleet_service import FleetService, MAX_INFLATED_BYTES
+
+
+def batch(events):
+    return gzip.compress("\n".join(json.dumps(e) for e in events).encode("utf-8"))
+
+
+def wait_until(cond, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if cond():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def main():
+    service = FleetService(":memory:", port=0, token="secret").start()
+    print(f"[TEST] fleet service on {service.url}")
+
+    # ---- ingest: good, malformed, decompression bomb, throttled ----
+    events = [{"ts": 1000.0 + i, "kind": "decision", "state": "drowsy", "reason": "yawn"} for i in range(5)]
+    assert service.ingest(batch(events), "desk-1") == (202, {"accepted": 5})
+    assert service.ingest(b"not gzip")[0] == 400
+    assert service.ingest(batch([{"ts": 1.0}]))[0] == 400                   # no "kind"
+    bomb = gzip.compress(b"\n" * (MAX_INFLATED_BYTES + 1))
+    assert service.ingest(bomb)[0] == 413
+    assert service.drain()
+
+    busy = FleetService(":memory:", port=0, max_pending=0)
+    assert busy.ingest(batch(events))[0] == 503
+    busy.close()
+
+    stats = service.store.stats(since_ts=0.0, per_client=5)
+    print(f"ingest: 5 rows stored, 400 / 413 / 503 rejections OK ({json.dumps(stats)[:80]}...)")
+
+    # ---- reporter: wrong token -> spooled, replayed after restart with the right one ----
+    spool_dir = Path(tempfile.mkdtemp(prefix="fleet_spool_test_"))
+    reporter = FleetReporter(service.url, client_id="desk-2", spool_dir=spool_dir,
+                             batch_size=10, flush_seconds=0.2, max_queue=20, token="wrong")
+    for i in range(45):       # more than max_queue: overflow goes to the spool too
+        reporter.report({"ts": 2000.0 + i, "kind": "action", "action": "notify"})
+    assert wait_until(lambda: reporter.stats["failures"] >= 1)
+    reporter.close(timeout=1.0)
+    spooled = sum(FleetReporter._spool_count(f) for f in spool_dir.glob("*.jsonl.gz"))
+    assert spooled == 45, spooled
+    assert service.health()["unauthorized"] >= 1
+    print(f"wrong token: {spooled} events spooled in {len(list(spool_dir.glob('*.jsonl.gz')))} files")
+
+    ingested_before = service.health()["ingested"]
+    reporter = FleetReporter(service.url, client_id="desk-2", spool_dir=spool_dir,
+                             batch_size=10, flush_seconds=0.2, token="secret")
+    assert wait_until(lambda: reporter.stats["resent"] == 45), reporter.status_text()
+    reporter.close()
+    assert service.drain()
+    assert service.health()["ingested"] - ingested_before == 45
+    assert not list(spool_dir.glob("*.jsonl.gz"))
+
+    rows = service.store.conn.execute(
+        "SELECT ts FROM events WHERE client = 'desk-2' ORDER BY rowid"
+    ).fetchall()
+    assert [r[0] for r in rows] == [2000.0 + i for i in range(45)], "spool not replayed oldest first"
+    print("replay: all 45 events delivered in order, spool empty")
+
+    service.close()
+    print("fleet OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import sys, os
+import types
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from agents.expression_cascade import L_EYE, L_EYE_OUT, R_EYE, R_EYE_OUT
+from agents.frame_quality import NOSE_TIP, FrameSelector, face_quality
+
+
+def frontal_landmarks(w, h):
+    """
+    Landmarks of a face looking at the camera with open eyes: nose tip
+    centred between the outer eye corners, lids 0.3 eye widths apart.
+    """
+    lm = [types.SimpleNamespace(x=0.5, y=0.5) for _ in range(468)]
+
+    def eye(idx, x0, x1, y):
+        c1, t1, t2, c2, b2, b1 = idx
+        width = x1 - x0
+        lm[c1] = types.SimpleNamespace(x=x0, y=y)
+        lm[c2] = types.SimpleNamespace(x=x1, y=y)
+        for top, bottom, fx in ((t1, b1, 1 / 3), (t2, b2, 2 / 3)):
+            lm[top] = types.SimpleNamespace(x=x0 + fx * width, y=y - 0.15 * width * w / h)
+            lm[bottom] = types.SimpleNamespace(x=x0 + fx * width, y=y + 0.15 * width * w / h)
+
+    eye(L_EYE, 0.25, 0.42, 0.4)
+    eye(R_EYE, 0.58, 0.75, 0.4)
+    lm[L_EYE_OUT] = types.SimpleNamespace(x=0.25, y=0.4)
+    lm[R_EYE_OUT] = types.SimpleNamespace(x=0.75, y=0.4)
+    lm[NOSE_TIP] = types.SimpleNamespace(x=0.5, y=0.6)
+    return (lm, w, h)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    sharp = rng.integers(40, 216, size=(160, 160, 3), dtype=np.uint8)
+    sharp = cv2.resize(cv2.resize(sharp, (40, 40)), (160, 160), interpolation=cv2.INTER_NEAREST)   # blocky texture
+    blurred = cv2.GaussianBlur(sharp, (0, 0), 6)
+    lm = frontal_landmarks(160, 160)
+
+    s_sharp, parts = face_quality(sharp, lm)
+    s_blur, _ = face_quality(blurred, lm)
+    assert parts["frontal"] > 0.9 and s_sharp > 2 * s_blur, (s_sharp, s_blur, parts)
+    print(f"score sharp={s_sharp:.2f} blurred={s_blur:.2f}")
+
+    # the sharp crop wins the slot, whatever its position between blurred ones
+    selector = FrameSelector(lookback=2.0, report_every=0)
+    selector.offer(blurred, 0.0, lm, require_landmarks=True)
+    selector.offer(sharp, 0.1, lm, require_landmarks=True)
+    selector.offer(blurred, 0.2, lm, require_landmarks=True)
+    crop, crop_lm = selector.take(0.3, blurred, None)
+    assert np.array_equal(crop, sharp) and crop_lm is lm
+    print("best crop: the sharp one, with its own landmarks")
+
+    # FaceMesh in this process: frames without landmarks of their own are not scored
+    selector.offer(blurred, 1.0, lm, require_landmarks=True)
+    assert selector.offer(sharp, 1.1, None, require_landmarks=True) is None
+    crop, crop_lm = selector.take(1.2, sharp, None)
+    assert np.array_equal(crop, blurred) and crop_lm is lm
+    assert selector.offer(sharp, 2.0, None, require_landmarks=True) is None
+    crop, _ = selector.take(2.1, blurred, None)          # nothing scored: the current crop goes
+    assert np.array_equal(crop, blurred)
+
+    # no FaceMesh here: crops without landmarks are scored (frontal = 1)
+    assert selector.offer(sharp, 3.0) is not None
+    print("stale frames skipped with a local mesh, scored without one")
+
+    print("frame quality OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import sys, os
+import contextlib
+import io
+import tempfile
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from load_generator import SyntheticClient
+from final_agent import WINDOW_SECONDS
+
+
+def simulate(scenario, minutes, seed, log_dir, fps=15.0):
+    client = SyntheticClient(scenario, fps, emotion_interval=4.0,
+                             log_path=log_dir / f"{scenario}_{seed}.log", seed=seed)
+    with contextlib.redirect_stdout(io.StringIO()):     # ActionAgent prints every decision
+        latencies = [lat for lat in (client.step() for _ in range(int(minutes * 60 * fps))) if lat is not None]
+    return client, latencies
+
+
+def main():
+    log_dir = Path(tempfile.mkdtemp(prefix="load_generator_test_"))
+
+    # same seed -> same run (load numbers are comparable between changes)
+    a, lat_a = simulate("office", 10, seed=7, log_dir=log_dir)
+    b, lat_b = simulate("office", 10, seed=7, log_dir=log_dir)
+    assert a.decisions == b.decisions and a.events == b.events, (a.decisions, b.decisions)
+    # a face all the time except short dropouts / the 15 s away phase: about one decision per window
+    windows = sum(a.decisions.values())
+    assert 0.6 * 600 / WINDOW_SECONDS <= windows <= 600 / WINDOW_SECONDS, windows
+    print(f"office x2: {a.decisions} ({len(lat_a)} windows, {a.events} events, deterministic)")
+
+    # scenarios drive the decisions they are named after
+    drowsy, _ = simulate("drowsy", 10, seed=1, log_dir=log_dir)
+    assert drowsy.decisions.get("drowsy", 0) > sum(drowsy.decisions.values()) / 2, drowsy.decisions
+    stress, _ = simulate("stress", 10, seed=1, log_dir=log_dir)
+    assert stress.decisions.get("stressed", 0) > sum(stress.decisions.values()) / 2, stress.decisions
+    print(f"drowsy: {drowsy.decisions}")
+    print(f"stress: {stress.decisions}")
+
+    # every window decision went through ActionAgent into the log
+    with open(log_dir / "drowsy_1.log", encoding="utf-8") as f:
+        logged = sum(1 for line in f if "STATE=" in line)
+    assert logged == sum(drowsy.decisions.values()), logged
+
+    print("load generator OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import sys, os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from agents.model_store import ALIGN, MappedModel, export_keras_model
+
+
+# Minimal stand-ins for Keras layers: export_keras_model only uses the
+# class name, get_config() and get_weights(), so no TensorFlow is needed.
+class _Layer:
+    def __init__(self, name, weights=(), **config):
+        self.name = name
+        self.weights = [np.asarray(w, dtype=np.float32) for w in weights]
+        self.config = dict(config, name=name)
+
+    def get_config(self):
+        return self.config
+
+    def get_weights(self):
+        return self.weights
+
+
+class InputLayer(_Layer): pass
+class Conv2D(_Layer): pass
+class MaxPooling2D(_Layer): pass
+class AveragePooling2D(_Layer): pass
+class Flatten(_Layer): pass
+class Dense(_Layer): pass
+class Dropout(_Layer): pass
+class BatchNormalization(_Layer): pass
+
+
+class FakeModel:
+    def __init__(self, layers, input_shape):
+        self.layers = layers
+        self.input_shape = (None, *input_shape)
+
+
+def conv_ref(x, kernel, bias, stride, padding):
+    """Plain-loop Conv2D (TensorFlow padding rules) as the reference."""
+    n, h, w, _ = x.shape
+    kh, kw, _, cout = kernel.shape
+    if padding == "same":
+        oh, ow = -(-h // stride), -(-w // stride)
+        ph, pw = max((oh - 1) * stride + kh - h, 0), max((ow - 1) * stride + kw - w, 0)
+        x = np.pad(x, ((0, 0), (ph // 2, ph - ph // 2), (pw // 2, pw - pw // 2), (0, 0)))
+    else:
+        oh, ow = (h - kh) // stride + 1, (w - kw) // stride + 1
+    out = np.zeros((n, oh, ow, cout), dtype=np.float64)
+    for i in range(oh):
+        for j in range(ow):
+            patch = x[:, i * stride:i * stride + kh, j * stride:j * stride + kw, :]
+            out[:, i, j, :] = np.tensordot(patch, kernel, axes=([1, 2, 3], [0, 1, 2]))
+    return out + bias
+
+
+def forward_ref(x, conv1, conv2, dense):
+    x = np.maximum(conv_ref(x, *conv1, stride=1, padding="same"), 0)
+    x = np.maximum(conv_ref(x, *conv2, stride=2, padding="valid"), 0)
+    n, h, w, c = x.shape
+    x = x[:, :h // 2 * 2, :w // 2 * 2].reshape(n, h // 2, 2, w // 2, 2, c).max(axis=(2, 4))
+    x = x.reshape(n, -1) @ dense[0] + dense[1]
+    x = np.exp(x - x.max(axis=1, keepdims=True))
+    return x / x.sum(axis=1, keepdims=True)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    conv1 = (rng.normal(size=(3, 3, 1, 4)), rng.normal(size=4))
+    conv2 = (rng.normal(size=(3, 3, 4, 6)), rng.normal(size=6))
+    dense = (rng.normal(size=(6 * 3 * 3, 7)) * 0.1, rng.normal(size=7))
+
+    model = FakeModel([
+        InputLayer("input"),
+        Conv2D("conv1", conv1, kernel_size=(3, 3), strides=(1, 1), padding="same", activation="relu"),
+        Conv2D("conv2", conv2, kernel_size=(3, 3), strides=(2, 2), padding="valid", activation="relu"),
+        MaxPooling2D("pool", pool_size=(2, 2), strides=(2, 2), padding="valid"),
+        Dropout("drop"),
+        Flatten("flat"),
+        Dense("out", dense, activation="softmax"),
+    ], input_shape=(16, 16, 1))
+
+    out_dir = Path(tempfile.mkdtemp(prefix="model_store_test_")) / "tiny"
+    labels = ["angry", "disgust", "fear", "happy", "sad", "surprise", "neutral"]
+    manifest = export_keras_model(model, out_dir, labels=labels)
+    offsets = [t["offset"] for layer in manifest["layers"] for t in layer["tensors"]]
+    assert all(o % ALIGN == 0 for o in offsets), offsets
+
+    mapped = MappedModel(out_dir, verify=True)
+    assert mapped.labels == labels and mapped.input_shape == (16, 16, 1)
+
+    batch = rng.random((5, 16, 16, 1), dtype=np.float32)
+    got = mapped.predict(batch)
+    want = forward_ref(batch.astype(np.float64), conv1, conv2, dense)
+    err = float(np.abs(got - want).max())
+    assert got.shape == (5, 7) and err < 1e-4, err
+    print(f"forward pass matches the reference (max abs error {err:.1e})")
+
+    # weights are read-only views of the mapping, not copies
+    kernel = mapped.layers[1][1][0]
+    assert not kernel.flags.writeable
+    assert np.shares_memory(kernel, mapped.blob)
+    print("weights: read-only views into weights.bin")
+
+    # corrupted / unsupported bundles are refused
+    data = bytearray((out_dir / "weights.bin").read_bytes())
+    data[offsets[1]] ^= 0xFF
+    (out_dir / "weights.bin").write_bytes(bytes(data))
+    try:
+        MappedModel(out_dir, verify=True)
+        raise AssertionError("checksum mismatch not detected")
+    except ValueError as e:
+        print(f"corrupted bundle refused: {e}")
+
+    try:
+        export_keras_model(FakeModel([BatchNormalization("bn")], (4,)), out_dir.parent / "bad")
+        raise AssertionError("unsupported layer exported")
+    except ValueError as e:
+        print(f"unsupported layer refused: {e}")
+
+    print("model store OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import sys, os
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from agents.perception_pool import PerceptionPool
+
+
+def main():
+    # Worker processes are not started: results are put on the pool's
+    # result queue by hand, so ordering and slot handling are exercised
+    # without FaceMesh.
+    pool = PerceptionPool(workers=1, result_timeout=0.2)
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+
+    def result(frame_id, bbox=(1, 2, 3, 4)):
+        pool.results.put(("result", frame_id, bbox, 0.1, None))
+        time.sleep(0.1)     # mp.Queue hands items over through a feeder thread
+
+    try:
+        # results are handed out in submit order, whatever order they arrive in
+        for i in range(3):
+            frame[:] = i
+            assert pool.submit(frame, ts=float(i))
+        result(2)
+        result(1)
+        assert pool.next_result() is None            # frame 0 not done yet
+        result(0)
+        out = [pool.next_result() for _ in range(3)]
+        assert [o["frame_id"] for o in out] == [0, 1, 2]
+        assert [o["ts"] for o in out] == [0.0, 1.0, 2.0]
+        print("ordering: results handed out in submit order")
+
+        # the returned frame is the copy in shared memory, valid until the next call
+        frame[:] = 7
+        pool.submit(frame, ts=3.0)
+        result(3)
+        out = pool.next_result()
+        assert int(out["frame"][0, 0, 0]) == 7
+
+        # a lost frame is skipped, but its slot stays in use until the late result arrives
+        pool.submit(frame, ts=4.0)
+        free_before = len(pool.free_slots)
+        assert pool.next_result(block=True) is None
+        assert 4 in pool.abandoned and len(pool.free_slots) == free_before + 1   # only the held slot came back
+        result(4)                                     # late result of the skipped frame
+        pool.submit(frame, ts=5.0)                    # _collect() runs in next_result
+        result(5)
+        out = pool.next_result()
+        assert out["frame_id"] == 5 and not pool.abandoned and 4 not in pool.done
+        print("lost frame: slot held until its late result, result dropped")
+
+        # every slot lost (dead worker): reclaimed instead of stalling the pool
+        for i in range(pool.n_slots):
+            pool.submit(frame, ts=10.0 + i)
+            pool.next_result(block=True)
+        assert pool.submit(frame, ts=20.0) and not pool.abandoned
+        print("dead worker: slots reclaimed")
+    finally:
+        pool._free_shm()
+
+    print("perception pool OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import sys, os
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from agents.supervisor import ManagedProcess, Supervisor
+
+
+# Child that beats a few times, then hangs (heartbeat file stops changing)
+HANGING_CHILD = """
+import sys, time
+sys.path.insert(0, {root!r})
+from agents.supervisor import heartbeat_from_env
+hb = heartbeat_from_env(every=0.1)
+for _ in range(5):
+    hb.beat()
+    time.sleep(0.1)
+time.sleep(60)
+"""
+
+
+def wait_until(cond, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if cond():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def main():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    log_dir = Path(tempfile.mkdtemp(prefix="supervisor_test_"))
+    py = sys.executable
+
+    # backoff: doubles per failure up to max_backoff, resets after a stable run
+    p = ManagedProcess("backoff", [py, "-c", "pass"], root, log_dir, min_backoff=1.0, max_backoff=8.0,
+                       stable_seconds=60.0)
+    p.started_ts = 0.0
+    delays = [p.schedule_restart(1.0, "exit:1") for _ in range(6)]
+    assert delays == [1.0, 2.0, 4.0, 8.0, 8.0, 8.0], delays
+    p.started_ts = 0.0
+    assert p.schedule_restart(120.0, "exit:1") == 1.0      # stayed up 120 s
+    print(f"backoff: {delays} then 1.0 after a stable run")
+
+    # crash: restarted with backoff
+    crash = ManagedProcess("crash", [py, "-c", "import sys; print('boom'); sys.exit(3)"], root, log_dir,
+                           min_backoff=0.2, max_backoff=0.2)
+    sup = Supervisor([crash], poll_interval=0.05)
+    assert wait_until(lambda: sup.poll(time.time()) and crash.restarts >= 2)
+    assert crash.last_reason == "exit:3", crash.last_reason
+    assert "boom" in "\n".join(crash.log_tail())
+    sup.stop_all()
+    print(f"crash: {crash.restarts} restarts, last={crash.last_reason}")
+
+    # hang: heartbeat goes stale -> killed and restarted
+    hang = ManagedProcess("hang", [py, "-c", HANGING_CHILD.format(root=root)], root, log_dir,
+                          heartbeat_timeout=0.5, startup_grace=5.0, min_backoff=0.1)
+    sup = Supervisor([hang], poll_interval=0.05)
+    sup.poll(time.time())
+    first_pid = hang.proc.pid
+    assert wait_until(lambda: sup.poll(time.time()) and hang.restarts >= 1, timeout=15.0)
+    assert hang.last_reason == "hung", hang.last_reason
+    assert wait_until(lambda: sup.poll(time.time()) and hang.is_running() and hang.proc.pid != first_pid)
+    sup.stop_all()
+    print(f"hang: restarted after a stale heartbeat (pid {first_pid} -> new)")
+
+    # clean exit of the primary child ends supervision, a crash does not
+    primary = ManagedProcess("camera", [py, "-c", "pass"], root, log_dir, stop_on_clean_exit=True)
+    helper = ManagedProcess("server", [py, "-c", "import time; time.sleep(60)"], root, log_dir)
+    sup = Supervisor([primary, helper], poll_interval=0.05)
+    assert wait_until(lambda: not sup.poll(time.time()))
+    assert primary.restarts == 0 and helper.is_running()
+    sup.stop_all()
+    assert not helper.is_running()
+
+    failing = ManagedProcess("camera_fail", [py, "-c", "import sys; sys.exit(1)"], root, log_dir,
+                             stop_on_clean_exit=True, min_backoff=0.1)
+    sup = Supervisor([failing], poll_interval=0.05)
+    assert wait_until(lambda: sup.poll(time.time()) and failing.restarts >= 1)
+    sup.stop_all()
+    print("clean exit stops the supervisor, exit:1 restarts")
+
+    print("supervisor OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import sys, os
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from agents.yawn_agent import YawnAgent
+
+
+BASE_FPS = 30
+CLOSED, OPEN, NOISE = 0.03, 0.14, 0.02
+
+
+def mar_trace(openings, seconds, seed):
+    """
+    One MAR trace sampled at BASE_FPS: mouth closed, open during each
+    (start, end) of `openings`, Gaussian noise on top.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * BASE_FPS)) / BASE_FPS
+    mar = np.full(t.shape, CLOSED)
+    for start, end in openings:
+        mar[(t >= start) & (t < end)] = OPEN
+    return t, np.maximum(mar + rng.normal(0.0, NOISE, t.shape), 0.0)
+
+
+def count_yawns(t, mar, fps):
+    """Feeds every (BASE_FPS / fps)-th sample of the trace, as a slower mesh would see it."""
+    agent = YawnAgent(use_mesh=False)
+    step = BASE_FPS // fps
+    for ts, m in zip(t[::step], mar[::step]):
+        agent.update(float(m), 1000.0 + float(ts))
+    return agent.yawn_count
+
+
+def main():
+    # a 1 s mouth opening (talking) and a 2.5 s yawn
+    openings = [(2.0, 3.0), (6.0, 8.5)]
+    for seed in range(50):
+        t, mar = mar_trace(openings, seconds=12.0, seed=seed)
+        counts = {fps: count_yawns(t, mar, fps) for fps in (30, 10, 5, 3)}
+        assert set(counts.values()) == {1}, (seed, counts)
+    print("same yawn count at 30/10/5/3 fps over 50 noise seeds")
+
+    # a gap longer than MAX_GAP_SECONDS restarts the smoothing, not the landmarks
+    agent = YawnAgent(use_mesh=False)
+    agent.last_landmarks = ("landmarks", 640, 480)      # what measure() stored for this frame
+    agent.update(CLOSED, 0.0)
+    assert agent.last_landmarks is not None
+    agent.update(CLOSED, 5.0)
+    assert agent.last_landmarks is not None
+    agent.update(None, 5.1)                             # face lost: everything goes
+    assert agent.last_landmarks is None
+    print("first sample / long gap keep the frame's landmarks")
+
+    print("yawn agent OK")
+
+
+if __name__ == "__main__":
+    main()